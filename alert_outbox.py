@@ -0,0 +1,202 @@
+"""
+Durable Telegram alert outbox backed by SQLite.
+
+enqueue() only appends to an in-memory list, so the analysis path never
+touches the disk. A single worker thread owns the SQLite connection (WAL
+journal) and every ``flush_interval`` seconds it
+
+* inserts the new alerts in one transaction; a UNIQUE idempotency key of
+  (symbol, timeframe, bar_time, direction, chat_id) makes re-evaluating the
+  same bar, or re-enqueueing after a restart, a no-op,
+* records delivery results reported by the TelegramNotifier,
+* hands pending rows to the notifier in id order.
+
+Rows stay pending until Telegram accepted them, so alerts queued before a
+restart or during an outage are delivered once the process is back. Sent
+rows older than ``keep_sent`` are deleted when the worker starts. A crash
+between Telegram accepting a message and the row being marked sent can still
+resend that one message.
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+
+from event_pipeline import LatencyStats
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS alerts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    symbol TEXT NOT NULL,
+    timeframe TEXT NOT NULL,
+    bar_time REAL NOT NULL,
+    direction TEXT NOT NULL,
+    chat_id TEXT NOT NULL,
+    text TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL DEFAULT 0,
+    delivered_at REAL,
+    UNIQUE (symbol, timeframe, bar_time, direction, chat_id)
+);
+CREATE INDEX IF NOT EXISTS alerts_pending ON alerts (status, id);
+"""
+
+
+class AlertOutbox:
+    def __init__(self, path, notifier, flush_interval=0.2, batch_size=500, retry_delay=30.0, max_attempts=20,
+                 keep_sent=7 * 86400):
+        """
+        :param path: SQLite database file
+        :param notifier: TelegramNotifier; its on_result is set to this outbox
+        :param flush_interval: seconds between write/drain passes
+        :param batch_size: maximum pending rows handed to the notifier per pass
+        :param retry_delay: seconds before an alert the notifier gave up on is offered again
+        :param max_attempts: notifier give-ups after which an alert is marked failed
+        :param keep_sent: seconds a sent alert is kept (it still dedupes re-evaluated bars meanwhile)
+        """
+        self.path = path
+        self.notifier = notifier
+        self.notifier.on_result = self._on_result
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.retry_delay = retry_delay
+        self.max_attempts = max_attempts
+        self.keep_sent = keep_sent
+        self.latency = LatencyStats()
+        self._new = []      # rows waiting to be inserted
+        self._results = []  # (alert ids, sent) reported by the notifier
+        self._in_flight = set()
+        self._lock = threading.Lock()
+        self._thread = None
+        self.enqueued = 0
+        self.duplicates = 0
+        self.delivered = 0
+        self.requeued = 0
+        self.pruned = 0
+
+    def enqueue(self, symbol, timeframe, bar_time, direction, chat_ids, text):
+        """Queue one alert per chat; never blocks on I/O."""
+        now = time.time()
+        rows = [(symbol, timeframe, float(bar_time), direction, str(chat_id), text, now)
+                for chat_id in chat_ids if chat_id]
+        with self._lock:
+            self._new.extend(rows)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="alert-outbox", daemon=True)
+            self._thread.start()
+        return self
+
+    def _connect(self):
+        db = sqlite3.connect(self.path)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.executescript(SCHEMA)
+        return db
+
+    def _run(self):
+        db = self._connect()
+        try:
+            self.prune(db)
+        except sqlite3.Error as e:
+            logging.error(f"[OUTBOX] Prune failed: {e}")
+        while True:
+            try:
+                self.run_once(db)
+            except Exception as e:
+                logging.error(f"[OUTBOX] Pass failed: {e}")
+            time.sleep(self.flush_interval)
+
+    def prune(self, db):
+        """Delete sent alerts delivered more than ``keep_sent`` seconds ago; returns the rows deleted."""
+        with db:
+            deleted = db.execute(
+                "DELETE FROM alerts WHERE status = 'sent' AND delivered_at < ?", (time.time() - self.keep_sent,)
+            ).rowcount
+        self.pruned += deleted
+        if deleted:
+            logging.info(f"[OUTBOX] Pruned {deleted} sent alerts")
+        return deleted
+
+    def run_once(self, db):
+        """One write/record/drain pass on ``db``."""
+        with self._lock:
+            new, self._new = self._new, []
+            results, self._results = self._results, []
+
+        with db:
+            if new:
+                before = db.total_changes
+                db.executemany(
+                    "INSERT OR IGNORE INTO alerts "
+                    "(symbol, timeframe, bar_time, direction, chat_id, text, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    new,
+                )
+                inserted = db.total_changes - before
+                self.enqueued += inserted
+                self.duplicates += len(new) - inserted
+            if results:
+                self._record(db, results)
+
+        self._drain(db)
+
+    def _record(self, db, results):
+        now = time.time()
+        for ids, sent in results:
+            marks = ",".join("?" * len(ids))
+            if sent:
+                db.execute(
+                    f"UPDATE alerts SET status = 'sent', delivered_at = ?, attempts = attempts + 1 WHERE id IN ({marks})",
+                    (now, *ids),
+                )
+                for (created_at,) in db.execute(f"SELECT created_at FROM alerts WHERE id IN ({marks})", ids):
+                    self.latency.record(now - created_at)
+                self.delivered += len(ids)
+            else:
+                # Stays pending and is offered again after retry_delay (e.g. a long Telegram outage)
+                db.execute(
+                    "UPDATE alerts SET attempts = attempts + 1, next_attempt_at = ?, "
+                    f"status = CASE WHEN attempts + 1 >= ? THEN 'failed' ELSE status END WHERE id IN ({marks})",
+                    (now + self.retry_delay, self.max_attempts, *ids),
+                )
+                self.requeued += len(ids)
+            with self._lock:
+                self._in_flight.difference_update(ids)
+
+    def _drain(self, db):
+        """Offer pending alerts to the notifier, oldest first."""
+        rows = db.execute(
+            "SELECT id, chat_id, text FROM alerts WHERE status = 'pending' AND next_attempt_at <= ? "
+            "ORDER BY id LIMIT ?",
+            (time.time(), self.batch_size + len(self._in_flight)),
+        ).fetchall()
+        offered = 0
+        for alert_id, chat_id, text in rows:
+            if alert_id in self._in_flight:
+                continue
+            if offered >= self.batch_size or not self.notifier.notify(chat_id, text, ref=alert_id):
+                break
+            with self._lock:
+                self._in_flight.add(alert_id)
+            offered += 1
+
+    def _on_result(self, ids, sent):
+        with self._lock:
+            self._results.append((ids, sent))
+
+    def stats(self):
+        return {
+            "pending_writes": len(self._new),
+            "in_flight": len(self._in_flight),
+            "enqueued": self.enqueued,
+            "duplicates": self.duplicates,
+            "delivered": self.delivered,
+            "requeued": self.requeued,
+            "pruned": self.pruned,
+            "delivery_latency": self.latency.summary(),
+        }
@@ -1,14 +1,15 @@
 import threading
 import logging
-from flask import Flask, render_template, jsonify
+from flask import Flask, render_template, jsonify, request
 from flask_cors import CORS
-from flask_socketio import SocketIO
+from flask_socketio import SocketIO, emit, join_room, leave_room, rooms
 from strategy import analyze_candles
-from telegram_utils import send_telegram_message
-from data_fetcher import start_fetching, get_dynamic_symbols  # updated import
+from data_fetcher import start_fetching, get_dynamic_symbols, get_analysis_stats, hydrate_from_archive  # updated import
 from datetime import datetime, timezone
 from config import TIMEFRAMES, TELEGRAM_CHAT_IDS
 from credentials import uid, sessionToken, ACCOUNT_URL, POCKET_WS_URL
+from signal_store import SignalStore
+from signal_broadcaster import ALL_ROOM, UNIVERSE_ROOM, ClientRooms, in_rooms, subscription_rooms
 
 # 👇 Import PocketOption WebSocket
 from pocket_ws import start_pocket_ws  
@@ -28,14 +29,18 @@ logging.basicConfig(
     format="%(asctime)s [%(levelname)s] %(message)s"
 )
 
-latest_signals = []  # Store latest signals for dashboard
-MAX_SIGNALS = 50     # Keep only the last 50
+MAX_SIGNALS = 50     # Keep only the last 50 updates in the history
+signal_store = SignalStore(history=MAX_SIGNALS)  # Latest signal per (symbol, timeframe) for dashboard
+client_rooms = ClientRooms()  # Rooms of every connected client, read by the signal broadcaster
 
 
 # -----------------------------
 # Background worker manager
 def start_background_workers():
-    """Start PocketOption WebSocket + data fetcher in LIVE mode."""
+    """Start the shared PocketOption feed + data fetcher in LIVE mode."""
+    # Warm start: restore archived candles before any live data arrives
+    hydrate_from_archive()
+
     logging.info("🔌 Connecting to PocketOption WebSocket (LIVE mode)...")
     
     # Start PocketOption WebSocket
@@ -48,7 +53,7 @@ def start_background_workers():
     # Run fetching service
     threading.Thread(
         target=start_fetching,
-        args=(TIMEFRAMES, socketio, latest_signals),
+        args=(TIMEFRAMES, socketio, signal_store, client_rooms),
         daemon=True
     ).start()
 # -----------------------------
@@ -63,30 +68,119 @@ def dashboard():
 
 @app.route("/signals_data")
 def signals_data():
-    """Return latest signals as JSON for AJAX polling."""
-    signals_out = latest_signals if latest_signals else [
-        {
-            "symbol": "-",
-            "signal": "No signals yet",
-            "confidence": 0,
-            "time": "-",
-            "timeframe": "-"
-        }
-    ]
-    return jsonify({
+    """
+    Return latest signals as JSON for AJAX polling.
+
+    With ``?since=<version>&epoch=<epoch>`` only signals updated after that
+    version are returned ("full" is false); a different epoch (the server
+    restarted) gets the full table. The response carries an ETag of the
+    store epoch and version, and If-None-Match with the current one answers 304.
+    ``?symbols=A,B`` and/or ``?timeframes=1m,5m`` select signals like the
+    Socket.IO "subscribe" event does.
+    """
+    since = request.args.get("since", type=int)
+    epoch = request.args.get("epoch") or None
+    symbols = request.args.get("symbols", "").split(",") if request.args.get("symbols") else None
+    timeframes = request.args.get("timeframes", "").split(",") if request.args.get("timeframes") else None
+    etag = signal_store.etag()
+    if request.if_none_match.contains(etag):
+        return "", 304, {"ETag": f'"{etag}"'}
+
+    delta = signal_store.changes_since(since, epoch)
+    signals_out = in_rooms(delta.signals, subscription_rooms(symbols, timeframes))
+    if delta.full and not signals_out:
+        signals_out = [
+            {
+                "symbol": "-",
+                "signal": "No signals yet",
+                "confidence": 0,
+                "time": "-",
+                "timeframe": "-"
+            }
+        ]
+    response = jsonify({
         "last_update": datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S"),
         "signals": signals_out,
+        "version": delta.version,
+        "epoch": signal_store.epoch,
+        "full": delta.full,
         "mode": "LIVE"
     })
+    response.set_etag(signal_store.etag(delta.version))
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+@app.route("/stats")
+def stats():
+    """Analysis cache hit/miss counters and candle ingestion counters."""
+    return jsonify(get_analysis_stats())
 
 
 # -----------------------------
-# Emit signals immediately to new dashboard clients
+def client_signals(signals):
+    """Signals the current client is subscribed to through its rooms."""
+    return in_rooms(signals, rooms())
+
+
+def join(*names):
+    """Join Socket.IO rooms and record them for the broadcaster."""
+    for name in names:
+        join_room(name)
+    client_rooms.join(request.sid, *names)
+
+
+def leave(*names):
+    for name in names:
+        leave_room(name)
+    client_rooms.leave(request.sid, *names)
+
+
+# Send the current signals to a new dashboard client only, in one batch
 @socketio.on("connect")
 def on_connect():
-    logging.info("Client connected, sending current signals...")
-    for sig in latest_signals:
-        socketio.emit("new_signal", sig)
+    join(ALL_ROOM, UNIVERSE_ROOM)
+    snapshot = signal_store.snapshot()
+    logging.info(f"Client connected, sending {len(snapshot.signals)} current signals...")
+    emit("signals_snapshot", {"version": snapshot.version, "epoch": signal_store.epoch,
+                              "signals": list(snapshot.signals)}, to=request.sid)
+
+
+# A reconnecting client catches up from its last version; {"since": ..., "epoch": ...}
+@socketio.on("sync_signals")
+def on_sync_signals(data):
+    data = data or {}
+    delta = signal_store.changes_since(data.get("since"), data.get("epoch"))
+    emit("signals_delta", {"version": delta.version, "epoch": signal_store.epoch,
+                           "signals": client_signals(delta.signals), "full": delta.full}, to=request.sid)
+
+
+# Watch only some symbols and/or timeframes: {"symbols": [...], "timeframes": [...]}
+@socketio.on("subscribe")
+def on_subscribe(data):
+    data = data or {}
+    leave(ALL_ROOM)
+    join(*subscription_rooms(data.get("symbols"), data.get("timeframes")))
+    snapshot = signal_store.snapshot()
+    emit("signals_snapshot", {"version": snapshot.version, "epoch": signal_store.epoch,
+                              "signals": client_signals(snapshot.signals)}, to=request.sid)
+
+
+# Stop watching symbols/timeframes; {} stops all signals, {"universe": true} stops symbols_update
+@socketio.on("unsubscribe")
+def on_unsubscribe(data):
+    data = data or {}
+    if data.get("universe"):
+        leave(UNIVERSE_ROOM)
+    elif data.get("symbols") or data.get("timeframes"):
+        leave(*subscription_rooms(data.get("symbols"), data.get("timeframes")))
+    else:
+        leave(*[room for room in rooms() if room not in (request.sid, UNIVERSE_ROOM)])
+
+
+@socketio.on("disconnect")
+def on_disconnect():
+    client_rooms.disconnect(request.sid)
 # -----------------------------
 
 
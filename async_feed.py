@@ -0,0 +1,334 @@
+# async_feed.py
+"""
+Asyncio Pocket Option feed client speaking Engine.IO v4 / Socket.IO v5 directly.
+
+One coroutine per connection replaces the thread-per-socket clients:
+
+* handshake: wait for the Engine.IO open packet (``0{...}``), send the
+  Socket.IO namespace connect (``40``), wait for ``40{sid}``, then ``auth``
+* heartbeat: the server pings (``2``) every ``pingInterval``; we answer with
+  a pong (``3``) and treat ``pingInterval + pingTimeout`` of silence as a
+  dead connection
+* reconnect: a loop (never recursion) with jittered exponential backoff;
+  subscriptions are sent again on every new connection
+* binary events (``45N-[...]`` followed by N binary frames) are reassembled
+* packets are parsed as ``<type>[<attachments>-][/<namespace>,][<ack id>][<data>]``;
+  a frame that does not parse, or whose payload is not valid JSON, is
+  logged and dropped without touching the connection
+
+    client = AsyncFeedClient()
+    await client.connect()
+    await client.subscribe_candles("EURUSD_otc", 60, on_candle)
+"""
+
+import asyncio
+import inspect
+import json
+import logging
+import random
+from urllib.parse import urlsplit, urlunsplit
+
+import websockets
+
+from config import PO_IO_URL
+from credentials import sessionToken, uid, currentUrl
+from frame_decoder import loads, peek_event
+
+ORIGIN = "https://m.pocketoption.com"
+
+# Engine.IO packet types
+EIO_OPEN, EIO_CLOSE, EIO_PING, EIO_PONG, EIO_MESSAGE = "0", "1", "2", "3", "4"
+# Socket.IO packet types (inside an Engine.IO message)
+SIO_CONNECT, SIO_DISCONNECT, SIO_EVENT, SIO_ACK, SIO_CONNECT_ERROR, SIO_BINARY_EVENT, SIO_BINARY_ACK = (
+    "0", "1", "2", "3", "4", "5", "6")
+
+# Errors a malformed frame raises while it is parsed or dispatched
+FRAME_ERRORS = (ValueError, TypeError, KeyError, IndexError, AttributeError)
+
+
+def engineio_url(url):
+    """Turn ``https://host`` into ``wss://host/socket.io/?EIO=4&transport=websocket``; ws URLs pass through."""
+    parts = urlsplit(url)
+    if parts.scheme in ("ws", "wss"):
+        return url
+    scheme = "wss" if parts.scheme == "https" else "ws"
+    return urlunsplit((scheme, parts.netloc, parts.path.rstrip("/") + "/socket.io/", "EIO=4&transport=websocket", ""))
+
+
+def backoff_delay(attempt, base=1.0, cap=60.0):
+    """Exponential backoff with full jitter: uniform in [0, min(cap, base * 2**attempt)]."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def split_packet(text):
+    """
+    Split a Socket.IO packet (the Engine.IO message without its ``4``).
+
+    :return: (type, attachments, namespace, ack_id, data) with ``data`` the
+        still-encoded JSON text ("" if none) and ``ack_id`` None without one
+    :raises ValueError: the packet does not follow the Socket.IO format
+    """
+    if not text or not text[0].isdigit():
+        raise ValueError(f"no Socket.IO packet type in {text[:40]!r}")
+    sio_type, i = text[0], 1
+    attachments = 0
+    if sio_type in (SIO_BINARY_EVENT, SIO_BINARY_ACK):
+        dash = text.find("-", i)
+        if dash < 0 or not text[i:dash].isdigit():
+            raise ValueError(f"no attachment count in {text[:40]!r}")
+        attachments, i = int(text[i:dash]), dash + 1
+    namespace = "/"
+    if text.startswith("/", i):
+        comma = text.find(",", i)
+        namespace, i = (text[i:], len(text)) if comma < 0 else (text[i:comma], comma + 1)
+    j = i
+    while j < len(text) and text[j].isdigit():
+        j += 1
+    ack_id = int(text[i:j]) if j > i else None
+    return sio_type, attachments, namespace, ack_id, text[j:]
+
+
+def _fill_placeholders(value, attachments):
+    if isinstance(value, dict):
+        if value.get("_placeholder") and "num" in value:
+            return attachments[value["num"]]
+        return {k: _fill_placeholders(v, attachments) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_fill_placeholders(v, attachments) for v in value]
+    return value
+
+
+class AsyncFeedClient:
+    def __init__(self, url=PO_IO_URL, auth=None, origin=ORIGIN, connect_timeout=10.0,
+                 min_backoff=1.0, max_backoff=60.0):
+        """
+        :param url: feed URL, http(s) or a full ws(s) Engine.IO URL
+        :param auth: payload of the ``auth`` event sent after every (re)connect
+        :param connect_timeout: seconds allowed for the websocket + Socket.IO handshake
+        :param min_backoff: base delay of the reconnect backoff (seconds)
+        :param max_backoff: cap of the reconnect backoff (seconds)
+        """
+        self.url = engineio_url(url)
+        self.auth = auth
+        self.origin = origin
+        self.connect_timeout = connect_timeout
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self._handlers = {}        # event -> [callbacks]
+        self._candle_handlers = {} # (asset, period) -> [callbacks]
+        self._tick_handlers = {}   # asset -> [callbacks]
+        self._ws = None
+        self._task = None
+        self._connected = None     # asyncio.Event, created on the running loop
+        self._closing = False
+        self.ping_deadline = None  # pingInterval + pingTimeout from the handshake (seconds)
+        self._binary = None        # [event packet or None, attachments, expected] of a binary event being reassembled
+        self.stats = {"connections": 0, "reconnects": 0, "pings": 0, "events": 0, "dropped": 0,
+                      "malformed": 0, "errors": 0}
+
+    # --- Public API ---
+    async def connect(self):
+        """Start the connection loop and wait until the first handshake completed."""
+        if self._task is None:
+            self._closing = False
+            self._connected = asyncio.Event()
+            self._task = asyncio.create_task(self._run(), name="async-feed")
+        await self._connected.wait()
+        return self
+
+    async def close(self):
+        self._closing = True
+        if self._ws is not None:
+            await self._ws.close()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def on(self, event, callback):
+        """Call ``callback(data)`` for every ``event``; coroutine callbacks are scheduled as tasks."""
+        self._handlers.setdefault(event, []).append(callback)
+        return callback
+
+    async def emit(self, event, data=None):
+        """Send a Socket.IO event; dropped (returns False) while disconnected."""
+        ws = self._ws
+        if ws is None or self._connected is None or not self._connected.is_set():
+            return False
+        payload = [event] if data is None else [event, data]
+        await ws.send(EIO_MESSAGE + SIO_EVENT + json.dumps(payload, separators=(",", ":")))
+        return True
+
+    async def subscribe_candles(self, asset, period, callback):
+        """Receive ``candles`` updates of (asset, period) as dicts; re-subscribed after reconnects."""
+        key = (asset, int(period))
+        first = key not in self._candle_handlers
+        self._candle_handlers.setdefault(key, []).append(callback)
+        if first:
+            await self.emit("subscribe", {"type": "candles", "asset": asset, "period": int(period)})
+
+    async def subscribe_ticks(self, asset, callback):
+        """Receive ``ticks`` of ``asset`` as dicts; re-subscribed after reconnects."""
+        first = asset not in self._tick_handlers
+        self._tick_handlers.setdefault(asset, []).append(callback)
+        if first:
+            await self.emit("subscribe", {"type": "ticks", "asset": asset})
+
+    # --- Connection loop ---
+    async def _run(self):
+        attempt = 0
+        while not self._closing:
+            try:
+                async with websockets.connect(self.url, origin=self.origin, ping_interval=None,
+                                              open_timeout=self.connect_timeout, max_size=None) as ws:
+                    self._ws = ws
+                    await asyncio.wait_for(self._handshake(ws), self.connect_timeout)
+                    attempt = 0
+                    self.stats["connections"] += 1
+                    await self._after_connect()
+                    await self._read(ws)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if not self._closing:
+                    self.stats["errors"] += 1
+                    logging.warning(f"[ASYNC FEED] Connection lost: {e!r}")
+            finally:
+                self._ws = None
+                if self._connected is not None:
+                    self._connected.clear()
+            if self._closing:
+                break
+            delay = backoff_delay(attempt, self.min_backoff, self.max_backoff)
+            attempt += 1
+            self.stats["reconnects"] += 1
+            logging.info(f"[ASYNC FEED] Reconnecting in {delay:.1f}s (attempt {attempt})")
+            await asyncio.sleep(delay)
+
+    async def _handshake(self, ws):
+        packet = await ws.recv()
+        if not isinstance(packet, str) or not packet.startswith(EIO_OPEN):
+            raise ConnectionError(f"expected Engine.IO open packet, got {packet[:40]!r}")
+        try:
+            info = json.loads(packet[1:])
+            self.ping_deadline = (info.get("pingInterval", 25000) + info.get("pingTimeout", 20000)) / 1000
+        except FRAME_ERRORS as e:
+            raise ConnectionError(f"malformed Engine.IO open packet {packet[:40]!r}: {e}") from e
+        await ws.send(EIO_MESSAGE + SIO_CONNECT)
+        while True:
+            packet = await ws.recv()
+            if not isinstance(packet, str):
+                continue  # binary frames mean nothing before the namespace is connected
+            if packet == EIO_PING:
+                await ws.send(EIO_PONG)
+            elif packet.startswith(EIO_MESSAGE + SIO_CONNECT):
+                return
+            elif packet.startswith(EIO_MESSAGE + SIO_CONNECT_ERROR):
+                raise ConnectionError(f"namespace connect refused: {packet[2:]}")
+
+    async def _after_connect(self):
+        self._connected.set()  # emit() checks it; cleared again if this fails
+        if self.auth:
+            await self.emit("auth", self.auth)
+        for asset in self._tick_handlers:
+            await self.emit("subscribe", {"type": "ticks", "asset": asset})
+        for asset, period in self._candle_handlers:
+            await self.emit("subscribe", {"type": "candles", "asset": asset, "period": period})
+        logging.info(f"[ASYNC FEED] Connected, {len(self._tick_handlers) + len(self._candle_handlers)} subscriptions sent")
+
+    async def _read(self, ws):
+        self._binary = None
+        while True:
+            # Silence beyond the server's ping deadline means the link is dead
+            packet = await asyncio.wait_for(ws.recv(), self.ping_deadline)
+            try:
+                await self._handle(ws, packet)
+            except FRAME_ERRORS as e:
+                # One bad frame is not a reason to drop the connection
+                self._binary = None
+                self.stats["malformed"] += 1
+                logging.warning(f"[ASYNC FEED] Dropped malformed frame {packet[:80]!r}: {e!r}")
+
+    async def _handle(self, ws, packet):
+        if isinstance(packet, bytes):
+            if self._binary is None:
+                return
+            event, attachments, expected = self._binary
+            attachments.append(packet)
+            if len(attachments) == expected:
+                self._binary = None
+                if event is not None:
+                    self._dispatch(_fill_placeholders(event, attachments))
+            return
+        kind = packet[:1]
+        if kind == EIO_PING:
+            self.stats["pings"] += 1
+            await ws.send(EIO_PONG)
+        elif kind == EIO_MESSAGE:
+            # Fast path for plain 42["event",...] frames: events nobody listens to are never parsed
+            event, payload = peek_event(packet)
+            if event is not None:
+                if self._wants(event):
+                    self._dispatch([event, loads(payload)] if payload else [event])
+                else:
+                    self.stats["dropped"] += 1
+                return
+            sio_type, count, namespace, _, data = split_packet(packet[1:])
+            if sio_type == SIO_BINARY_EVENT:
+                # Attachments are collected even for another namespace, so they are not taken for the next event
+                event = loads(data) if namespace == "/" else None
+                if count:
+                    self._binary = [event, [], count]
+                elif event is not None:
+                    self._dispatch(event)
+            elif namespace != "/":
+                self.stats["dropped"] += 1
+            elif sio_type == SIO_EVENT:
+                self._dispatch(loads(data))
+            elif sio_type == SIO_DISCONNECT:
+                raise ConnectionError("server disconnected the namespace")
+        elif kind == EIO_CLOSE:
+            raise ConnectionError("server closed the session")
+
+    # --- Dispatch ---
+    def _wants(self, event):
+        return (event in self._handlers
+                or (event == "candles" and self._candle_handlers)
+                or (event == "ticks" and self._tick_handlers))
+
+    def _dispatch(self, packet):
+        if not isinstance(packet, list) or not packet or not isinstance(packet[0], str):
+            raise ValueError(f"not a Socket.IO event: {str(packet)[:40]!r}")
+        event, data = packet[0], packet[1] if len(packet) > 1 else None
+        self.stats["events"] += 1
+        callbacks = list(self._handlers.get(event, ()))
+        if event == "candles" and isinstance(data, dict):
+            try:
+                key = (data.get("asset"), int(data.get("period") or 0))
+            except (TypeError, ValueError):
+                key = None  # still delivered to the plain "candles" handlers
+            callbacks += self._candle_handlers.get(key, [])
+        elif event == "ticks" and isinstance(data, dict):
+            callbacks += self._tick_handlers.get(data.get("asset"), [])
+        for callback in callbacks:
+            try:
+                result = callback(data)
+                if inspect.iscoroutine(result):
+                    asyncio.create_task(result)
+            except Exception as e:
+                self.stats["errors"] += 1
+                logging.error(f"[ASYNC FEED] {event} handler failed: {e}")
+
+
+def default_client(url=PO_IO_URL):
+    """Client authenticated with the session from credentials.py."""
+    return AsyncFeedClient(url, auth={
+        "sessionToken": sessionToken,
+        "uid": uid,
+        "lang": "en",
+        "currentUrl": currentUrl,
+        "isChart": 1,
+    })
@@ -0,0 +1,155 @@
+"""
+Historical candle backfill after connecting.
+
+Backfiller requests ``loadHistoryPeriod`` for every (asset, period) from a
+thread pool capped at ``concurrency`` requests in flight, starting at most one
+request every ``interval`` seconds. The server answers with a
+``loadHistoryPeriod`` event carrying {"asset", "period", "data": [candles]},
+which is matched to the waiting request. Results are handed to
+``on_history(asset, period, candles)`` (see data_fetcher.merge_history) and
+progress is tracked per asset. A pair still in flight from an earlier run
+(e.g. an assets refresh during a reconnect backfill) is skipped, so each
+(asset, period) has at most one request waiting for its response.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+HISTORY_EVENT = "loadHistoryPeriod"
+
+
+class Backfiller:
+    def __init__(self, emit, on_history, concurrency=4, interval=0.1, bars=500, timeout=15.0):
+        """
+        :param emit: callable(event, payload) sending to the feed, e.g. sio.emit
+        :param on_history: callable(asset, period, candles) merging one history response
+        :param concurrency: maximum history requests in flight
+        :param interval: minimum seconds between two request starts
+        :param bars: candles requested per (asset, period)
+        :param timeout: seconds to wait for one response
+        """
+        self.emit = emit
+        self.on_history = on_history
+        self.concurrency = concurrency
+        self.interval = interval
+        self.bars = bars
+        self.timeout = timeout
+        self._waiting = {}  # (asset, period) -> [threading.Event, response data]
+        self._in_flight = set()  # (asset, period) pairs submitted and not finished yet
+        self._lock = threading.Lock()
+        self._next_start = 0.0
+        self.progress = {}  # asset -> {"periods", "done", "failed", "candles"}
+        self.skipped = 0
+
+    def handle_response(self, data):
+        """Feed ``loadHistoryPeriod`` events from the Socket.IO client here."""
+        try:
+            key = (data["asset"], int(data["period"]))
+        except (KeyError, TypeError, ValueError):
+            logging.warning("[BACKFILL] Malformed history response")
+            return
+        with self._lock:
+            waiter = self._waiting.get(key)
+        if waiter is None:
+            logging.debug(f"[BACKFILL] Unexpected history for {key}")
+            return
+        waiter[1] = data.get("data") or []
+        waiter[0].set()
+
+    def _pace(self):
+        """Block until this request may start."""
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start)
+            self._next_start = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+    def request(self, asset, period):
+        """Request history for one (asset, period) and wait for it; returns the candle list."""
+        key = (asset, int(period))
+        waiter = [threading.Event(), None]
+        with self._lock:
+            self._waiting[key] = waiter
+        try:
+            self._pace()
+            self.emit(HISTORY_EVENT, {
+                "asset": asset,
+                "period": int(period),
+                "time": int(time.time()),
+                "offset": int(period) * self.bars,
+                "index": int(time.time() * 1000),
+            })
+            if not waiter[0].wait(self.timeout):
+                raise TimeoutError(f"no history for {asset} {period}s within {self.timeout}s")
+            return waiter[1]
+        finally:
+            with self._lock:
+                self._waiting.pop(key, None)
+
+    def _load(self, asset, period, entry):
+        with self._lock:
+            if self.progress.get(asset) is None:
+                # Evicted (progress popped) while queued: no history to merge into
+                self._in_flight.discard((asset, period))
+                return
+        try:
+            candles = self.request(asset, period)
+            added = self.on_history(asset, period, candles)
+            with self._lock:
+                entry["candles"] += added or 0
+        except Exception as e:
+            logging.error(f"[BACKFILL] {asset} {period}s failed: {e}")
+            with self._lock:
+                entry["failed"] += 1
+        with self._lock:
+            self._in_flight.discard((asset, period))
+            entry["done"] += 1
+            finished = entry["done"] == entry["periods"]
+        if finished:
+            logging.info(f"[BACKFILL] {asset}: {entry['done'] - entry['failed']}/{entry['periods']} periods, "
+                         f"{entry['candles']} candles")
+
+    @staticmethod
+    def _log_failure(future):
+        if future.exception() is not None:
+            logging.error(f"[BACKFILL] Load crashed: {future.exception()!r}")
+
+    def run(self, assets, periods):
+        """Backfill every asset on every period; blocks until all requests finished."""
+        periods = [int(p) for p in periods]
+        with self._lock:
+            todo = {}
+            for asset in assets:
+                todo[asset] = [period for period in periods if (asset, period) not in self._in_flight]
+                self._in_flight.update((asset, period) for period in todo[asset])
+                self.skipped += len(periods) - len(todo[asset])
+                if todo[asset]:
+                    self.progress[asset] = {"periods": len(todo[asset]), "done": 0, "failed": 0, "candles": 0}
+            entries = {asset: self.progress[asset] for asset in todo if todo[asset]}
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="backfill") as pool:
+            for asset, entry in entries.items():
+                for period in todo[asset]:
+                    pool.submit(self._load, asset, period, entry).add_done_callback(self._log_failure)
+        logging.info(f"[BACKFILL] {len(assets)} assets x {len(periods)} periods in {time.monotonic() - started:.1f}s")
+
+    def start(self, assets, periods):
+        """Run the backfill in a background thread."""
+        t = threading.Thread(target=self.run, args=(list(assets), list(periods)), name="backfill", daemon=True)
+        t.start()
+        return t
+
+    def stats(self):
+        with self._lock:
+            assets = {asset: dict(entry) for asset, entry in self.progress.items()}
+        return {
+            "assets": len(assets),
+            "complete": sum(1 for entry in assets.values() if entry["done"] == entry["periods"]),
+            "candles": sum(entry["candles"] for entry in assets.values()),
+            "failed": sum(entry["failed"] for entry in assets.values()),
+            "skipped": self.skipped,
+            "progress": assets,
+        }
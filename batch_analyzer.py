@@ -0,0 +1,190 @@
+"""
+Vectorized cross-symbol evaluation of strategy.analyze_candles.
+
+Takes a 3-D array (symbols x bars x OHLC) for one timeframe and computes the
+ten buy/sell scoring checks for every symbol at once with NumPy. Only the
+last bars matter for the scoring, so apart from the EMA and the mean close
+every indicator is evaluated on a short tail window.
+"""
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from strategy import multi_timeframe_confirmation
+from strategy_np import heikin_ashi, ema, detect_bullish_engulfing, detect_bearish_engulfing
+
+# Column order of the OHLC axis
+O, H, L, C = range(4)
+
+MIN_BARS = 50  # same minimum as strategy.analyze_candles
+TOTAL_CHECKS = 10
+
+
+def batch_features(ohlc):
+    """
+    Compute the last-bar values used by strategy.score_features for every symbol.
+
+    :param ohlc: float array of shape (symbols, bars, 4) in open/high/low/close order,
+                 with at least MIN_BARS bars
+    :return: dict of feature name -> array of shape (symbols,)
+    """
+    ohlc = np.asarray(ohlc, dtype=float)
+    o, h, l, c = ohlc[..., O], ohlc[..., H], ohlc[..., L], ohlc[..., C]
+
+    # Heikin-Ashi over the full series (the EMA needs all of it)
+    ha_open, ha_high, ha_low, ha_close = heikin_ashi(o, h, l, c)
+
+    # ATR(14) on the last bar
+    tr = np.maximum(h[:, -14:] - l[:, -14:],
+                    np.maximum(np.abs(h[:, -14:] - c[:, -15:-1]), np.abs(l[:, -14:] - c[:, -15:-1])))
+    atr = tr.mean(axis=1)
+
+    # Alligator on the Heikin-Ashi median price
+    median = (ha_high[:, -13:] + ha_low[:, -13:]) / 2
+    jaw = median.mean(axis=1)
+    teeth = median[:, -8:].mean(axis=1)
+    lips = median[:, -5:].mean(axis=1)
+
+    # Stochastic %K for the last three bars, %D as their mean
+    low_min = sliding_window_view(ha_low[:, -16:], 14, axis=1).min(axis=2)
+    high_max = sliding_window_view(ha_high[:, -16:], 14, axis=1).max(axis=2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        k_tail = 100 * (ha_close[:, -3:] - low_min) / (high_max - low_min)
+    k = k_tail[:, -1]
+    d = k_tail.mean(axis=1)
+
+    ema_line = ema(ha_close, 150)
+    ema_slope = ema_line[:, -1] - ema_line[:, -5]
+
+    # Bias over the last 30 Heikin-Ashi bars
+    open_mean = ha_open[:, -30:].mean(axis=1)
+    close_mean = ha_close[:, -30:].mean(axis=1)
+
+    up = ha_close[:, -3:] > ha_open[:, -3:]
+    down = ha_close[:, -3:] < ha_open[:, -3:]
+
+    return {
+        "close": ha_close[:, -1],
+        "jaw": jaw,
+        "teeth": teeth,
+        "lips": lips,
+        "k": k,
+        "d": d,
+        "atr": atr,
+        "min_atr": atr > c.mean(axis=1) * 0.001,
+        "bullish_bias": close_mean > open_mean,
+        "bearish_bias": close_mean < open_mean,
+        "bullish_pattern": detect_bullish_engulfing(ha_open, ha_close),
+        "bearish_pattern": detect_bearish_engulfing(ha_open, ha_close),
+        "ema_slope": ema_slope,
+        "momentum_bull": up.sum(axis=1) >= 2,
+        "momentum_bear": down.sum(axis=1) >= 2,
+    }
+
+
+def batch_scores(f):
+    """
+    Vectorized strategy.score_features.
+
+    :return: (buy_score, sell_score) integer arrays of shape (symbols,)
+    """
+    volatile = (f["atr"] > 0) & f["min_atr"]
+    buy = ((f["close"] > f["jaw"]).astype(int) + (f["close"] > f["teeth"]) + (f["close"] > f["lips"])
+           + (f["k"] > f["d"]) + (f["k"] < 30) + f["bullish_bias"] + f["bullish_pattern"]
+           + volatile + (f["ema_slope"] > 0) + f["momentum_bull"])
+    sell = ((f["close"] < f["jaw"]).astype(int) + (f["close"] < f["teeth"]) + (f["close"] < f["lips"])
+            + (f["k"] < f["d"]) + (f["k"] > 80) + f["bearish_bias"] + f["bearish_pattern"]
+            + volatile + (f["ema_slope"] < 0) + f["momentum_bear"])
+    return buy, sell
+
+
+def score_batch(ohlc, symbols):
+    """
+    Unconfirmed scores for one timeframe and many symbols at once.
+
+    :param ohlc: array of shape (symbols, bars, 4), see batch_features
+    :param symbols: symbol names in the same order as the first axis
+    :return: dict symbol -> (raw_signal, confidence) as strategy.score_candles returns,
+             or None per symbol if there are fewer than MIN_BARS bars
+    """
+    if ohlc.shape[1] < MIN_BARS:
+        return {symbol: None for symbol in symbols}
+
+    buy, sell = batch_scores(batch_features(ohlc))
+    is_buy = (buy >= sell) & (buy >= 6)
+    is_sell = (sell > buy) & (sell >= 6)
+    confidence = np.where(is_buy, (buy / TOTAL_CHECKS * 100).astype(int),
+                          np.where(is_sell, (sell / TOTAL_CHECKS * 100).astype(int), 0))
+
+    return {
+        symbol: ("buy" if is_buy[i] else "sell" if is_sell[i] else None, int(confidence[i]))
+        for i, symbol in enumerate(symbols)
+    }
+
+
+def analyze_batch(ohlc, symbols, mid_dfs=None, high_dfs=None):
+    """
+    Evaluate one timeframe for many symbols at once.
+
+    :param ohlc: array of shape (symbols, bars, 4), see batch_features
+    :param symbols: symbol names in the same order as the first axis
+    :param mid_dfs: optional dict symbol -> mid timeframe DataFrame for confirmation
+    :param high_dfs: optional dict symbol -> high timeframe DataFrame for confirmation
+    :return: dict symbol -> {"signal": ..., "confidence": ...} as analyze_candles returns,
+             or None per symbol if there are fewer than MIN_BARS bars
+    """
+    mid_dfs = mid_dfs or {}
+    high_dfs = high_dfs or {}
+    results = {}
+    for symbol, scored in score_batch(ohlc, symbols).items():
+        if scored is None:
+            results[symbol] = None
+            continue
+        raw_signal, confidence = scored
+        confirmed = multi_timeframe_confirmation(raw_signal, mid_dfs.get(symbol), high_dfs.get(symbol))
+        results[symbol] = {
+            "signal": confirmed,
+            "confidence": confidence if confirmed is not None else 0,
+        }
+    return results
+
+
+def _group_by_length(series):
+    """Split symbols into those below MIN_BARS and groups of equal history length."""
+    short, groups = [], {}
+    for symbol, rows in series.items():
+        if len(rows) < MIN_BARS:
+            short.append(symbol)
+        else:
+            groups.setdefault(len(rows), []).append(symbol)
+    return short, groups.values()
+
+
+def score_series_batch(series):
+    """
+    Unconfirmed scores for symbols whose histories may differ in length.
+
+    Series are grouped by length and each group is stacked and scored with
+    score_batch, so every symbol sees exactly its own window.
+
+    :param series: dict symbol -> array of shape (bars, 4) in open/high/low/close order
+    :return: dict symbol -> (raw_signal, confidence), or None below MIN_BARS
+    """
+    short, groups = _group_by_length(series)
+    results = dict.fromkeys(short)
+    for symbols in groups:
+        results.update(score_batch(np.stack([series[symbol] for symbol in symbols]), symbols))
+    return results
+
+
+def analyze_series_batch(series, mid_dfs=None, high_dfs=None):
+    """
+    Like score_series_batch, but returns analyze_candles-style results
+    (with multi-timeframe confirmation).
+    """
+    short, groups = _group_by_length(series)
+    results = dict.fromkeys(short)
+    for symbols in groups:
+        ohlc = np.stack([series[symbol] for symbol in symbols])
+        results.update(analyze_batch(ohlc, symbols, mid_dfs, high_dfs))
+    return results
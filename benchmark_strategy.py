@@ -0,0 +1,61 @@
+# benchmark_strategy.py
+"""
+Per-call latency of strategy.analyze_candles (pandas) vs
+strategy_np.analyze_candles (NumPy) at several history lengths.
+
+Usage: python benchmark_strategy.py [--bars 50 500 5000] [--repeat 200]
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+import strategy
+import strategy_np
+
+
+def make_candles(n, seed=0):
+    """Random-walk OHLC candles as a DataFrame."""
+    rng = np.random.default_rng(seed)
+    close = 1.1 + np.cumsum(rng.normal(0, 0.002, n))
+    open_ = np.r_[close[0], close[:-1]]
+    high = np.maximum(open_, close) + rng.random(n) * 0.002
+    low = np.minimum(open_, close) - rng.random(n) * 0.002
+    return pd.DataFrame({"open": open_, "high": high, "low": low, "close": close})
+
+
+def time_call(fn, arg, repeat):
+    """Return the median latency of fn(arg) in microseconds."""
+    fn(arg)  # warm up
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(arg)
+        samples.append(time.perf_counter() - start)
+    return float(np.median(samples)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bars", type=int, nargs="+", default=[50, 500, 5000])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'bars':>6} {'pandas (us)':>12} {'numpy (us)':>12} {'speedup':>8}")
+    for bars in args.bars:
+        df = make_candles(bars)
+        ohlc = df[["open", "high", "low", "close"]].to_numpy()
+
+        # Both paths must agree before their timings mean anything
+        assert strategy.score_features(strategy.candle_features(df)) == \
+            strategy.score_features(strategy_np.candle_features(ohlc))
+
+        pandas_us = time_call(strategy.analyze_candles, df, args.repeat)
+        numpy_us = time_call(strategy_np.analyze_candles, ohlc, args.repeat)
+        print(f"{bars:>6} {pandas_us:>12.1f} {numpy_us:>12.1f} {pandas_us / numpy_us:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+"""
+Append-only on-disk candle history for warm starts.
+
+Each (asset, period) series is one file of closed candles stored as raw
+float64 rows in CANDLE_COLUMNS order (the same layout as the in-memory ring
+buffers). Rows are appended as bars close and so are backfilled rows newer
+than the file; the file is only rewritten when history fills a gap in it, or
+to trim it back to the newest ``max_rows`` once it outgrew them by half.
+Reads memory-map the file, so hydrating a CandleStore after a restart copies
+only the last ``capacity`` rows straight from the page cache into the ring
+buffer.
+
+Bar-closed listeners run on the feed thread under the series lock, so
+on_bar_closed / on_history only queue the rows; one writer thread does the
+disk I/O. The queue is bounded: while the disk falls behind, new rows are
+dropped and counted rather than held in memory. At most ``max_open`` append handles are kept open (least recently
+used ones are closed first).
+"""
+
+import atexit
+import logging
+import os
+import queue
+import threading
+from collections import OrderedDict
+from urllib.parse import quote, unquote
+
+import numpy as np
+
+from candle_store import CANDLE_COLUMNS, TIME
+
+ROW_BYTES = len(CANDLE_COLUMNS) * 8
+SUFFIX = ".f64"
+
+
+class CandleArchive:
+    def __init__(self, directory, max_open=128, max_rows=None, maxsize=10000):
+        """
+        :param directory: folder holding one file per (asset, period); created if missing
+        :param max_open: append handles kept open at most
+        :param max_rows: newest rows kept per series (None keeps everything)
+        :param maxsize: bound of the writer queue; writes beyond it are dropped and counted
+        """
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.max_open = max_open
+        self.max_rows = max_rows
+        self._files = OrderedDict()  # (asset, period) -> open append handle, least recently used first
+        self._last_time = {}  # (asset, period) -> time of the last archived row
+        self._lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=maxsize)  # (method, args) for the writer thread
+        self._thread = None
+        self.written = 0
+        self.skipped = 0
+        self.rewrites = 0
+        self.dropped = 0
+        self.errors = 0
+
+    def path(self, asset, period):
+        return os.path.join(self.directory, f"{quote(asset, safe='')}_{int(period)}{SUFFIX}")
+
+    def series_keys(self):
+        """Return the (asset, period) keys that have an archive file."""
+        keys = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(SUFFIX):
+                continue
+            asset, _, period = name[:-len(SUFFIX)].rpartition("_")
+            if asset and period.isdigit():
+                keys.append((unquote(asset), int(period)))
+        return sorted(keys)
+
+    def read(self, asset, period, n=None):
+        """
+        Return the last ``n`` archived rows (all if None) as a read-only memory-mapped view.
+
+        A partially written trailing row (e.g. after a crash) is ignored.
+        """
+        path = self.path(asset, period)
+        rows = os.path.getsize(path) // ROW_BYTES if os.path.exists(path) else 0
+        if not rows:
+            return np.empty((0, len(CANDLE_COLUMNS)))
+        data = np.memmap(path, dtype=np.float64, mode="r", shape=(rows, len(CANDLE_COLUMNS)))
+        return data if n is None else data[-n:]
+
+    def append(self, asset, period, row):
+        """Append one closed candle; rows not newer than the last archived one are skipped."""
+        key = (asset, int(period))
+        row = np.asarray(row, dtype=np.float64)
+        with self._lock:
+            if key not in self._last_time:
+                last = self.read(asset, period, 1)
+                self._last_time[key] = float(last[0, TIME]) if len(last) else float("-inf")
+            if row[TIME] <= self._last_time[key]:
+                self.skipped += 1
+                return False
+            self._write(key, row[None])
+            return True
+
+    def _write(self, key, rows):
+        """Append rows newer than the file; trims it when it grew past 1.5 * max_rows."""
+        handle = self._handle(key)
+        handle.write(rows.tobytes())
+        handle.flush()
+        self._last_time[key] = float(rows[-1, TIME])
+        self.written += len(rows)
+        if self.max_rows and handle.tell() // ROW_BYTES > self.max_rows * 3 // 2:
+            self._rewrite(key, np.array(self.read(*key, self.max_rows)))
+
+    def _rewrite(self, key, rows):
+        """Replace a series file with ``rows`` (time ordered), keeping the newest ``max_rows``."""
+        if self.max_rows:
+            rows = rows[-self.max_rows:]
+        handle = self._files.pop(key, None)
+        if handle is not None:
+            handle.close()
+        path = self.path(*key)
+        with open(path + ".tmp", "wb") as f:
+            f.write(rows.tobytes())
+        os.replace(path + ".tmp", path)
+        self._last_time[key] = float(rows[-1, TIME])
+        self.rewrites += 1
+
+    def _handle(self, key):
+        handle = self._files.get(key)
+        if handle is not None:
+            self._files.move_to_end(key)
+            return handle
+        while len(self._files) >= self.max_open:
+            self._files.popitem(last=False)[1].close()
+        path = self.path(*key)
+        handle = self._files[key] = open(path, "ab")
+        # Drop a torn row left by a crash so the file stays row aligned
+        handle.truncate(os.path.getsize(path) // ROW_BYTES * ROW_BYTES)
+        return handle
+
+    def merge(self, asset, period, rows):
+        """
+        Merge backfilled rows into a series.
+
+        Buckets already archived keep their row. Rows newer than the file are
+        appended; only rows filling a gap (or older than the file) make a
+        rewrite, which writes the union to a temporary file in time order and
+        swaps it in, so readers never see a half-written series. Older rows
+        the ``max_rows`` cap would trim again are dropped up front.
+
+        :return: number of rows added
+        """
+        key = (asset, int(period))
+        rows = np.asarray(rows, dtype=np.float64).reshape(-1, len(CANDLE_COLUMNS))
+        rows = rows[np.unique(rows[:, TIME], return_index=True)[1]]  # time order, one row per bucket
+        with self._lock:
+            archived = self.read(asset, period)
+            times = np.array(archived[:, TIME])
+            last = times[-1] if len(times) else float("-inf")
+            newer = rows[rows[:, TIME] > last]
+            older = rows[rows[:, TIME] <= last]
+            pos = np.minimum(np.searchsorted(times, older[:, TIME]), len(times) - 1)
+            missing = older[times[pos] != older[:, TIME]] if len(older) else older
+            cut = len(times) + len(missing) + len(newer) - (self.max_rows or 0)  # oldest rows the cap trims
+            if self.max_rows and len(missing) and cut > 0:
+                union = np.sort(np.concatenate([times, missing[:, TIME]]))
+                missing = missing[missing[:, TIME] >= union[cut]] if cut < len(union) else missing[:0]
+
+            if len(missing):
+                merged = np.vstack([archived, missing, newer])
+                self._rewrite(key, merged[np.argsort(merged[:, TIME], kind="stable")])
+                self.written += len(missing) + len(newer)
+            elif len(newer):
+                self._write(key, newer)
+            return len(missing) + len(newer)
+
+    def on_bar_closed(self, asset, period, bar):
+        """CandleIngestor bar-closed listener; the row is written by the writer thread."""
+        self._offer(self.append, (asset, period, bar))
+
+    def on_history(self, asset, period, rows):
+        """Queue a merge of backfilled rows (see merge)."""
+        self._offer(self.merge, (asset, period, rows))
+
+    def _offer(self, method, args):
+        try:
+            self._queue.put_nowait((method, args))
+        except queue.Full:
+            # The next backfill merges a dropped bar back in
+            self.dropped += 1
+            logging.warning(f"[ARCHIVE] Queue full, dropped {method.__name__} {args[0]} {args[1]}s")
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="candle-archive", daemon=True)
+            self._thread.start()
+            atexit.register(self.close)
+        return self
+
+    def _run(self):
+        while True:
+            method, args = self._queue.get()
+            try:
+                if method is None:
+                    return
+                method(*args)
+            except Exception as e:
+                # Keep the writer alive, or the queue fills up behind it
+                self.errors += 1
+                logging.error(f"[ARCHIVE] {method.__name__} {args[0]} failed: {e}")
+            finally:
+                self._queue.task_done()
+
+    def flush(self):
+        """Wait until every queued write is on disk (needs the writer thread)."""
+        self._queue.join()
+
+    def hydrate(self, store, on_closed=None):
+        """
+        Load the last ``store.capacity`` archived rows of every series into ``store``.
+
+        The newest archived row becomes the store's last (forming) row, as
+        with a live feed, so it is only treated as closed once the next bar
+        starts; ``on_closed(asset, period, row)`` is called for the others,
+        e.g. to prime the IndicatorEngine.
+
+        :return: dict (asset, period) -> rows loaded
+        """
+        loaded = {}
+        for asset, period in self.series_keys():
+            rows = self.read(asset, period, store.capacity)
+            if not len(rows):
+                continue
+            store.extend_candles(asset, period, rows)
+            if on_closed is not None:
+                for row in rows[:-1]:
+                    on_closed(asset, period, row)
+            loaded[(asset, period)] = len(rows)
+        return loaded
+
+    def close(self, asset=None):
+        """
+        Close the handles of ``asset`` after its queued writes, e.g. when it left the universe.
+
+        Without ``asset`` the queue is drained, the writer stopped and every handle closed.
+        """
+        if asset is not None:
+            self._queue.put((self._close_asset, (asset,)))
+            return
+        if self._thread is not None:
+            self._queue.put((None, ()))
+            self._thread.join()
+            self._thread = None
+        with self._lock:
+            for handle in self._files.values():
+                handle.close()
+            self._files.clear()
+
+    def _close_asset(self, asset):
+        with self._lock:
+            for key in [key for key in self._files if key[0] == asset]:
+                self._files.pop(key).close()
+            for key in [key for key in self._last_time if key[0] == asset]:
+                del self._last_time[key]
+
+    def stats(self):
+        return {
+            "series": len(self._last_time),
+            "open_files": len(self._files),
+            "queued": self._queue.qsize(),
+            "written": self.written,
+            "skipped": self.skipped,
+            "rewrites": self.rewrites,
+            "dropped": self.dropped,
+            "errors": self.errors,
+        }
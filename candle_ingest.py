@@ -0,0 +1,134 @@
+"""
+Candle ingestion layer.
+
+Pocket Option pushes many updates for the candle that is still forming.
+CandleIngestor keeps exactly one row per time bucket in a CandleStore:
+updates for the current bucket overwrite the last row, a new bucket appends
+a row and announces that the previous bar has closed.
+"""
+
+import logging
+from collections import Counter
+
+import numpy as np
+
+from candle_store import CANDLE_COLUMNS, TIME, candle_row
+
+
+class CandleIngestor:
+    def __init__(self, store):
+        """
+        :param store: CandleStore that receives the candles
+        """
+        self.store = store
+        self._bar_closed_listeners = []
+        # Global counters: appended / updated (duplicates) / out_of_order / gaps
+        self.stats = Counter()
+        # Missing buckets per (asset, period)
+        self.gaps = Counter()
+
+    def on_bar_closed(self, callback):
+        """
+        Register ``callback(asset, period, bar)`` for closed bars.
+
+        ``bar`` is a copy of the closed row in CANDLE_COLUMNS order.
+        Can be used as a decorator.
+        """
+        self._bar_closed_listeners.append(callback)
+        return callback
+
+    def _emit_bar_closed(self, asset, period, bar):
+        for callback in self._bar_closed_listeners:
+            try:
+                callback(asset, period, bar)
+            except Exception as e:
+                logging.error(f"[INGEST] bar-closed listener failed for {asset} {period}s: {e}")
+
+    def ingest(self, asset, period, candle):
+        """
+        Upsert one candle update keyed by its time bucket.
+
+        :param candle: dict with time/open/high/low/close[/volume]
+        :return: "append", "update" or "out_of_order"
+        """
+        period = int(period)
+        bucket = float(int(candle["time"]) // period * period)
+        return self.ingest_row(asset, period, candle_row(candle, time=bucket))
+
+    def ingest_row(self, asset, period, row):
+        """
+        Upsert one row already in CANDLE_COLUMNS order.
+
+        ``row[TIME]`` must be the start of the candle's time bucket.
+        """
+        ring = self.store.series(asset, period)
+        bucket = row[TIME]
+        # Read-modify-write of the last row must not interleave with a history
+        # merge; bar-closed listeners run under the lock too, so a merge that
+        # rebuilds derived state (see data_fetcher.merge_history) sees each bar once
+        with ring.lock:
+            last = ring.last()
+            if last is None:
+                ring.append(row)
+                self.stats["appended"] += 1
+                return "append"
+
+            last_time = last[TIME]
+            if bucket == last_time:
+                ring.update_last(row)
+                self.stats["updated"] += 1
+                return "update"
+
+            if bucket < last_time:
+                # Late update for a bar we already moved past: drop it
+                self.stats["out_of_order"] += 1
+                return "out_of_order"
+
+            missing = int((bucket - last_time) // period) - 1
+            if missing > 0:
+                self.stats["gaps"] += missing
+                self.gaps[(asset, int(period))] += missing
+
+            closed = last.copy()
+            ring.append(row)
+            self.stats["appended"] += 1
+            self._emit_bar_closed(asset, period, closed)
+        return "append"
+
+    def merge_history(self, asset, period, candles):
+        """
+        Merge historical candles into the stored series by time bucket.
+
+        History is bucketed like live candles (the last update per bucket
+        wins). Every bucket the series does not hold yet is inserted, so a
+        gap between archived and live bars is filled too; buckets already
+        stored keep their live row. No bar-closed events are emitted.
+
+        :param candles: iterable of dicts with time/open/high/low/close[/volume]
+        :return: number of history rows added
+        """
+        period = int(period)
+        rows = np.array([candle_row(c, time=float(int(c["time"]) // period * period)) for c in candles],
+                        dtype=float).reshape(-1, len(CANDLE_COLUMNS))
+        if not len(rows):
+            return 0
+        # Unique buckets in time order, keeping the last row received for each
+        _, first_in_reversed = np.unique(rows[::-1, TIME], return_index=True)
+        rows = rows[::-1][first_in_reversed]
+
+        ring = self.store.series(asset, period)
+        # Holding the series lock keeps live updates out between reading the
+        # live rows and replacing them; readers see the old or the merged series
+        with ring.lock:
+            live = ring.tail()
+            missing = rows[~np.isin(rows[:, TIME], live[:, TIME])]
+            if not len(missing):
+                return 0
+            merged = np.vstack([missing, live])
+            order = np.argsort(merged[:, TIME], kind="stable")[-ring.capacity:]
+            added = int((order < len(missing)).sum())
+            if not added:
+                return 0
+            ring.replace(merged[order])
+        self.stats["backfilled"] += added
+        return added
@@ -0,0 +1,305 @@
+"""
+Bounded columnar candle storage.
+
+Every (asset, period) series lives in its own fixed-capacity, preallocated
+float64 ring buffer, so memory stays flat no matter how long the feed runs.
+
+Writers (the feed thread, backfill workers) are serialized per series by
+the ring's lock. Readers never take it: each ring is a seqlock whose
+sequence number is odd while a write is in progress, and the read methods
+of CandleStore copy the rows and retry if the sequence moved meanwhile, so
+the analyzer always sees a coherent window without blocking the feed.
+"""
+
+import threading
+import time
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+# Column layout of a candle row
+CANDLE_COLUMNS = ("time", "open", "high", "low", "close", "volume")
+TIME, OPEN, HIGH, LOW, CLOSE, VOLUME = range(len(CANDLE_COLUMNS))
+
+# Column layout of a tick row
+TICK_COLUMNS = ("time", "price")
+
+# version: completed writes to the series when the rows were copied; rows: private copy
+SeriesSnapshot = namedtuple("SeriesSnapshot", ["version", "rows"])
+
+
+def candle_row(candle, time=None):
+    """Convert a candle dict into a row tuple in CANDLE_COLUMNS order."""
+    return (
+        candle["time"] if time is None else time,
+        candle["open"],
+        candle["high"],
+        candle["low"],
+        candle["close"],
+        candle.get("volume", 0.0),
+    )
+
+
+class RingBuffer:
+    """
+    Fixed-capacity ring buffer of float64 rows.
+
+    Each row is written twice (at slot ``i`` and ``i + capacity``), which keeps
+    the most recent rows contiguous in memory: :meth:`tail` can then return
+    a plain NumPy view instead of stitching the two halves together.
+
+    Writes hold ``lock`` and bump the sequence number before and after, so
+    :meth:`snapshot` can copy rows from another thread without locking.
+    """
+
+    def __init__(self, capacity: int, columns=CANDLE_COLUMNS):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.columns = tuple(columns)
+        self._buf = np.full((2 * capacity, len(self.columns)), np.nan)
+        self._next = 0  # next write slot, always in [0, capacity)
+        self._size = 0
+        self._seq = 0   # odd while a write is in progress
+        self.lock = threading.RLock()  # serializes writers; readers never take it
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def version(self):
+        """Number of completed writes; changes whenever the contents do."""
+        return self._seq >> 1
+
+    def append(self, row):
+        """Append one row in O(1), overwriting the oldest row when full."""
+        with self.lock:
+            self._seq += 1
+            try:
+                i = self._next
+                self._buf[i] = row
+                self._buf[i + self.capacity] = row
+                self._next = i + 1 if i + 1 < self.capacity else 0
+                if self._size < self.capacity:
+                    self._size += 1
+            finally:
+                self._seq += 1
+
+    def extend(self, rows):
+        """Append many rows (oldest first) with one vectorized write per copy."""
+        with self.lock:
+            self._seq += 1
+            try:
+                self._extend(rows)
+            finally:
+                self._seq += 1
+
+    def _extend(self, rows):
+        rows = np.asarray(rows, dtype=float)[-self.capacity:]
+        n = len(rows)
+        if not n:
+            return
+        slots = (self._next + np.arange(n)) % self.capacity
+        self._buf[slots] = rows
+        self._buf[slots + self.capacity] = rows
+        self._next = (self._next + n) % self.capacity
+        self._size = min(self._size + n, self.capacity)
+
+    def _clear(self):
+        self._buf.fill(np.nan)
+        self._next = 0
+        self._size = 0
+
+    def clear(self):
+        with self.lock:
+            self._seq += 1
+            try:
+                self._clear()
+            finally:
+                self._seq += 1
+
+    def replace(self, rows):
+        """Replace all rows in one write, so readers see either the old or the new series."""
+        with self.lock:
+            self._seq += 1
+            try:
+                self._clear()
+                self._extend(rows)
+            finally:
+                self._seq += 1
+
+    def update_last(self, row):
+        """Overwrite the most recent row in place (e.g. a still-forming candle)."""
+        with self.lock:
+            if not self._size:
+                raise IndexError("update_last on empty RingBuffer")
+            self._seq += 1
+            try:
+                i = self._next - 1 if self._next else self.capacity - 1
+                self._buf[i] = row
+                self._buf[i + self.capacity] = row
+            finally:
+                self._seq += 1
+
+    def tail(self, n=None):
+        """
+        Return the last ``n`` rows (all rows if ``n`` is None) oldest first.
+
+        The result is a read-only view into the buffer, not a copy.
+        """
+        n = self._size if n is None else max(0, min(n, self._size))
+        end = self._next + self.capacity
+        view = self._buf[end - n:end]
+        view.flags.writeable = False
+        return view
+
+    def last(self):
+        """Return the most recent row as a read-only view, or None if empty."""
+        if not self._size:
+            return None
+        return self.tail(1)[0]
+
+    def snapshot(self, n=None):
+        """
+        Return a SeriesSnapshot with a private copy of the last ``n`` rows.
+
+        Safe to call from any thread while another one writes: the copy is
+        retried until no write overlapped it.
+        """
+        while True:
+            seq = self._seq
+            if seq & 1:
+                time.sleep(0)  # a write is in progress; let the writer finish
+                continue
+            rows = self.tail(n).copy()
+            if self._seq == seq:
+                return SeriesSnapshot(seq >> 1, rows)
+
+
+class CandleStore:
+    """
+    Collection of candle and tick ring buffers keyed by (asset, period).
+
+    Buffers are created lazily on first write; reads never create entries.
+    """
+
+    def __init__(self, capacity: int = 500, tick_capacity: int = 1000):
+        self.capacity = capacity
+        self.tick_capacity = tick_capacity
+        self._candles = {}
+        self._ticks = {}
+        self._lock = threading.Lock()
+
+    def series(self, asset, period):
+        """Return the candle ring buffer for (asset, period), creating it if needed."""
+        return self._candle_ring(asset, period)
+
+    def _candle_ring(self, asset, period):
+        key = (asset, int(period))
+        ring = self._candles.get(key)
+        if ring is None:
+            with self._lock:
+                ring = self._candles.setdefault(key, RingBuffer(self.capacity, CANDLE_COLUMNS))
+        return ring
+
+    def _tick_ring(self, asset):
+        ring = self._ticks.get(asset)
+        if ring is None:
+            with self._lock:
+                ring = self._ticks.setdefault(asset, RingBuffer(self.tick_capacity, TICK_COLUMNS))
+        return ring
+
+    # --- Writes ---
+    def append_candle(self, asset, period, candle):
+        """Append a candle given as a dict with the OHLCV keys."""
+        self._candle_ring(asset, period).append(candle_row(candle))
+
+    def extend_candles(self, asset, period, rows):
+        """Append many rows in CANDLE_COLUMNS order, e.g. history loaded from disk."""
+        self._candle_ring(asset, period).extend(rows)
+
+    def append_tick(self, asset, time, price):
+        self._tick_ring(asset).append((time, price))
+
+    def drop_asset(self, asset):
+        """Free every candle and tick buffer of ``asset``; returns the number of buffers dropped."""
+        with self._lock:
+            keys = [key for key in self._candles if key[0] == asset]
+            for key in keys:
+                del self._candles[key]
+            dropped = len(keys) + (self._ticks.pop(asset, None) is not None)
+        return dropped
+
+    # --- Reads ---
+    # Reads return consistent copies (see RingBuffer.snapshot), never views
+    # the feed thread may be writing to.
+    def snapshot(self, asset, period, n=None):
+        """Return a SeriesSnapshot (version, rows) of the last ``n`` candles."""
+        ring = self._candles.get((asset, int(period)))
+        if ring is None:
+            return SeriesSnapshot(0, np.empty((0, len(CANDLE_COLUMNS))))
+        return ring.snapshot(n)
+
+    def version(self, asset, period):
+        """Sequence number of the series; changes with every write to it."""
+        ring = self._candles.get((asset, int(period)))
+        return ring.version if ring is not None else 0
+
+    def candles(self, asset, period, n=None):
+        """Return a copy of the last ``n`` candles as a (rows x 6) array."""
+        return self.snapshot(asset, period, n).rows
+
+    def closed_candles(self, asset, period):
+        """
+        Return a copy of all candles except the still-forming last one.
+
+        The last row only closes when the next bucket starts, so it is left out.
+        """
+        rows = self.candles(asset, period)
+        return rows[:-1]
+
+    def last_closed_time(self, asset, period):
+        """Return the open time of the last closed candle, or None."""
+        rows = self.candles(asset, period, 2)
+        return float(rows[0, TIME]) if len(rows) == 2 else None
+
+    def ticks(self, asset, n=None):
+        """Return a copy of the last ``n`` ticks as a (rows x 2) array."""
+        ring = self._ticks.get(asset)
+        if ring is None:
+            return np.empty((0, len(TICK_COLUMNS)))
+        return ring.snapshot(n).rows
+
+    def frame(self, asset, period, n=None, closed=False):
+        """
+        Return the last ``n`` candles as a DataFrame over a consistent copy.
+
+        With ``closed=True`` the still-forming last candle is left out.
+        Returns None if there are no (closed) candles yet.
+        """
+        rows = self.closed_candles(asset, period) if closed else self.candles(asset, period)
+        if n is not None:
+            rows = rows[-n:] if n > 0 else rows[:0]
+        if not len(rows):
+            return None
+        return pd.DataFrame(rows, columns=list(CANDLE_COLUMNS), copy=False)
+
+    def candle_count(self, asset, period):
+        ring = self._candles.get((asset, int(period)))
+        return len(ring) if ring is not None else 0
+
+    def series_keys(self):
+        """Return the (asset, period) keys that currently hold candles."""
+        with self._lock:
+            return list(self._candles)
+
+    def assets(self):
+        with self._lock:
+            return sorted({asset for asset, _ in self._candles} | set(self._ticks))
+
+    def memory_bytes(self):
+        """Approximate memory held by all preallocated buffers."""
+        with self._lock:
+            rings = list(self._candles.values()) + list(self._ticks.values())
+        return sum(ring._buf.nbytes for ring in rings)
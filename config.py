@@ -1,10 +1,5 @@
 import os
-import websocket
-import threading
-import json
 from dotenv import load_dotenv
-from collections import defaultdict
-import time
 
 # Load environment variables
 load_dotenv()
@@ -13,8 +8,10 @@ load_dotenv()
 PO_EMAIL = os.getenv("PO_EMAIL")
 PO_PASSWORD = os.getenv("PO_PASSWORD")
 
-# --- WebSocket URL ---
-PO_WS_URL = "wss://events-po.com/socket.io/?EIO=4&transport=websocket"
+# --- Feed URLs ---
+# Override both to point the clients at a local feed, e.g. mock_po_server.py
+PO_IO_URL = os.getenv("PO_IO_URL", "https://events-po.com")
+PO_WS_URL = os.getenv("PO_WS_URL", "wss://events-po.com/socket.io/?EIO=4&transport=websocket")
 
 # --- Telegram ---
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
@@ -24,100 +21,61 @@ TELEGRAM_CHAT_IDS = os.getenv("TELEGRAM_CHAT_IDS", "").split(",")
 TIMEFRAMES = ["1m", "3m", "5m"]
 CANDLE_PERIODS = {"1m": 60, "3m": 180, "5m": 300}
 
+# Multi-timeframe confirmation: timeframe -> (mid, high) timeframes it is confirmed against.
+# A timeframe without a mid timeframe is not confirmed.
+MTF_TIMEFRAMES = {"1m": ("3m", "5m"), "3m": ("5m", None), "5m": (None, None)}
+
+# Candles are built locally from ticks; set to true to also subscribe to server-side candles
+SUBSCRIBE_SERVER_CANDLES = os.getenv("SUBSCRIBE_SERVER_CANDLES", "False").lower() == "true"
+
+# subscribe/unsubscribe frames sent per second (and back to back) after an assets refresh
+SUBSCRIBE_RATE = float(os.getenv("SUBSCRIBE_RATE", "20"))
+SUBSCRIBE_BURST = int(os.getenv("SUBSCRIBE_BURST", "20"))
+
+# --- Analysis ---
+# "pandas" recomputes indicators over the stored window on every pass,
+# "numpy" does the same on plain arrays (strategy_np),
+# "incremental" reads the running state the IndicatorEngine updates per closed bar,
+# "batch" scores all symbols of a timeframe in one vectorized NumPy pass
+ANALYSIS_BACKEND = os.getenv("ANALYSIS_BACKEND", "pandas").lower()
+
+# Analysis results kept per (symbol, timeframe, last closed bar)
+SIGNAL_CACHE_SIZE = int(os.getenv("SIGNAL_CACHE_SIZE", "2048"))
+
+# "poll" sweeps dirty series every 5 seconds,
+# "event" evaluates each (symbol, timeframe) as soon as its bar closes
+EVALUATION_MODE = os.getenv("EVALUATION_MODE", "poll").lower()
+EVALUATION_WORKERS = int(os.getenv("EVALUATION_WORKERS", "4"))
+EVALUATION_QUEUE_SIZE = int(os.getenv("EVALUATION_QUEUE_SIZE", "10000"))
+
+# Dashboard updates are merged into one Socket.IO batch per window (seconds);
+# the window grows up to BROADCAST_MAX_WINDOW while emits are slow
+BROADCAST_WINDOW = float(os.getenv("BROADCAST_WINDOW", "0.25"))
+BROADCAST_MAX_WINDOW = float(os.getenv("BROADCAST_MAX_WINDOW", "2.0"))
+
+# --- Alerts ---
+# SQLite outbox for Telegram alerts; empty sends them without persisting
+ALERT_OUTBOX_PATH = os.getenv("ALERT_OUTBOX_PATH", "alerts.db")
+# Delivered alerts older than this are deleted from the outbox on startup
+ALERT_OUTBOX_KEEP_DAYS = float(os.getenv("ALERT_OUTBOX_KEEP_DAYS", "7"))
+
 # --- Debug ---
 DEBUG = os.getenv("DEBUG", "False").lower() == "true"
 
 # --- Market data ---
-market_data = defaultdict(lambda: {"candles": defaultdict(list)})
-
-# --- Symbols loaded dynamically ---
-SYMBOLS = []
-
-# --- WebSocket heartbeat ---
-def send_heartbeat(ws):
-    while True:
-        try:
-            ws.send("2")
-        except Exception as e:
-            print("[HEARTBEAT ERROR]", e)
-        time.sleep(5)
-
-# --- WebSocket handlers ---
-def on_open(ws):
-    print("[OPEN] Connected to Pocket Option WebSocket")
-    ws.send('42["getAssets", {}]')  # Request asset list
-    threading.Thread(target=send_heartbeat, args=(ws,), daemon=True).start()
-
-def on_message(ws, message):
-    if not message.startswith("42"):
-        return
-
-    try:
-        data = json.loads(message[2:])
-        event = data[0]
-        payload = data[1] if len(data) > 1 else None
-
-        if DEBUG:
-            print("[WS MESSAGE]", event, payload)
-
-        # --- Load symbols dynamically ---
-        if event == "assets" and payload:
-            SYMBOLS.clear()
-            for asset in payload:
-                symbol_id = asset.get("symbol")
-                if symbol_id:
-                    SYMBOLS.append(symbol_id)
-                    # Initialize market_data for this symbol
-                    market_data[symbol_id]["candles"] = defaultdict(list)
-                    # Subscribe to candles automatically
-                    for tf, period in CANDLE_PERIODS.items():
-                        ws.send(f'42["subscribe",{{"type":"candles","asset":"{symbol_id}","period":{period}}}]')
-            print(f"[INFO] Loaded symbols dynamically: {SYMBOLS}")
-
-        # --- Update candles ---
-        if event == "candles" and payload:
-            symbol = payload.get("asset")
-            period = payload.get("period")
-            candle = payload
-            if symbol and period and candle:
-                # Map period back to timeframe string
-                tf = next((k for k, v in CANDLE_PERIODS.items() if v == period), str(period))
-                market_data[symbol]["candles"][tf].append(candle)
-                # Keep last 50 candles
-                if len(market_data[symbol]["candles"][tf]) > 50:
-                    market_data[symbol]["candles"][tf].pop(0)
-
-    except Exception as e:
-        print("[WS ERROR parsing message]", e)
-
-def on_close(ws, code, msg):
-    print("[CLOSE] WebSocket closed:", code, msg)
-
-def on_error(ws, error):
-    print("[ERROR]", error)
-
-def start_ws():
-    while True:
-        try:
-            ws = websocket.WebSocketApp(
-                PO_WS_URL,
-                on_open=on_open,
-                on_message=on_message,
-                on_close=on_close,
-                on_error=on_error,
-                header=["Origin: https://m.pocketoption.com"]
-            )
-            ws.run_forever()
-        except Exception as e:
-            print("[FATAL ERROR]", e)
-        print("⏳ Reconnecting in 5 seconds...")
-        time.sleep(5)
-
-# --- Auto-start if run standalone ---
-if __name__ == "__main__":
-    threading.Thread(target=start_ws, daemon=True).start()
-    try:
-        while True:
-            time.sleep(1)
-    except KeyboardInterrupt:
-        print("🛑 WebSocket stopped")
+# Rows kept per (asset, period) candle buffer and per asset tick buffer
+CANDLE_CAPACITY = int(os.getenv("CANDLE_CAPACITY", "500"))
+TICK_CAPACITY = int(os.getenv("TICK_CAPACITY", "1000"))
+
+# Closed candles are appended to one file per (asset, period) here and loaded
+# back on startup; unset (the default) disables the archive
+CANDLE_ARCHIVE_DIR = os.getenv("CANDLE_ARCHIVE_DIR") or None
+CANDLE_ARCHIVE_MAX_ROWS = int(os.getenv("CANDLE_ARCHIVE_MAX_ROWS", str(10 * CANDLE_CAPACITY)))  # per series
+
+# History requested for every enabled asset and period after connecting
+BACKFILL_ENABLED = os.getenv("BACKFILL_ENABLED", "True").lower() == "true"
+BACKFILL_CONCURRENCY = int(os.getenv("BACKFILL_CONCURRENCY", "4"))  # requests in flight
+BACKFILL_INTERVAL = float(os.getenv("BACKFILL_INTERVAL", "0.1"))    # seconds between request starts
+
+# Every inbound feed event is recorded to this log (see feed_recorder.py); empty disables
+FEED_RECORD_PATH = os.getenv("FEED_RECORD_PATH", "")
@@ -1,26 +1,103 @@
 import json
+from collections import Counter
 import time
-import threading
 import logging
-from collections import defaultdict
 from datetime import datetime, timezone
 
-import pandas as pd
-import socketio
-
-from credentials import sessionToken, uid, ACCOUNT_URL, currentUrl
-from strategy import analyze_candles
-from telegram_utils import send_telegram_message
-from config import TELEGRAM_CHAT_IDS
+from strategy import score_candles
+from telegram_utils import TelegramNotifier
+from alert_outbox import AlertOutbox
+from config import (
+    TELEGRAM_CHAT_IDS,
+    CANDLE_CAPACITY,
+    TICK_CAPACITY,
+    CANDLE_PERIODS as TIMEFRAME_PERIODS,
+    SUBSCRIBE_SERVER_CANDLES,
+    ANALYSIS_BACKEND,
+    SIGNAL_CACHE_SIZE,
+    MTF_TIMEFRAMES,
+    EVALUATION_MODE,
+    EVALUATION_WORKERS,
+    EVALUATION_QUEUE_SIZE,
+    BROADCAST_WINDOW,
+    BROADCAST_MAX_WINDOW,
+    ALERT_OUTBOX_PATH,
+    ALERT_OUTBOX_KEEP_DAYS,
+    CANDLE_ARCHIVE_DIR,
+    CANDLE_ARCHIVE_MAX_ROWS,
+    BACKFILL_ENABLED,
+    BACKFILL_CONCURRENCY,
+    BACKFILL_INTERVAL,
+    FEED_RECORD_PATH,
+    PO_IO_URL,
+    SUBSCRIBE_RATE,
+    SUBSCRIBE_BURST,
+)
+from candle_store import CandleStore, OPEN, CLOSE
+from candle_ingest import CandleIngestor
+from candle_archive import CandleArchive
+from backfill import Backfiller
+from feed_recorder import FeedRecorder
+from tick_aggregator import TickAggregator
+from indicators import IndicatorEngine
+from batch_analyzer import score_series_batch
+import strategy_np
+from signal_cache import SignalCache, DirtySet
+from mtf import BiasCache
+from event_pipeline import EvaluationPipeline
+from signal_broadcaster import SignalBroadcaster, UNIVERSE_ROOM
+from feed_hub import hub, quote_cache, CONNECT, ASSETS, TICK, CANDLE, HISTORY
+from subscription_manager import SubscriptionManager
 
 # Pocket Option Socket.IO URL
-POCKET_IO_URL = "https://events-po.com"
+POCKET_IO_URL = PO_IO_URL
+
+# Store incoming data for all assets and timeframes (bounded ring buffers)
+market_data = CandleStore(capacity=CANDLE_CAPACITY, tick_capacity=TICK_CAPACITY)
+
+# Upserts forming candles so each time bucket is stored once
+candle_ingestor = CandleIngestor(market_data)
 
-# Store incoming data for all assets and timeframes
-market_data = defaultdict(lambda: {"ticks": [], "candles": defaultdict(list)})
+# Closed candles persisted for warm starts, opened by open_candle_archive when CANDLE_ARCHIVE_DIR is set
+candle_archive = None
 
 # Supported candle periods in seconds
-CANDLE_PERIODS = [60, 180, 300]  # 1m, 3m, 5m
+CANDLE_PERIODS = sorted(TIMEFRAME_PERIODS.values())  # 1m, 3m, 5m
+
+# Builds candles for all periods from the tick stream
+tick_aggregator = TickAggregator(candle_ingestor, CANDLE_PERIODS)
+
+# Running indicator state, updated once per closed bar; the close mean covers the closed bars the store holds
+indicator_engine = IndicatorEngine(close_window=CANDLE_CAPACITY - 1)
+candle_ingestor.on_bar_closed(indicator_engine.on_bar_closed)
+
+# Series with a newly closed bar since the last sweep
+dirty_series = DirtySet()
+candle_ingestor.on_bar_closed(lambda asset, period, bar: dirty_series.mark((asset, int(period))))
+
+# Memoized analysis results; anything besides the candles that changes a result goes in the key
+signal_cache = SignalCache(maxsize=SIGNAL_CACHE_SIZE)
+ANALYSIS_PARAMS = (ANALYSIS_BACKEND, CANDLE_CAPACITY)
+
+# Higher-timeframe bias, computed once per closed higher-timeframe bar
+bias_cache = BiasCache(market_data)
+
+# Bar-close driven evaluation, created by start_fetching when EVALUATION_MODE=event
+evaluation_pipeline = None
+
+# Coalesces dashboard updates into one batch per window, created by start_fetching
+signal_broadcaster = None
+
+# Sends Telegram alerts from the background, rate limited and merged per chat
+telegram_notifier = TelegramNotifier()
+
+# Persists alerts until Telegram accepted them (None sends through the notifier directly)
+alert_outbox = AlertOutbox(
+    ALERT_OUTBOX_PATH, telegram_notifier, keep_sent=ALERT_OUTBOX_KEEP_DAYS * 86400
+) if ALERT_OUTBOX_PATH else None
+
+# Dashboard updates sent vs. suppressed because (signal, confidence) did not change
+signal_stats = Counter()
 
 # Dynamic symbols
 symbols = []
@@ -28,8 +105,15 @@ symbols = []
 # Socket.IO instance injected from app.py
 socketio_instance = None
 
-# Python-socketio client
-sio = socketio.Client(logger=False, engineio_logger=False, reconnection=True, reconnection_attempts=0, reconnection_delay=5)
+# Dashboard SignalStore injected by start_fetching
+signal_store_instance = None
+
+# (symbol, timeframe) pairs that already have a signal; evict_asset clears an asset's pairs
+published_signals = set()
+
+# The shared feed connection (feed_hub.hub); sio is its client, kept for the feed recorder
+feed = hub
+sio = hub.sio
 
 
 def update_symbols(new_symbols):
@@ -37,47 +121,102 @@ def update_symbols(new_symbols):
     symbols = new_symbols
     logging.info(f"[SYMBOLS] Updated dynamic symbols: {symbols}")
     if socketio_instance:
-        socketio_instance.emit("symbols_update", {"symbols": symbols})
-
-
-@sio.event
-def connect():
-    logging.info("[CONNECT] Connected to Pocket Option Socket.IO")
-
-    # Step 1: Authenticate
-    auth_payload = {
-        "sessionToken": sessionToken,
-        "uid": uid,
-        "lang": "en",
-        "currentUrl": currentUrl,
-        "isChart": 1
-    }
-    sio.emit("auth", auth_payload)
-    logging.info("[AUTH] Auth message sent ✅")
-
-    # Step 2: Request assets list after short delay
-    time.sleep(0.5)
-    sio.emit("assets/get-assets", {})
-    logging.info("[REQUEST] Requested assets list ✅")
-
+        socketio_instance.emit("symbols_update", {"symbols": symbols}, to=UNIVERSE_ROOM)
 
-@sio.event
-def disconnect():
-    logging.warning("[DISCONNECT] Connection closed")
 
+def merge_history(asset, period, candles):
+    """
+    Merge backfilled candles into the store and rebuild what depends on them.
 
-@sio.on("assets")
-def handle_assets(data):
-    """Receive assets list from Pocket Option and subscribe to ticks/candles."""
+    :return: number of history candles added
+    """
+    period = int(period)
+    if asset not in subscriptions.active:
+        return 0  # delisted while the request was in flight; series() would re-create its buffers
+    # Live bars close under the same series lock, so none lands between the
+    # merge and the indicator rebuild (lost) or is replayed twice
+    with market_data.series(asset, period).lock:
+        added = candle_ingestor.merge_history(asset, period, candles)
+        if not added:
+            return 0
+
+        closed = market_data.closed_candles(asset, period)
+        indicator_engine.reset(asset, period)
+        for row in closed:
+            indicator_engine.on_bar_closed(asset, period, row)
+    if candle_archive is not None:
+        # Live bars closed while the request was in flight are archived already; append would skip the older rows
+        candle_archive.on_history(asset, period, closed)
+
+    # Earlier bars changed, so results cached for the same last bar are stale
+    signal_cache.discard_prefix((asset, period))
+    bias_cache.discard(asset)
+    dirty_series.mark((asset, period))
+    if evaluation_pipeline is not None and len(closed):
+        evaluation_pipeline.on_bar_closed(asset, period, closed[-1])
+    return added
+
+
+# Requests candle history for every asset and period after the assets list arrives
+backfiller = Backfiller(feed.emit, merge_history, concurrency=BACKFILL_CONCURRENCY,
+                        interval=BACKFILL_INTERVAL, bars=CANDLE_CAPACITY)
+feed.subscribe(HISTORY, backfiller.handle_response)
+
+
+def evict_asset(asset):
+    """Free everything kept for an asset that left the universe."""
+    market_data.drop_asset(asset)
+    tick_aggregator.drop(asset)
+    quote_cache.drop(asset)
+    for period in CANDLE_PERIODS:
+        indicator_engine.reset(asset, period)
+        signal_cache.discard_prefix((asset, period))
+        candle_ingestor.gaps.pop((asset, period), None)
+    bias_cache.discard(asset)
+    backfiller.progress.pop(asset, None)
+    if candle_archive is not None:
+        candle_archive.close(asset)
+    if signal_store_instance is not None:
+        signal_broadcaster.remove(signal_store_instance, asset)
+    # A re-listed asset gets its default HOLD row again
+    published_signals.difference_update([key for key in list(published_signals) if key[0] == asset])
+
+
+# Ticks (and server candles if enabled) per active asset, paced after every assets refresh
+subscriptions = SubscriptionManager(
+    feed.emit,
+    periods=CANDLE_PERIODS if SUBSCRIBE_SERVER_CANDLES else (),
+    rate=SUBSCRIBE_RATE,
+    burst=SUBSCRIBE_BURST,
+    on_removed=evict_asset,
+).start()
+# Set on every connect: the next assets list backfills the whole universe
+backfill_on_assets = False
+# Assets loaded by hydrate_from_archive; the first assets list evicts those no longer listed
+hydrated_assets = set()
+
+
+@feed.subscribe(CONNECT)
+def handle_connect():
+    """A new connection starts without subscriptions and with the downtime missing from every series."""
+    global backfill_on_assets
+    subscriptions.reset()
+    backfill_on_assets = True
+
+
+@feed.subscribe(ASSETS)
+def handle_assets(assets):
+    """Receive assets list from Pocket Option and subscribe to ticks (and optionally candles)."""
+    global backfill_on_assets, hydrated_assets
     try:
         # 🔎 Raw assets payload (visible only at DEBUG level)
         try:
-            logging.debug("[EVENT] Raw assets payload: %s", json.dumps(data, ensure_ascii=False)[:2000])
+            logging.debug("[EVENT] Raw assets payload: %s", json.dumps(assets.raw, ensure_ascii=False)[:2000])
         except Exception:
-            logging.debug("[EVENT] Raw assets payload (repr): %r", data)
+            logging.debug("[EVENT] Raw assets payload (repr): %r", assets.raw)
+
+        enabled_assets = assets.symbols
 
-        enabled_assets = [a.get("symbol") for a in data if a.get("enabled") and a.get("symbol")]
-        
         if not enabled_assets:
             logging.warning("[EVENT] No enabled assets found.")
             return
@@ -85,52 +224,83 @@ def handle_assets(data):
         update_symbols(enabled_assets)
         logging.info(f"[EVENT] Assets loaded: {len(enabled_assets)}")
 
-        # Subscribe to ticks and candles for each asset
-        for asset in enabled_assets:
-            try:
-                sio.emit("subscribe", {"type": "ticks", "asset": asset})
-                for period in CANDLE_PERIODS:
-                    sio.emit("subscribe", {"type": "candles", "asset": asset, "period": period})
-            except Exception as sub_err:
-                logging.error(f"[ERROR] Subscription failed for {asset}: {sub_err}")
+        # Only the difference to the active set is (un)subscribed, paced by the manager
+        added, removed = subscriptions.update(enabled_assets)
+        # Archived series of delisted assets were never subscribed, so update() does not evict them
+        for asset in hydrated_assets.difference(enabled_assets):
+            evict_asset(asset)
+        hydrated_assets = set()
 
-        logging.info(f"[SUBSCRIBE] Subscribed to {len(enabled_assets)} assets 🔥")
+        # After a (re)connect every active asset missed the downtime; later refreshes only need the new ones
+        to_backfill = subscriptions.active if backfill_on_assets else added
+        backfill_on_assets = False
+        if BACKFILL_ENABLED and to_backfill:
+            backfiller.start(sorted(to_backfill), CANDLE_PERIODS)
 
     except Exception as e:
         logging.error(f"[ERROR] Failed to handle assets: {e}")
 
-@sio.on("ticks")
-def handle_ticks(data):
-    try:
-        asset = data["asset"]
-        tick = {"time": data["time"], "price": data["price"]}
-        market_data[asset]["ticks"].append(tick)
-    except Exception as e:
-        logging.error(f"[ERROR] Failed to parse tick: {e}")
+@feed.subscribe(TICK)
+def handle_ticks(tick):
+    if tick.asset not in subscriptions.active:
+        return  # in flight from before an unsubscribe; would re-create evicted buffers
+    market_data.append_tick(tick.asset, tick.time, tick.price)
+    if not SUBSCRIBE_SERVER_CANDLES:
+        tick_aggregator.add_tick(tick.asset, tick.time, tick.price)
 
 
-@sio.on("candles")
-def handle_candles(data):
-    try:
-        asset = data["asset"]
-        period = data["period"]
-        candle = {
-            "time": data["time"],
-            "open": data["open"],
-            "high": data["high"],
-            "low": data["low"],
-            "close": data["close"],
-            "volume": data["volume"],
-        }
-        market_data[asset]["candles"][period].append(candle)
-    except Exception as e:
-        logging.error(f"[ERROR] Failed to parse candle: {e}")
+@feed.subscribe(CANDLE)
+def handle_candles(candle):
+    if candle.asset not in subscriptions.active:
+        return
+    # Candle fields after period are already in CANDLE_COLUMNS order
+    bucket = float(int(candle.time) // candle.period * candle.period)
+    candle_ingestor.ingest_row(candle.asset, candle.period, (bucket,) + candle[3:])
+
+
+# Records the inbound feed when FEED_RECORD_PATH is set (attached by run_feed)
+feed_recorder = None
+
+
+def run_feed(url=POCKET_IO_URL):
+    """Connect the shared feed and block; python-socketio reconnects on its own."""
+    global feed_recorder
+    if FEED_RECORD_PATH and feed_recorder is None:
+        feed_recorder = FeedRecorder(FEED_RECORD_PATH).attach(sio)
+    feed.run(url)
 
 
 def get_market_data():
     return market_data
 
 
+def open_candle_archive():
+    """
+    Create the candle archive and start its writer once, if CANDLE_ARCHIVE_DIR is set.
+
+    :return: the CandleArchive, or None when archiving is disabled
+    """
+    global candle_archive
+    if candle_archive is None and CANDLE_ARCHIVE_DIR:
+        candle_archive = CandleArchive(CANDLE_ARCHIVE_DIR, max_rows=CANDLE_ARCHIVE_MAX_ROWS).start()
+        candle_ingestor.on_bar_closed(candle_archive.on_bar_closed)
+    return candle_archive
+
+
+def hydrate_from_archive():
+    """
+    Load archived candles into the store and indicator state; call before the feed connects.
+
+    :return: number of series loaded
+    """
+    if open_candle_archive() is None:
+        return 0
+    loaded = candle_archive.hydrate(market_data, on_closed=indicator_engine.on_bar_closed)
+    hydrated_assets.update(asset for asset, _ in loaded)
+    logging.info(f"[ARCHIVE] Hydrated {len(loaded)} series ({sum(loaded.values())} candles) from {CANDLE_ARCHIVE_DIR}")
+    return len(loaded)
+
+
 def get_dynamic_symbols(wait_for_symbols=True):
     global symbols
     if wait_for_symbols:
@@ -145,86 +315,245 @@ def tf_to_seconds(tf):
     return int(tf[:-1]) * 60
 
 
-def start_fetching(timeframes, socketio_from_app, latest_signals):
+def score_series(symbol, period):
     """
-    Continuously analyze signals from candles & emit updates to dashboard via SocketIO.
+    Score the closed candles of one symbol/period with the configured backend.
+
+    :return: unconfirmed (raw_signal, confidence), or None below 50 candles
     """
-    global socketio_instance
-    socketio_instance = socketio_from_app
+    if ANALYSIS_BACKEND == "incremental":
+        # Consistent copy: the feed thread may be folding the next bar in meanwhile
+        snapshot = indicator_engine.snapshot(symbol, period)
+        return snapshot.score() if snapshot else None
 
-    while True:
-        current_symbols = get_dynamic_symbols()
-        for symbol in current_symbols:
-            for tf in timeframes:
-                candles = market_data[symbol]["candles"].get(tf_to_seconds(tf), [])
-                
-                if not candles:
-                    # Emit a default HOLD signal for symbols without candles yet
-                    signal_data = {
-                        "symbol": symbol,
-                        "signal": "HOLD",
-                        "confidence": 0,
-                        "time": datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S"),
-                        "timeframe": tf
-                    }
-                    # Update latest_signals
-                    latest_signals[:] = [s for s in latest_signals if not (s["symbol"] == symbol and s["timeframe"] == tf)]
-                    latest_signals.append(signal_data)
-                    socketio_from_app.emit("new_signal", signal_data)
-                    continue
-
-                df = pd.DataFrame(candles)
-                result = analyze_candles(df)
-
-                if isinstance(result, tuple):
-                    signal_value, confidence = result
-                else:
-                    signal_value = result
-                    confidence = 100
-
-                signal_data = {
-                    "symbol": symbol,
-                    "signal": signal_value if signal_value else "HOLD",
-                    "confidence": confidence,
-                    "time": datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S"),
-                    "timeframe": tf
-                }
-
-                # Update latest_signals
-                latest_signals[:] = [s for s in latest_signals if not (s["symbol"] == symbol and s["timeframe"] == tf)]
-                latest_signals.append(signal_data)
-
-                # Emit to frontend
-                socketio_from_app.emit("new_signal", signal_data)
-
-                # Telegram alerts
-                if signal_value in ["BUY", "SELL"]:
-                    for chat_id in TELEGRAM_CHAT_IDS:
-                        if chat_id:
-                            try:
-                                send_telegram_message(chat_id, f"{symbol} {tf} signal: {signal_value} ({confidence}%)")
-                            except Exception as e:
-                                logging.error(f"[TELEGRAM ERROR] {e}")
+    if ANALYSIS_BACKEND == "numpy":
+        rows = market_data.closed_candles(symbol, period)
+        return strategy_np.score_candles(rows[:, OPEN:CLOSE + 1])
 
-        time.sleep(5)
+    return score_candles(market_data.frame(symbol, period, closed=True))
 
 
-def run_socketio():
-    try:
-        logging.info("🔌 Connecting to Pocket Option Socket.IO...")
-        sio.connect(POCKET_IO_URL, transports=["websocket"], headers={"Origin": "https://m.pocketoption.com"})
-        sio.wait()
-    except Exception as e:
-        logging.error(f"[FATAL ERROR] {e}")
-        logging.info("⏳ Reconnecting in 5 seconds...")
-        time.sleep(5)
-        run_socketio()
+def analyze_timeframe(symbols_to_scan, tf):
+    """
+    Analyze many symbols on one timeframe, reusing cached results.
+
+    Only closed candles are analyzed, so a raw score stays valid until the
+    next bar closes and is cached under (symbol, period, last closed bar time,
+    ANALYSIS_PARAMS). With ANALYSIS_BACKEND=batch all cache misses are scored
+    in one vectorized pass, otherwise each goes through score_series.
+    Scores are then confirmed against the cached higher-timeframe biases
+    configured in MTF_TIMEFRAMES.
+
+    :return: dict symbol -> (has_data, result, bar_time); has_data is False until
+             the first bar has closed, result is what strategy.analyze_candles returns
+             and bar_time is the start of the last closed bar it was computed on
+    """
+    period = tf_to_seconds(tf)
+    mid_tf, high_tf = MTF_TIMEFRAMES.get(tf, (None, None))
+    mid_period = tf_to_seconds(mid_tf) if mid_tf else None
+    high_period = tf_to_seconds(high_tf) if high_tf else None
+
+    scores = {}
+    misses = {}
+    bar_times = {}
+    for symbol in symbols_to_scan:
+        last_closed = market_data.last_closed_time(symbol, period)
+        if last_closed is None:
+            continue
+        bar_times[symbol] = last_closed
+        key = (symbol, period, last_closed, ANALYSIS_PARAMS)
+        cached = signal_cache.get(key)
+        if cached is SignalCache.MISS:
+            misses[symbol] = key
+        else:
+            scores[symbol] = cached
+
+    if misses:
+        if ANALYSIS_BACKEND == "batch":
+            # Open/high/low/close columns of each closed series
+            series = {
+                symbol: market_data.closed_candles(symbol, period)[:, OPEN:CLOSE + 1]
+                for symbol in misses
+            }
+            computed = score_series_batch(series)
+        else:
+            computed = {symbol: score_series(symbol, period) for symbol in misses}
+
+        for symbol, key in misses.items():
+            signal_cache.put(key, computed[symbol])
+            scores[symbol] = computed[symbol]
+
+    results = {}
+    for symbol in symbols_to_scan:
+        if symbol not in scores:
+            results[symbol] = (False, None, None)
+        else:
+            confirmed = bias_cache.confirm(symbol, scores[symbol], mid_period, high_period)
+            results[symbol] = (True, confirmed, bar_times[symbol])
+    return results
+
+
+def get_analysis_stats():
+    """Cache hit/miss counters, pending dirty series and pipeline latency, for monitoring."""
+    stats = {
+        "cache": signal_cache.stats(),
+        "bias_cache": bias_cache.stats(),
+        "dirty_series": len(dirty_series),
+        "candles": dict(candle_ingestor.stats),
+        "evaluation_mode": EVALUATION_MODE,
+    }
+    stats["signals"] = dict(signal_stats)
+    if evaluation_pipeline is not None:
+        stats["pipeline"] = evaluation_pipeline.stats()
+    if signal_broadcaster is not None:
+        stats["broadcast"] = signal_broadcaster.stats()
+    stats["telegram"] = telegram_notifier.stats()
+    if alert_outbox is not None:
+        stats["outbox"] = alert_outbox.stats()
+    if candle_archive is not None:
+        stats["archive"] = candle_archive.stats()
+    stats["backfill"] = backfiller.stats()
+    stats["feed"] = feed.stats()
+    stats["subscriptions"] = subscriptions.stats()
+    return stats
+
+
+def publish_signal(symbol, tf, has_data, result, broadcaster, signal_store, bar_time=None, closed_at=None):
+    """
+    Store one analysis result, queue it for the dashboard and send Telegram alerts.
+
+    A result with the same (signal, confidence) as the stored one is not
+    stored or emitted again.
+
+    :param has_data: False emits a default HOLD for a symbol without closed candles yet
+    :param broadcaster: SignalBroadcaster batching the Socket.IO updates
+    :param signal_store: SignalStore the dashboard reads from
+    :param result: analyze_candles-style result: {"signal": "buy"/"sell"/None, "confidence": int}
+    :param bar_time: start of the closed bar the result was computed on; alerts need it
+        as part of their idempotency key and are not queued without it
+    :param closed_at: time.monotonic() of the bar close that triggered the evaluation,
+        for the broadcaster's bar close to emit latency
+    """
+    if has_data and result and result["signal"]:
+        signal_value = result["signal"].upper()
+        confidence = result["confidence"]
+    else:
+        signal_value = None
+        confidence = 0
+
+    signal_data = {
+        "symbol": symbol,
+        "signal": signal_value if signal_value else "HOLD",
+        "confidence": confidence,
+        "time": datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S"),
+        "timeframe": tf
+    }
+
+    previous = signal_store.get(symbol, tf)
+    if previous and (previous["signal"], previous["confidence"]) == (signal_data["signal"], confidence):
+        signal_stats["suppressed"] += 1
+    else:
+        # Update the dashboard signal store and queue the change for the frontend
+        broadcaster.publish(signal_store, signal_data, closed_at=closed_at)
+        signal_stats["published"] += 1
+
+    # Telegram alerts (queued, never blocks the analysis)
+    if signal_value in ["BUY", "SELL"]:
+        send_alert(symbol, tf, signal_value, f"{symbol} {tf} signal: {signal_value} ({confidence}%)", bar_time)
+
+
+def send_alert(symbol, tf, direction, text, bar_time=None):
+    """
+    Queue a Telegram alert to every chat in TELEGRAM_CHAT_IDS; never blocks.
+
+    :param bar_time: start of the bar the alert is about; with the outbox it is part
+        of the idempotency key and alerts without it are counted and dropped
+    :return: True if the alert was queued
+    """
+    if alert_outbox is None:
+        for chat_id in TELEGRAM_CHAT_IDS:
+            if chat_id:
+                telegram_notifier.notify(chat_id, text)
+        return True
+    if bar_time is None:
+        signal_stats["alerts_without_bar"] += 1
+        return False
+    alert_outbox.enqueue(symbol, tf, bar_time, direction, TELEGRAM_CHAT_IDS, text)
+    return True
+
+
+def start_event_pipeline(timeframes, broadcaster, signal_store, published):
+    """
+    Evaluate each (symbol, timeframe) from a worker pool as soon as its bar closes.
+
+    :param published: set of (symbol, timeframe) pairs that already have a signal
+
+    :return: the started EvaluationPipeline
+    """
+    global evaluation_pipeline
+    period_timeframes = {tf_to_seconds(tf): tf for tf in timeframes}
+
+    def evaluate(symbol, period, closed_at):
+        tf = period_timeframes.get(period)
+        if tf is None or symbol not in symbols:
+            return False
+        has_data, result, bar_time = analyze_timeframe([symbol], tf)[symbol]
+        published.add((symbol, tf))
+        publish_signal(symbol, tf, has_data, result, broadcaster, signal_store, bar_time, closed_at)
+
+    evaluation_pipeline = EvaluationPipeline(evaluate, workers=EVALUATION_WORKERS, maxsize=EVALUATION_QUEUE_SIZE)
+    candle_ingestor.on_bar_closed(evaluation_pipeline.on_bar_closed)
+    evaluation_pipeline.start()
+    return evaluation_pipeline
+
 
+def start_fetching(timeframes, socketio_from_app, signal_store, client_rooms=None):
+    """
+    Continuously analyze signals from candles & emit updates to dashboard via SocketIO.
+
+    ``client_rooms`` (a ClientRooms kept by the app's Socket.IO handlers) lets
+    the broadcaster send each client only the signals of its rooms.
+
+    Only series that received a closed bar since the last sweep (plus newly
+    listed symbols) are evaluated; everything else keeps its last signal.
+    With EVALUATION_MODE=event closed bars are evaluated by the event
+    pipeline instead and the sweep only publishes newly listed symbols.
+    """
+    global socketio_instance, signal_broadcaster, signal_store_instance
+    socketio_instance = socketio_from_app
+    signal_store_instance = signal_store
+    signal_broadcaster = SignalBroadcaster(
+        socketio_from_app, window=BROADCAST_WINDOW, max_window=BROADCAST_MAX_WINDOW, clients=client_rooms
+    ).start()
+    telegram_notifier.start()
+    if alert_outbox is not None:
+        alert_outbox.start()
+    open_candle_archive()
 
-def start_data_fetcher():
-    t = threading.Thread(target=run_socketio, daemon=True)
-    t.start()
+    published = published_signals
 
+    event_mode = EVALUATION_MODE == "event"
+    if event_mode:
+        start_event_pipeline(timeframes, signal_broadcaster, signal_store, published)
 
-if __name__ == "__main__":
-    start_data_fetcher()
+    while True:
+        current_symbols = get_dynamic_symbols()
+        dirty = dirty_series.drain()
+        if event_mode:
+            dirty = set()  # handled by the pipeline workers
+        for tf in timeframes:
+            period = tf_to_seconds(tf)
+            to_scan = [
+                symbol for symbol in current_symbols
+                if (symbol, period) in dirty or (symbol, tf) not in published
+            ]
+            if not to_scan:
+                continue
+
+            results = analyze_timeframe(to_scan, tf)
+            for symbol in to_scan:
+                has_data, result, bar_time = results[symbol]
+                published.add((symbol, tf))
+                publish_signal(symbol, tf, has_data, result, signal_broadcaster, signal_store, bar_time)
+
+        time.sleep(5)
@@ -0,0 +1,121 @@
+"""
+Vectorized exponential moving average.
+
+The EMA recurrence ``ema[t] = alpha * x[t] + (1 - alpha) * ema[t-1]`` with
+``ema[0] = x[0]`` is evaluated block-recursively: the series is cut into
+blocks of ``BLOCK`` bars, all blocks are filtered at once with one
+lower-triangular matrix product, and only the carry between blocks is
+propagated sequentially, so the Python loop runs once per block instead of
+once per bar. Blocks are short enough that the decay powers never
+underflow, which keeps the result equal to the sequential loop up to
+floating-point rounding.
+
+NaN or inf would leak backwards through the matrix product (0 * NaN is
+NaN), so a series is only filtered block-wise up to its first non-finite
+value; from there on the plain recurrence is applied, as in the loop.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+BLOCK = 64
+
+
+@lru_cache(maxsize=64)
+def _block_kernel(alpha, block):
+    """
+    Return (weights, carry_decay) for one block.
+
+    weights[j, i] = alpha * (1 - alpha) ** (i - j) for j <= i, so
+    ``x_block @ weights`` applies the recurrence inside the block;
+    carry_decay[i] = (1 - alpha) ** (i + 1) propagates the previous EMA value.
+    """
+    decay = 1.0 - alpha
+    lags = np.arange(block)[None, :] - np.arange(block)[:, None]
+    weights = np.where(lags >= 0, alpha * decay ** np.clip(lags, 0, None), 0.0)
+    carry_decay = decay ** np.arange(1, block + 1)
+    weights.flags.writeable = False
+    carry_decay.flags.writeable = False
+    return weights, carry_decay
+
+
+def ema_alpha(values, alpha, block=BLOCK):
+    """EMA with smoothing factor ``alpha`` along the last axis of ``values``."""
+    values = np.asarray(values, dtype=float)
+    n = values.shape[-1]
+    if n == 0:
+        return np.empty_like(values)
+
+    if not np.isfinite(values).all():
+        return _ema_nonfinite(values, alpha, block)
+
+    weights, carry_decay = _block_kernel(float(alpha), block)
+    lead = values.shape[:-1]
+    blocks = -(-n // block)
+
+    # Zero padding at the end only affects outputs that are cut off again
+    padded = np.zeros(lead + (blocks * block,))
+    padded[..., :n] = values
+    padded = padded.reshape(lead + (blocks, block))
+
+    # Every block at once as if it started from a zero EMA...
+    out = padded @ weights
+
+    # ...then carry each block's last value into the next one. Seeding the
+    # carry with x[0] makes the first output exactly x[0].
+    block_decay = carry_decay[-1]
+    local_last = out[..., -1]
+    if not lead:
+        # Single series: the scan over blocks is cheapest on plain floats
+        carry = float(values[0])
+        carries = []
+        for last in local_last.tolist():
+            carries.append(carry)
+            carry = last + carry * block_decay
+        carries = np.array(carries)
+    else:
+        carries = np.empty(lead + (blocks,))
+        carry = values[..., 0]
+        for b in range(blocks):
+            carries[..., b] = carry
+            carry = local_last[..., b] + carry * block_decay
+
+    out += carries[..., None] * carry_decay
+    return out.reshape(lead + (blocks * block,))[..., :n]
+
+
+def _ema_nonfinite(values, alpha, block):
+    """Block filter up to the first NaN/inf of each series, the sequential recurrence after it."""
+    n = values.shape[-1]
+    flat = values.reshape(-1, n)
+    out = np.empty_like(flat)
+    for row, series in enumerate(flat):
+        first = int(np.argmin(np.isfinite(series))) if not np.isfinite(series).all() else n
+        out[row, :first] = ema_alpha(series[:first], alpha, block)
+        prev = out[row, first - 1] if first else series[0]
+        with np.errstate(invalid="ignore", over="ignore"):  # inf * 0 is NaN, as in the loop
+            for i in range(first, n):
+                prev = series[i] if i == 0 else series[i] * alpha + prev * (1 - alpha)
+                out[row, i] = prev
+    return out.reshape(values.shape)
+
+
+def ema(values, period):
+    """
+    EMA of ``values`` with ``alpha = 2 / (period + 1)`` along the last axis.
+
+    Matches strategy.calculate_ema and pandas ``ewm(span=period, adjust=False)``.
+    Works on a 1-D series or on a 2-D array of series (one per row).
+    """
+    return ema_alpha(values, 2 / (period + 1))
+
+
+def ema_many(values, periods):
+    """
+    EMAs for several periods in one call.
+
+    :return: array of shape (len(periods),) + values.shape
+    """
+    values = np.asarray(values, dtype=float)
+    return np.stack([ema(values, period) for period in periods])
@@ -0,0 +1,138 @@
+"""
+Event-driven evaluation triggered on candle close.
+
+The candle ingestor publishes a "bar closed" event for each (symbol, period);
+EvaluationPipeline queues it in a bounded queue and a small worker pool
+evaluates only that series. A series is evaluated by one worker at a time:
+it stays pending until its evaluation finished, and a bar closing meanwhile
+queues it once more afterwards. The time from bar close to the end of the
+evaluation is recorded per event ("bar_close_to_publish"); the evaluation
+passes the close time on to the SignalBroadcaster, which records the full
+bar close to dashboard emit latency.
+"""
+
+import logging
+import queue
+import threading
+import time
+from collections import deque, namedtuple
+
+BarEvent = namedtuple("BarEvent", ["symbol", "period", "bar_time", "closed_at"])
+
+
+class LatencyStats:
+    """Rolling latency samples (seconds) with percentile summaries."""
+
+    def __init__(self, window=5000):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.count = 0
+
+    def record(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+            self.count += 1
+
+    def summary(self):
+        """Return count and p50/p95/p99/max in milliseconds over the recent window."""
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return {"count": self.count}
+
+        def pct(p):
+            return round(samples[min(len(samples) - 1, int(p * len(samples)))] * 1000, 3)
+
+        return {
+            "count": self.count,
+            "p50_ms": pct(0.50),
+            "p95_ms": pct(0.95),
+            "p99_ms": pct(0.99),
+            "max_ms": round(samples[-1] * 1000, 3),
+        }
+
+
+class EvaluationPipeline:
+    def __init__(self, evaluate, workers=4, maxsize=10000):
+        """
+        :param evaluate: callable(symbol, period, closed_at) that analyzes and publishes one series,
+                         closed_at being the time.monotonic() of the bar close;
+                         returning False marks the event as ignored (no latency sample)
+        :param workers: number of worker threads
+        :param maxsize: queue bound; events beyond it are dropped and counted
+        """
+        self.evaluate = evaluate
+        self.workers = workers
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.latency = LatencyStats()
+        self.dropped = 0
+        self.coalesced = 0
+        self.errors = 0
+        self._pending = set()  # (symbol, period) queued or being evaluated
+        self._running = set()  # (symbol, period) being evaluated
+        self._again = {}  # (symbol, period) -> BarEvent of a bar closed during its evaluation
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def on_bar_closed(self, symbol, period, bar):
+        """CandleIngestor bar-closed listener: enqueue without blocking the feed."""
+        key = (symbol, int(period))
+        event = BarEvent(symbol, int(period), float(bar[0]), time.monotonic())
+        with self._lock:
+            if key in self._running and key not in self._again:
+                # The running evaluation may have read the previous bar: evaluate again once it finished
+                self._again[key] = event
+                return
+            if key in self._pending:
+                # The queued evaluation (or the one after the running one) will read the newest bar anyway
+                self.coalesced += 1
+                return
+            self._pending.add(key)
+        self._enqueue(event)
+
+    def _enqueue(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except queue.Full:
+            with self._lock:
+                self._pending.discard((event.symbol, event.period))
+            self.dropped += 1
+            logging.warning(f"[PIPELINE] Queue full, dropped bar event {event.symbol} {event.period}s")
+
+    def start(self):
+        for i in range(self.workers):
+            t = threading.Thread(target=self._run, name=f"eval-worker-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        logging.info(f"[PIPELINE] Started {self.workers} evaluation workers")
+
+    def _run(self):
+        while True:
+            event = self.queue.get()
+            key = (event.symbol, event.period)
+            with self._lock:
+                self._running.add(key)
+            try:
+                if self.evaluate(event.symbol, event.period, event.closed_at) is not False:
+                    self.latency.record(time.monotonic() - event.closed_at)
+            except Exception as e:
+                self.errors += 1
+                logging.error(f"[PIPELINE] Evaluation failed for {event.symbol} {event.period}s: {e}")
+            finally:
+                with self._lock:
+                    self._running.discard(key)
+                    again = self._again.pop(key, None)
+                    if again is None:
+                        self._pending.discard(key)
+                if again is not None:
+                    self._enqueue(again)  # still pending, so no other worker picks the key up first
+                self.queue.task_done()
+
+    def stats(self):
+        return {
+            "queued": self.queue.qsize(),
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "errors": self.errors,
+            "bar_close_to_publish": self.latency.summary(),
+        }
@@ -0,0 +1,212 @@
+# feed_hub.py
+"""
+One shared Pocket Option feed connection with in-process fan-out.
+
+FeedHub owns the only authenticated Socket.IO client. Each inbound frame is
+parsed once into a typed record and handed to every subscriber of its topic:
+
+    hub.subscribe(TICK, on_tick)                   # Tick(asset, time, price)
+    hub.subscribe(CANDLE, on_candle)               # Candle(asset, period, time, open, high, low, close, volume)
+    hub.subscribe(ASSETS, on_assets)               # AssetList(symbols, raw)
+    hub.subscribe(HISTORY, backfiller.handle_response)
+
+The latest price per asset is kept by ``quote_cache``, itself a TICK
+subscriber. Upstream ``subscribe`` / ``unsubscribe`` frames are not tracked
+here: they are sent through :meth:`FeedHub.emit` by a SubscriptionManager
+(see data_fetcher), which also queues them again on every CONNECT.
+"""
+
+import logging
+import threading
+import time
+from collections import Counter, defaultdict
+
+import socketio
+
+from backfill import HISTORY_EVENT
+from config import PO_IO_URL
+from credentials import sessionToken, uid, currentUrl
+from frame_decoder import Tick, Candle, AssetList, parse_tick, parse_candle, parse_assets
+
+# --- Topics ---
+CONNECT = "connect"
+DISCONNECT = "disconnect"
+AUTHENTICATED = "authenticated"
+ASSETS = "assets"
+TICK = "tick"
+CANDLE = "candle"
+HISTORY = "history"
+RAW = "*"  # (event, data) for events without a typed record
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Linux; Android 10; K) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Mobile Safari/537.36",
+    "Origin": "https://m.pocketoption.com",
+    "Pragma": "no-cache",
+    "Cache-Control": "no-cache",
+}
+
+
+class FeedHub:
+    def __init__(self, url=PO_IO_URL, auth=None, headers=HEADERS, reconnect_delay=5):
+        """
+        :param url: Socket.IO endpoint of the feed
+        :param auth: payload of the ``auth`` event sent on every connect
+        :param reconnect_delay: seconds between attempts when connecting fails
+        """
+        self.url = url
+        self.auth = auth
+        self.headers = headers
+        self.reconnect_delay = reconnect_delay
+        self.sio = socketio.Client(logger=False, engineio_logger=False, reconnection=True,
+                                   reconnection_attempts=0, reconnection_delay=reconnect_delay)
+        self._subscribers = defaultdict(list)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._assets_requested = None  # connection number the assets list was requested on
+        self.frames = Counter()
+        self.errors = 0
+        self.connections = 0
+
+        self.sio.on("connect", self._on_connect)
+        self.sio.on("disconnect", self._on_disconnect)
+        self.sio.on("auth/success", self._on_auth_success)
+        self.sio.on("assets", self._typed(ASSETS, parse_assets))
+        self.sio.on("ticks", self._typed(TICK, parse_tick))
+        self.sio.on("candles", self._typed(CANDLE, parse_candle))
+        self.sio.on(HISTORY_EVENT, self._typed(HISTORY, lambda data: data))
+        self.sio.on("*", self._on_other)
+
+    # --- Subscribers ---
+    def subscribe(self, topic, callback=None):
+        """
+        Call ``callback(record)`` for every event of ``topic``.
+
+        Without ``callback`` this works as a decorator, like ``sio.on``.
+        """
+        if callback is None:
+            return lambda f: self.subscribe(topic, f)
+        self._subscribers[topic].append(callback)
+        return callback
+
+    def unsubscribe(self, topic, callback):
+        try:
+            self._subscribers[topic].remove(callback)
+        except ValueError:
+            pass
+
+    def publish(self, topic, *args):
+        for callback in self._subscribers.get(topic, ()):
+            try:
+                callback(*args)
+            except Exception as e:
+                self.errors += 1
+                logging.error(f"[HUB] {topic} subscriber {getattr(callback, '__name__', callback)} failed: {e}")
+
+    def _typed(self, topic, parse):
+        def handler(data=None):
+            self.frames[topic] += 1
+            try:
+                record = parse(data)
+            except (KeyError, TypeError, ValueError, AttributeError) as e:
+                self.errors += 1
+                logging.error(f"[HUB] Malformed {topic} event: {e}")
+                return
+            self.publish(topic, record)
+        handler.__name__ = f"on_{topic}"
+        return handler
+
+    def _on_other(self, event, data=None):
+        self.frames[RAW] += 1
+        self.publish(RAW, event, data)
+
+    # --- Connection ---
+    def _on_connect(self):
+        self.connections += 1
+        logging.info("[HUB] Connected to Pocket Option Socket.IO")
+        if self.auth:
+            self.sio.emit("auth", self.auth)
+            # Don't depend on the server confirming auth before asking for assets
+            threading.Timer(1.0, self._request_assets, args=(self.connections,)).start()
+        else:
+            self._request_assets(self.connections)
+        self.publish(CONNECT)
+
+    def _on_auth_success(self, data=None):
+        logging.info("[HUB] Authenticated ✅")
+        self.publish(AUTHENTICATED, data)
+        self._request_assets(self.connections)
+
+    def _request_assets(self, connection):
+        with self._lock:
+            if self._assets_requested == connection or not self.sio.connected:
+                return
+            self._assets_requested = connection
+        self.sio.emit("assets/get-assets", {})
+
+    def _on_disconnect(self, reason=None):
+        logging.warning("[HUB] Connection closed")
+        self.publish(DISCONNECT)
+
+    def emit(self, event, data=None):
+        self.sio.emit(event, data)
+
+    def run(self, url=None):
+        """Connect and block; initial connection failures are retried, drops are handled by the client."""
+        url = url or self.url
+        while True:
+            try:
+                self.sio.connect(url, transports=["websocket"], headers=self.headers)
+                self.sio.wait()
+                return
+            except socketio.exceptions.ConnectionError as e:
+                logging.error(f"[HUB] Connect to {url} failed: {e}; retrying in {self.reconnect_delay}s")
+                time.sleep(self.reconnect_delay)
+
+    def start(self, url=None):
+        """Run the connection in a background thread; later calls reuse it."""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self.run, args=(url,), name="feed-hub", daemon=True)
+                self._thread.start()
+        return self._thread
+
+    def stats(self):
+        return {
+            "connected": self.sio.connected,
+            "connections": self.connections,
+            "frames": dict(self.frames),
+            "errors": self.errors,
+            "subscribers": {topic: len(callbacks) for topic, callbacks in self._subscribers.items() if callbacks},
+        }
+
+
+class QuoteCache:
+    """Latest price per asset, kept from the hub's TICK topic."""
+
+    def __init__(self):
+        self._quotes = {}
+
+    def on_tick(self, tick):
+        self._quotes[tick.asset] = (tick.time, tick.price)
+
+    def get(self, asset):
+        quote = self._quotes.get(asset)
+        return quote[1] if quote else None
+
+    def drop(self, asset):
+        self._quotes.pop(asset, None)
+
+    def snapshot(self):
+        return {asset: price for asset, (_, price) in list(self._quotes.items())}
+
+
+# The process-wide connection shared by data_fetcher, pocket_ws and anything else
+hub = FeedHub(auth={
+    "sessionToken": sessionToken,
+    "uid": uid,
+    "lang": "en",
+    "currentUrl": currentUrl,
+    "isChart": 1,
+})
+quote_cache = QuoteCache()
+hub.subscribe(TICK, quote_cache.on_tick)
@@ -0,0 +1,330 @@
+# feed_recorder.py
+"""
+Record and replay the inbound Socket.IO feed.
+
+FeedRecorder writes every inbound event with its receive timestamp to an
+append-only log of zlib-compressed chunks. Each chunk starts with a header
+(magic, payload length, event count, first/last timestamp) and is also
+listed in a ``.idx`` file, so a replay can seek straight to a time range.
+FeedReplayer feeds the recorded events back into the same handlers at 1x,
+Nx or maximum speed.
+
+    python feed_recorder.py record feed.frl --url http://127.0.0.1:8090 --seconds 60
+    python feed_recorder.py replay feed.frl --speed max
+    python feed_recorder.py info feed.frl
+"""
+
+import argparse
+import atexit
+import base64
+import json
+import logging
+import os
+import struct
+import threading
+import time
+import zlib
+
+CHUNK_MAGIC = b"FRC1"
+CHUNK_HEADER = struct.Struct("<4sIIdd")  # magic, payload bytes, events, first ts, last ts
+INDEX_ENTRY = struct.Struct("<QIdd")     # chunk offset, events, first ts, last ts
+
+# Socket.IO lifecycle events are not part of the feed
+LIFECYCLE_EVENTS = {"connect", "disconnect", "connect_error"}
+
+
+def _encode(value):
+    if isinstance(value, (bytes, bytearray)):
+        return {"__bytes__": base64.b64encode(value).decode()}
+    raise TypeError(f"cannot record {type(value).__name__}")
+
+
+def _decode(obj):
+    if "__bytes__" in obj and len(obj) == 1:
+        return base64.b64decode(obj["__bytes__"])
+    return obj
+
+
+class FeedRecorder:
+    def __init__(self, path, chunk_events=2000, flush_interval=1.0, level=6):
+        """
+        :param path: log file; appended to if it exists
+        :param chunk_events: events per compressed chunk
+        :param flush_interval: seconds after which a partial chunk is written anyway,
+                               by a background thread if no further event arrives
+        :param level: zlib compression level
+        """
+        self.path = path
+        self.chunk_events = chunk_events
+        self.flush_interval = flush_interval
+        self.level = level
+        self._file = open(path, "ab")
+        self._index = open(path + ".idx", "ab")
+        self._lines = []
+        self._first_ts = None
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        self.events = 0
+        self.raw_bytes = 0
+        self.written_bytes = 0
+        self._closed = threading.Event()
+        self._flusher = None
+        if flush_interval:
+            self._flusher = threading.Thread(target=self._run_flusher, name="feed-recorder-flush", daemon=True)
+            self._flusher.start()
+        atexit.register(self.close)
+
+    def record(self, event, args, ts=None):
+        """Append one inbound event; ``args`` is the list of handler arguments."""
+        ts = time.time() if ts is None else ts
+        line = json.dumps([ts, event, list(args)], default=_encode, separators=(",", ":"))
+        with self._lock:
+            if self._first_ts is None:
+                self._first_ts = ts
+            self._lines.append(line)
+            self._last_ts = ts
+            self.events += 1
+            if len(self._lines) >= self.chunk_events or time.monotonic() - self._last_flush >= self.flush_interval:
+                self._flush_locked()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def _run_flusher(self):
+        """Write a partial chunk once it is ``flush_interval`` old, so a quiet feed still reaches the disk."""
+        while not self._closed.wait(max(self._last_flush + self.flush_interval - time.monotonic(), 0.01)):
+            with self._lock:
+                if self._lines and time.monotonic() - self._last_flush >= self.flush_interval:
+                    self._flush_locked()
+
+    def _flush_locked(self):
+        self._last_flush = time.monotonic()
+        if not self._lines or self._file.closed:
+            return
+        raw = "\n".join(self._lines).encode()
+        payload = zlib.compress(raw, self.level)
+        offset = self._file.seek(0, os.SEEK_END)
+        self._file.write(CHUNK_HEADER.pack(CHUNK_MAGIC, len(payload), len(self._lines), self._first_ts, self._last_ts))
+        self._file.write(payload)
+        self._file.flush()
+        self._index.write(INDEX_ENTRY.pack(offset, len(self._lines), self._first_ts, self._last_ts))
+        self._index.flush()
+        self.raw_bytes += len(raw)
+        self.written_bytes += CHUNK_HEADER.size + len(payload)
+        self._lines = []
+        self._first_ts = None
+
+    def close(self):
+        self._closed.set()
+        if self._flusher is not None:
+            self._flusher.join()
+        with self._lock:
+            self._flush_locked()
+            self._file.close()
+            self._index.close()
+
+    def attach(self, sio, namespace="/"):
+        """
+        Record every event a python-socketio client receives.
+
+        Wraps the registered handlers and adds a catch-all for events without
+        one; call it after all handlers are registered.
+        """
+        handlers = sio.handlers.setdefault(namespace, {})
+        for event, handler in list(handlers.items()):
+            if event in LIFECYCLE_EVENTS:
+                continue
+            if event == "*":
+                handlers[event] = self._wrap_catch_all(handler)
+            else:
+                handlers[event] = self._wrap(event, handler)
+        if "*" not in handlers:
+            handlers["*"] = self._wrap_catch_all(lambda event, *args: None)
+        return self
+
+    def _wrap(self, event, handler):
+        def recording_handler(*args):
+            self.record(event, args)
+            return handler(*args)
+        return recording_handler
+
+    def _wrap_catch_all(self, handler):
+        def recording_catch_all(event, *args):
+            self.record(event, args)
+            return handler(event, *args)
+        return recording_catch_all
+
+    def stats(self):
+        return {"events": self.events, "raw_bytes": self.raw_bytes, "written_bytes": self.written_bytes}
+
+
+class FeedReplayer:
+    def __init__(self, path):
+        self.path = path
+
+    def index(self):
+        """Return the chunk index as (offset, events, first ts, last ts) tuples, rebuilding it if needed."""
+        idx_path = self.path + ".idx"
+        if os.path.exists(idx_path):
+            with open(idx_path, "rb") as f:
+                data = f.read()
+            entries = [INDEX_ENTRY.unpack_from(data, i)
+                       for i in range(0, len(data) - INDEX_ENTRY.size + 1, INDEX_ENTRY.size)]
+            if entries or os.path.getsize(self.path) == 0:
+                return entries
+        return self._scan()
+
+    def _scan(self):
+        entries = []
+        with open(self.path, "rb") as f:
+            offset = 0
+            while True:
+                header = f.read(CHUNK_HEADER.size)
+                if len(header) < CHUNK_HEADER.size:
+                    break
+                magic, size, count, first_ts, last_ts = CHUNK_HEADER.unpack(header)
+                if magic != CHUNK_MAGIC:
+                    raise ValueError(f"bad chunk at offset {offset} in {self.path}")
+                entries.append((offset, count, first_ts, last_ts))
+                offset += CHUNK_HEADER.size + size
+                f.seek(offset)
+        return entries
+
+    def events(self, start=None, end=None):
+        """Yield (ts, event, args) in recorded order, optionally limited to [start, end]."""
+        with open(self.path, "rb") as f:
+            for offset, _, first_ts, last_ts in self.index():
+                if (start is not None and last_ts < start) or (end is not None and first_ts > end):
+                    continue
+                f.seek(offset)
+                magic, size, _, _, _ = CHUNK_HEADER.unpack(f.read(CHUNK_HEADER.size))
+                payload = f.read(size)
+                if magic != CHUNK_MAGIC or len(payload) < size:
+                    logging.warning(f"[REPLAY] Skipping truncated chunk at offset {offset}")
+                    break
+                for line in zlib.decompress(payload).splitlines():
+                    ts, event, args = json.loads(line, object_hook=_decode)
+                    if (start is None or ts >= start) and (end is None or ts <= end):
+                        yield ts, event, args
+
+    def replay(self, dispatch, speed=1.0, start=None, end=None):
+        """
+        Feed recorded events to ``dispatch(event, args)``.
+
+        :param speed: 1.0 for real time, N for N times faster, None for as fast as possible
+        :return: dict with events, elapsed seconds and events per second
+        """
+        count = 0
+        first_ts = None
+        started = time.monotonic()
+        for ts, event, args in self.events(start, end):
+            if speed:
+                if first_ts is None:
+                    first_ts = ts
+                wait = (ts - first_ts) / speed - (time.monotonic() - started)
+                if wait > 0:
+                    time.sleep(wait)
+            dispatch(event, args)
+            count += 1
+        elapsed = time.monotonic() - started
+        return {"events": count, "elapsed": round(elapsed, 3), "events_per_sec": round(count / elapsed, 1) if elapsed else 0.0}
+
+
+def client_dispatcher(sio, namespace="/"):
+    """Dispatch replayed events to the handlers registered on a python-socketio client."""
+    handlers = sio.handlers.get(namespace, {})
+
+    def dispatch(event, args):
+        handler = handlers.get(event)
+        if handler is not None:
+            handler(*args)
+        elif "*" in handlers:
+            handlers["*"](event, *args)
+    return dispatch
+
+
+class _CountingSocketIO:
+    """Stands in for Flask-SocketIO during an offline replay and counts emits."""
+
+    def __init__(self):
+        self.emits = 0
+        self.signals = 0
+
+    def emit(self, event, data=None, **kwargs):
+        self.emits += 1
+        if isinstance(data, dict) and "signals" in data:
+            self.signals += len(data["signals"])
+
+
+def _record(args):
+    import data_fetcher
+
+    recorder = FeedRecorder(args.path).attach(data_fetcher.sio)
+    threading.Thread(target=data_fetcher.run_feed, args=(args.url,), daemon=True).start()
+    try:
+        time.sleep(args.seconds)
+    except KeyboardInterrupt:
+        pass
+    recorder.close()
+    print(json.dumps(recorder.stats()))
+
+
+def _replay(args):
+    # Offline: no upstream to backfill from or persist alerts to
+    os.environ.setdefault("BACKFILL_ENABLED", "False")
+    os.environ.setdefault("ALERT_OUTBOX_PATH", "")
+    os.environ.setdefault("CANDLE_ARCHIVE_DIR", "")
+    import data_fetcher
+    from config import TIMEFRAMES
+    from signal_broadcaster import SignalBroadcaster
+    from signal_store import SignalStore
+
+    data_fetcher.sio.emit = lambda *a, **k: None  # subscriptions have nowhere to go offline
+    sink = _CountingSocketIO()
+    broadcaster = SignalBroadcaster(sink)
+    data_fetcher.signal_broadcaster = broadcaster
+    pipeline = data_fetcher.start_event_pipeline(TIMEFRAMES, broadcaster, SignalStore(), set())
+
+    speed = None if args.speed == "max" else float(args.speed)
+    result = FeedReplayer(args.path).replay(client_dispatcher(data_fetcher.sio), speed=speed)
+    pipeline.queue.join()
+    broadcaster.flush()
+    result.update({
+        "candles": dict(data_fetcher.candle_ingestor.stats),
+        "pipeline": pipeline.stats(),
+        "broadcast": broadcaster.stats(),
+        "emits": sink.emits,
+        "signals_emitted": sink.signals,
+    })
+    print(json.dumps(result, indent=2))
+
+
+def _info(args):
+    entries = FeedReplayer(args.path).index()
+    events = sum(entry[1] for entry in entries)
+    span = entries[-1][3] - entries[0][2] if entries else 0
+    print(json.dumps({"chunks": len(entries), "events": events, "seconds": round(span, 3),
+                      "bytes": os.path.getsize(args.path)}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record and replay the inbound Socket.IO feed")
+    sub = parser.add_subparsers(dest="command", required=True)
+    rec = sub.add_parser("record", help="connect to the feed and record it")
+    rec.add_argument("path")
+    rec.add_argument("--url", default=os.getenv("PO_IO_URL", "https://events-po.com"))
+    rec.add_argument("--seconds", type=float, default=60)
+    rep = sub.add_parser("replay", help="replay a log through data_fetcher and report throughput")
+    rep.add_argument("path")
+    rep.add_argument("--speed", default="1", help="1 for real time, N for N times faster, max for no delays")
+    info = sub.add_parser("info", help="summarize a log")
+    info.add_argument("path")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s [%(levelname)s] %(message)s")
+    {"record": _record, "replay": _replay, "info": _info}[args.command](args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,330 @@
+"""
+Incremental indicator engine.
+
+Keeps running state per (symbol, period) and updates Heikin-Ashi, ATR, the
+Alligator SMAs, the Stochastic oscillator and the EMA-150 in constant time
+per closed bar, instead of recomputing them over the whole history with
+pandas on every pass. Values match the functions in strategy.py run over
+the same bars. The analysis paths only see the closed bars still in the
+candle store, so IndicatorEngine(close_window=CANDLE_CAPACITY - 1) bounds
+the close mean of min_atr to that window too; the EMA-150 however keeps its
+seed at the first bar the state saw, where pandas reseeds at the first bar
+of the window, so the two EMAs differ by a term that decays as
+(1 - 2/151) ** window once history exceeds the store.
+
+Bars are folded in on the feed thread while the analysis reads the state
+from others, so each IndicatorState has a lock held for every update and
+read; readers get an IndicatorSnapshot, an immutable copy of the features
+of one bar.
+"""
+
+import math
+import threading
+from collections import deque, namedtuple
+from types import MappingProxyType
+
+from candle_store import TIME, OPEN, HIGH, LOW, CLOSE
+from strategy import score_features, multi_timeframe_confirmation
+
+NAN = float("nan")
+
+
+class IndicatorSnapshot(namedtuple("IndicatorSnapshot", ["count", "bar_time", "features"])):
+    """
+    Features of one IndicatorState as of one bar.
+
+    count: bars folded in; bar_time: start of the last one (None if fed through
+    update()); features: read-only mapping as returned by IndicatorState.features
+    """
+
+    __slots__ = ()
+
+    def score(self):
+        """Return (raw_signal, confidence), or None before IndicatorState.MIN_BARS bars."""
+        if self.count < IndicatorState.MIN_BARS:
+            return None
+        return score_features(self.features)
+
+
+class RollingMean:
+    """
+    Mean over the last ``window`` values, NaN until the window is full.
+
+    The running sum is rebuilt from the window every ``window`` updates so
+    floating-point drift cannot accumulate.
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self._values = deque(maxlen=window)
+        self._sum = 0.0
+        self._nan_count = 0
+        self._since_resum = 0
+
+    def update(self, value):
+        if len(self._values) == self.window:
+            old = self._values[0]
+            if math.isnan(old):
+                self._nan_count -= 1
+            else:
+                self._sum -= old
+        self._values.append(value)
+        if math.isnan(value):
+            self._nan_count += 1
+        else:
+            self._sum += value
+
+        self._since_resum += 1
+        if self._since_resum >= self.window:
+            self._sum = math.fsum(v for v in self._values if not math.isnan(v))
+            self._since_resum = 0
+        return self.value
+
+    @property
+    def value(self):
+        if len(self._values) < self.window or self._nan_count:
+            return NAN
+        return self._sum / self.window
+
+    @property
+    def partial(self):
+        """Mean of the values held so far, also while the window is not full yet."""
+        if not self._values or self._nan_count:
+            return NAN
+        return self._sum / len(self._values)
+
+
+class RollingExtreme:
+    """Rolling min or max over ``window`` values using a monotonic deque."""
+
+    def __init__(self, window, mode="min"):
+        self.window = window
+        self._better = (lambda a, b: a <= b) if mode == "min" else (lambda a, b: a >= b)
+        self._deque = deque()  # (index, value), values monotonic
+        self._index = -1
+
+    def update(self, value):
+        self._index += 1
+        while self._deque and self._better(value, self._deque[-1][1]):
+            self._deque.pop()
+        self._deque.append((self._index, value))
+        if self._deque[0][0] <= self._index - self.window:
+            self._deque.popleft()
+        return self.value
+
+    @property
+    def value(self):
+        if self._index + 1 < self.window:
+            return NAN
+        return self._deque[0][1]
+
+
+class IndicatorState:
+    """Running indicator state for one (symbol, period) series."""
+
+    MIN_BARS = 50  # same minimum as strategy.analyze_candles
+
+    def __init__(self, atr_period=14, jaw=13, teeth=8, lips=5, k_period=14, d_period=3,
+                 ema_span=150, bias_window=30, close_window=None):
+        """
+        :param close_window: bars in the close mean min_atr compares against (None: all bars)
+        """
+        self.count = 0
+        self.bar_time = None
+        self._lock = threading.Lock()  # held while a bar is folded in or the features are read
+        self._close_sum = 0.0
+        self._close_mean = RollingMean(close_window) if close_window else None
+
+        # Previous raw bar (Heikin-Ashi open and true range use it)
+        self._prev_open = NAN
+        self._prev_close = NAN
+
+        # Last three Heikin-Ashi bars as (open, close) for patterns and momentum
+        self._ha_recent = deque(maxlen=3)
+        self.ha_open = self.ha_high = self.ha_low = self.ha_close = NAN
+
+        self._atr = RollingMean(atr_period)
+        self._jaw = RollingMean(jaw)
+        self._teeth = RollingMean(teeth)
+        self._lips = RollingMean(lips)
+        self._low_min = RollingExtreme(k_period, "min")
+        self._high_max = RollingExtreme(k_period, "max")
+        self._d = RollingMean(d_period)
+        self._ha_open_mean = RollingMean(bias_window)
+        self._ha_close_mean = RollingMean(bias_window)
+        self._bias_window = bias_window
+
+        self._ema_alpha = 2 / (ema_span + 1)
+        self._ema = deque(maxlen=5)
+
+        self.atr = self.jaw = self.teeth = self.lips = self.k = self.d = NAN
+
+    def update(self, open_, high, low, close):
+        """Fold one closed bar into the state in O(1)."""
+        with self._lock:
+            self._update(open_, high, low, close)
+
+    def _update(self, open_, high, low, close):
+        prev_open, prev_close = self._prev_open, self._prev_close
+        first = self.count == 0
+        self.count += 1
+        if self._close_mean is not None:
+            self._close_mean.update(close)
+        else:
+            self._close_sum += close
+
+        # Heikin-Ashi (open uses the previous *raw* bar, as in strategy.heikin_ashi)
+        ha_close = (open_ + high + low + close) / 4
+        ha_open = open_ if first else (prev_open + prev_close) / 2
+        ha_high = max(ha_open, ha_close, high)
+        ha_low = min(ha_open, ha_close, low)
+        self.ha_open, self.ha_high, self.ha_low, self.ha_close = ha_open, ha_high, ha_low, ha_close
+        self._ha_recent.append((ha_open, ha_close))
+
+        # ATR on raw candles
+        if first:
+            tr = high - low
+        else:
+            tr = max(high - low, abs(high - prev_close), abs(low - prev_close))
+        self.atr = self._atr.update(tr)
+
+        # Alligator on Heikin-Ashi median price
+        median = (ha_high + ha_low) / 2
+        self.jaw = self._jaw.update(median)
+        self.teeth = self._teeth.update(median)
+        self.lips = self._lips.update(median)
+
+        # Stochastic on Heikin-Ashi
+        low_min = self._low_min.update(ha_low)
+        high_max = self._high_max.update(ha_high)
+        rng = high_max - low_min
+        if math.isnan(rng) or rng == 0:
+            self.k = NAN  # pandas gives NaN for 0/0 (close is always within the range)
+        else:
+            self.k = 100 * (ha_close - low_min) / rng
+        self.d = self._d.update(self.k)
+
+        # Bias over the last ``bias_window`` Heikin-Ashi bars
+        self._ha_open_mean.update(ha_open)
+        self._ha_close_mean.update(ha_close)
+
+        # EMA on Heikin-Ashi close
+        if first:
+            ema = ha_close
+        else:
+            ema = ha_close * self._ema_alpha + self._ema[-1] * (1 - self._ema_alpha)
+        self._ema.append(ema)
+
+        self._prev_open, self._prev_close = open_, close
+
+    def update_row(self, row):
+        """Fold one candle row in CANDLE_COLUMNS order into the state."""
+        with self._lock:
+            self._update(row[OPEN], row[HIGH], row[LOW], row[CLOSE])
+            self.bar_time = float(row[TIME])
+
+    @property
+    def ema(self):
+        return self._ema[-1] if self._ema else NAN
+
+    def _recent_means(self):
+        if self.count >= self._bias_window:
+            return self._ha_open_mean.value, self._ha_close_mean.value
+        # Fewer bars than the window: strategy uses whatever is available
+        bars = list(self._ha_open_mean._values)
+        closes = list(self._ha_close_mean._values)
+        return sum(bars) / len(bars), sum(closes) / len(closes)
+
+    def _close_average(self):
+        if self._close_mean is not None:
+            return self._close_mean.partial
+        return self._close_sum / self.count
+
+    def features(self):
+        """Return the last-bar values used by strategy.score_features."""
+        with self._lock:
+            return self._features()
+
+    def snapshot(self):
+        """Return an IndicatorSnapshot taken under the state's lock, so never between two updates."""
+        with self._lock:
+            features = self._features() if self.count else {}
+            return IndicatorSnapshot(self.count, self.bar_time, MappingProxyType(features))
+
+    def _features(self):
+        open_mean, close_mean = self._recent_means()
+        recent = list(self._ha_recent)
+        bull_pattern = bear_pattern = False
+        if len(recent) >= 2:
+            (p_open, p_close), (l_open, l_close) = recent[-2], recent[-1]
+            bull_pattern = (l_close > l_open and p_close < p_open
+                            and l_close > p_open and l_open < p_close)
+            bear_pattern = (l_close < l_open and p_close > p_open
+                            and l_open > p_close and l_close < p_open)
+
+        ema_slope = self._ema[-1] - self._ema[0] if len(self._ema) == 5 else NAN
+        return {
+            "close": self.ha_close,
+            "jaw": self.jaw,
+            "teeth": self.teeth,
+            "lips": self.lips,
+            "k": self.k,
+            "d": self.d,
+            "atr": self.atr,
+            "min_atr": self.atr > self._close_average() * 0.001,
+            "bullish_bias": close_mean > open_mean,
+            "bearish_bias": close_mean < open_mean,
+            "bullish_pattern": bull_pattern,
+            "bearish_pattern": bear_pattern,
+            "ema_slope": ema_slope,
+            "momentum_bull": sum(c > o for o, c in recent) >= 2,
+            "momentum_bear": sum(c < o for o, c in recent) >= 2,
+        }
+
+    def score(self):
+        """Return (raw_signal, confidence), or None before MIN_BARS bars."""
+        return self.snapshot().score()
+
+    def analyze(self, mid_df=None, high_df=None):
+        """Incremental counterpart of strategy.analyze_candles (same return value)."""
+        scored = self.score()
+        if scored is None:
+            return None
+        raw_signal, confidence = scored
+        confirmed = multi_timeframe_confirmation(raw_signal, mid_df, high_df)
+        if confirmed is None:
+            confidence = 0  # reject if higher TF disagrees
+        return {"signal": confirmed, "confidence": confidence}
+
+
+class IndicatorEngine:
+    """IndicatorState per (symbol, period), fed by closed bars."""
+
+    def __init__(self, **params):
+        self.params = params
+        self._states = {}
+        self._lock = threading.Lock()
+
+    def state(self, symbol, period):
+        key = (symbol, int(period))
+        state = self._states.get(key)
+        if state is None:
+            with self._lock:
+                state = self._states.setdefault(key, IndicatorState(**self.params))
+        return state
+
+    def on_bar_closed(self, symbol, period, bar):
+        """CandleIngestor bar-closed listener."""
+        self.state(symbol, period).update_row(bar)
+
+    def get(self, symbol, period):
+        """Return the state for (symbol, period), or None if no bar has closed yet."""
+        return self._states.get((symbol, int(period)))
+
+    def snapshot(self, symbol, period):
+        """Return an IndicatorSnapshot of (symbol, period), or None if no bar has closed yet."""
+        state = self.get(symbol, period)
+        return state.snapshot() if state is not None else None
+
+    def reset(self, symbol, period):
+        self._states.pop((symbol, int(period)), None)
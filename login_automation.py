@@ -68,22 +68,15 @@ def login_pocket_option():
     return driver
 
 # --- WebSocket Integration ---
-def send_heartbeat(ws):
-    """Send ping every 5 seconds to keep connection alive"""
-    while True:
-        try:
-            ws.send("2")  # Socket.IO ping
-        except Exception as e:
-            print("[HEARTBEAT ERROR]", e)
-        time.sleep(5)
-
 def on_open(ws):
     print("[OPEN] Connected to Pocket Option WebSocket")
     ws.send('42["getAssets", {}]')  # Request assets list
-    threading.Thread(target=send_heartbeat, args=(ws,), daemon=True).start()
 
 def on_message(ws, message):
-    if message.startswith("42"):
+    # Engine.IO v4: the server pings, we answer with a pong
+    if message == "2":
+        ws.send("3")
+    elif message.startswith("42"):
         try:
             data = json.loads(message[2:])
             event = data[0]
@@ -0,0 +1,238 @@
+# mock_po_server.py
+"""
+Local Pocket Option feed simulator for offline and scale testing.
+
+A Socket.IO / Engine.IO v4 server (python-socketio on eventlet) speaking the
+events our clients use:
+
+* ``auth`` -> ``auth/success`` (with ``--require-auth`` nothing else is served before it)
+* ``assets/get-assets`` / ``getAssets`` -> ``assets``
+* ``subscribe`` / ``unsubscribe`` {"type": "ticks"|"candles", "asset", "period"}
+* ``loadHistoryPeriod`` -> ``loadHistoryPeriod`` with {"asset", "period", "data"}
+
+Subscribed clients receive ``ticks`` {"asset", "time", "price"} and, for
+candle subscriptions, ``candles`` updates of the forming bar. Prices are a
+geometric random walk per asset; each subscription is a Socket.IO room, so
+one update is encoded once however many clients watch it.
+
+    python mock_po_server.py --port 8090 --assets 500 --tick-rate 4
+    PO_IO_URL=http://127.0.0.1:8090 python app.py
+
+History comes from ``--history`` (JSON: asset -> period -> list of candle
+dicts) or is generated as a seeded random walk.
+"""
+
+import argparse
+import json
+import logging
+import time
+import zlib
+
+import eventlet
+import numpy as np
+import socketio
+
+sio = socketio.Server(async_mode="eventlet", cors_allowed_origins="*")
+app = socketio.WSGIApp(sio)
+
+ASSETS = []
+HISTORY = {}          # asset -> {period: [candles]} loaded from --history
+HISTORY_LATENCY = 0.0  # seconds before answering a history request
+REQUIRE_AUTH = False
+authenticated = set()
+stats = {"connections": 0, "history_requests": 0, "subscriptions": 0, "ticks": 0, "candles": 0}
+
+
+def generate_history(asset, period, bars, end=None, price=None):
+    """
+    Seeded random-walk candles for (asset, period) ending at the current bucket.
+
+    :param price: live price to continue from; the walk is scaled so its last close equals it
+    """
+    end = int(end or time.time()) // period * period
+    rng = np.random.default_rng(zlib.crc32(f"{asset}:{period}".encode()))
+    close = 1.0 + np.cumsum(rng.normal(0, 0.0005, bars))
+    open_ = np.r_[close[0], close[:-1]]
+    high = np.maximum(open_, close) + rng.random(bars) * 0.0005
+    low = np.minimum(open_, close) - rng.random(bars) * 0.0005
+    if price is not None:
+        scale = price / close[-1]
+        open_, high, low, close = open_ * scale, high * scale, low * scale, close * scale
+    times = end - period * np.arange(bars - 1, -1, -1)
+    return [
+        {"time": int(t), "open": float(o), "high": float(h), "low": float(l), "close": float(c)}
+        for t, o, h, l, c in zip(times, open_, high, low, close)
+    ]
+
+
+def allowed(sid):
+    return not REQUIRE_AUTH or sid in authenticated
+
+
+@sio.event
+def connect(sid, environ, auth=None):
+    stats["connections"] += 1
+    logging.info(f"[MOCK] Client connected: {sid}")
+
+
+@sio.event
+def disconnect(sid, reason=None):
+    authenticated.discard(sid)
+
+
+@sio.on("auth")
+def on_auth(sid, data=None):
+    data = data or {}
+    if REQUIRE_AUTH and not (data.get("sessionToken") and data.get("uid")):
+        sio.emit("auth/fail", {"reason": "missing sessionToken or uid"}, to=sid)
+        return
+    authenticated.add(sid)
+    sio.emit("auth/success", {"uid": data.get("uid")}, to=sid)
+
+
+@sio.on("assets/get-assets")
+@sio.on("getAssets")
+def on_get_assets(sid, data=None):
+    if allowed(sid):
+        sio.emit("assets", [{"symbol": asset, "name": asset, "enabled": True} for asset in ASSETS], to=sid)
+
+
+def subscription_room(data):
+    if data.get("type") == "candles":
+        return f"candles:{data['asset']}:{int(data['period'])}"
+    return f"ticks:{data['asset']}"
+
+
+@sio.on("subscribe")
+def on_subscribe(sid, data=None):
+    if allowed(sid) and data and data.get("asset") in simulator.index:
+        stats["subscriptions"] += 1
+        sio.enter_room(sid, subscription_room(data))
+
+
+@sio.on("unsubscribe")
+def on_unsubscribe(sid, data=None):
+    if data and data.get("asset"):
+        sio.leave_room(sid, subscription_room(data))
+
+
+@sio.on("loadHistoryPeriod")
+def on_load_history(sid, data):
+    if not allowed(sid):
+        return
+    stats["history_requests"] += 1
+    asset, period = data["asset"], int(data["period"])
+    bars = max(1, int(data.get("offset", period * 500)) // period)
+    if HISTORY_LATENCY:
+        sio.sleep(HISTORY_LATENCY)
+    candles = HISTORY.get(asset, {}).get(str(period))
+    if candles is None:
+        # Continue from the live price, so history and ticks form one series
+        i = simulator.index.get(asset)
+        price = float(simulator.prices[i]) if i is not None else None
+        candles = generate_history(asset, period, bars, data.get("time"), price)
+    sio.emit("loadHistoryPeriod", {"asset": asset, "period": period, "data": candles[-bars:]}, to=sid)
+
+
+class Simulator:
+    """Random-walk prices for all assets, pushed to the subscribed rooms."""
+
+    def __init__(self, assets, tick_rate=1.0, volatility=0.0002, seed=0):
+        self.assets = list(assets)
+        self.index = {asset: i for i, asset in enumerate(self.assets)}
+        self.tick_rate = tick_rate
+        self.volatility = volatility
+        self.rng = np.random.default_rng(seed)
+        self.prices = 1.0 + self.rng.random(len(self.assets))
+        self.bars = {}  # (asset, period) -> forming bar dict
+
+    def step(self, now):
+        self.prices *= np.exp(self.rng.normal(0, self.volatility, len(self.prices)))
+        rooms = sio.manager.rooms.get("/", {})
+        for room in list(rooms):
+            if not isinstance(room, str) or ":" not in room:
+                continue
+            kind, _, rest = room.partition(":")
+            if kind == "ticks":
+                i = self.index.get(rest)
+                if i is None:
+                    continue
+                sio.emit("ticks", {"asset": rest, "time": now, "price": round(float(self.prices[i]), 6)}, to=room)
+                stats["ticks"] += 1
+            elif kind == "candles":
+                asset, _, period = rest.rpartition(":")
+                i = self.index.get(asset)
+                if i is None:
+                    continue
+                sio.emit("candles", self._fold(asset, int(period), now, float(self.prices[i])), to=room)
+                stats["candles"] += 1
+
+    def _fold(self, asset, period, now, price):
+        bucket = int(now) // period * period
+        bar = self.bars.get((asset, period))
+        if bar is None or bar["time"] != bucket:
+            bar = self.bars[(asset, period)] = {
+                "asset": asset, "period": period, "time": bucket,
+                "open": price, "high": price, "low": price, "close": price, "volume": 0,
+            }
+        bar["high"] = max(bar["high"], price)
+        bar["low"] = min(bar["low"], price)
+        bar["close"] = price
+        bar["volume"] += 1
+        return bar
+
+    def run(self):
+        interval = 1.0 / self.tick_rate
+        next_step = time.monotonic()
+        last_report, last_ticks = time.monotonic(), 0
+        while True:
+            self.step(round(time.time(), 3))
+            next_step += interval
+            now = time.monotonic()
+            if now - last_report >= 10:
+                sent = stats["ticks"] + stats["candles"]
+                logging.info(f"[MOCK] {(sent - last_ticks) / (now - last_report):.0f} updates/s, "
+                             f"{stats['connections']} connections, lag {max(0.0, now - next_step) * 1000:.0f} ms")
+                last_report, last_ticks = now, sent
+            # Falling behind means the simulator itself saturated; don't try to catch up
+            sio.sleep(max(0.0, next_step - now))
+            if now > next_step + interval:
+                next_step = now
+
+
+simulator = Simulator([])
+
+
+def main():
+    global HISTORY_LATENCY, REQUIRE_AUTH, simulator
+    parser = argparse.ArgumentParser(description="Local Pocket Option feed simulator")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--assets", type=int, default=10, help="number of generated assets")
+    parser.add_argument("--tick-rate", type=float, default=1.0, help="price updates per second per asset")
+    parser.add_argument("--volatility", type=float, default=0.0002, help="per-tick log-return deviation")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--require-auth", action="store_true", help="serve nothing before a valid auth event")
+    parser.add_argument("--history", help="JSON file with canned history: asset -> period -> candles")
+    parser.add_argument("--history-latency", type=float, default=0.0, help="seconds before answering history")
+    parser.add_argument("--ping-interval", type=float, default=25.0, help="seconds between Engine.IO pings")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    HISTORY_LATENCY = args.history_latency
+    REQUIRE_AUTH = args.require_auth
+    sio.eio.ping_interval = args.ping_interval
+    if args.history:
+        with open(args.history) as f:
+            HISTORY.update(json.load(f))
+        ASSETS.extend(HISTORY)
+    ASSETS.extend(f"MOCK{i:03d}_otc" for i in range(args.assets - len(ASSETS)))
+
+    simulator = Simulator(ASSETS, tick_rate=args.tick_rate, volatility=args.volatility, seed=args.seed)
+    sio.start_background_task(simulator.run)
+    logging.info(f"[MOCK] Serving {len(ASSETS)} assets at {args.tick_rate} ticks/s on {args.host}:{args.port}")
+    eventlet.wsgi.server(eventlet.listen((args.host, args.port)), app, log_output=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Shared higher-timeframe bias for multi-timeframe confirmation.
+
+strategy.get_bias recomputes Heikin-Ashi and an EMA-100 over the whole
+higher-timeframe series. BiasCache computes it once per closed bar of each
+(symbol, period) and shares the result with every lower-timeframe
+evaluation until the next higher-timeframe bar closes.
+"""
+
+import threading
+
+from strategy import get_bias, confirm_signal
+
+
+class BiasCache:
+    def __init__(self, store):
+        """
+        :param store: CandleStore holding the higher timeframe candles
+        """
+        self.store = store
+        self._entries = {}  # (symbol, period) -> (last closed bar time, bias)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def bias(self, symbol, period):
+        """Return "bullish", "bearish" or None for the closed bars of (symbol, period)."""
+        key = (symbol, int(period))
+        last_closed = self.store.last_closed_time(symbol, period)
+        if last_closed is None:
+            return None
+
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == last_closed:
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+        bias, _ = get_bias(self.store.frame(symbol, period, closed=True))
+        with self._lock:
+            self._entries[key] = (last_closed, bias)
+        return bias
+
+    def confirm(self, symbol, scored, mid_period, high_period=None):
+        """
+        Apply multi-timeframe confirmation to an unconfirmed score.
+
+        :param scored: (raw_signal, confidence) from a score_candles function, or None
+        :param mid_period: mid timeframe in seconds; None skips confirmation
+        :param high_period: optional high timeframe in seconds
+        :return: {"signal": ..., "confidence": ...} as strategy.analyze_candles returns
+        """
+        if scored is None:
+            return None
+        raw_signal, confidence = scored
+        if mid_period is None:
+            # Top timeframe: nothing above it to confirm against
+            return {"signal": raw_signal, "confidence": confidence}
+        if raw_signal is None:
+            return {"signal": None, "confidence": 0}
+
+        mid_bias = self.bias(symbol, mid_period)
+        high_bias = self.bias(symbol, high_period) if high_period else None
+        confirmed = confirm_signal(raw_signal, mid_bias, high_bias)
+        return {"signal": confirmed, "confidence": confidence if confirmed else 0}
+
+    def discard(self, symbol):
+        """Forget cached biases of a symbol (e.g. when it is delisted)."""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == symbol]:
+                del self._entries[key]
+
+    def stats(self):
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,263 @@
+"""
+Coalescing outbound queue between analysis and Socket.IO.
+
+Signals pushed during one window are merged per (symbol, timeframe) (the
+last one wins) and sent as one "signals_batch" event per client holding the
+signals of all its subscription rooms, each signal once however many of the
+client's rooms it matches. Clients in the same rooms share one batch, emitted
+once to a room when exactly those clients are in it and to each sid otherwise.
+The rooms clients joined are tracked in ClientRooms by the app's Socket.IO
+handlers.
+
+Signals published through publish() / remove() are stored and queued under
+one lock, so a batch holds every change up to its "version" and clients can
+advance their delta version to it (batches carry the store "epoch" too);
+symbols removed from the store are sent to every client in "removed".
+When a flush takes longer than half the window (slow clients backing up the
+emit), the window doubles up to ``max_window``; it shrinks back while
+flushes are fast.
+Signals published with the monotonic time their bar closed add a sample to
+the bar close to emit latency ("bar_close_to_emit") once their batch is out.
+"""
+
+import logging
+import threading
+import time
+from collections import defaultdict
+
+from event_pipeline import LatencyStats
+
+# Every client starts in ALL_ROOM (all signals) and UNIVERSE_ROOM (symbols_update)
+ALL_ROOM = "all"
+UNIVERSE_ROOM = "universe"
+
+
+def signal_rooms(symbol, timeframe):
+    """Rooms that receive a signal of (symbol, timeframe)."""
+    return (ALL_ROOM, f"symbol:{symbol}", f"tf:{timeframe}", f"pair:{symbol}:{timeframe}")
+
+
+def subscription_rooms(symbols=None, timeframes=None):
+    """
+    Rooms for a dashboard subscription.
+
+    Symbols and timeframes together select their pairs; either one alone
+    selects all timeframes of the symbols or all symbols on the timeframes.
+    """
+    if symbols and timeframes:
+        return [f"pair:{symbol}:{tf}" for symbol in symbols for tf in timeframes]
+    if symbols:
+        return [f"symbol:{symbol}" for symbol in symbols]
+    if timeframes:
+        return [f"tf:{tf}" for tf in timeframes]
+    return [ALL_ROOM]
+
+
+def in_rooms(signals, rooms):
+    """The signals that any of ``rooms`` receives."""
+    rooms = set(rooms)
+    return [sig for sig in signals if rooms.intersection(signal_rooms(sig["symbol"], sig["timeframe"]))]
+
+
+class ClientRooms:
+    """Rooms joined by each connected client (besides its own sid room), and the members of each room."""
+
+    def __init__(self):
+        self._rooms = {}  # sid -> set of rooms
+        self._members = defaultdict(set)  # room -> set of sids
+        self._lock = threading.Lock()
+
+    def join(self, sid, *rooms):
+        with self._lock:
+            self._rooms.setdefault(sid, set()).update(rooms)
+            for room in rooms:
+                self._members[room].add(sid)
+
+    def leave(self, sid, *rooms):
+        with self._lock:
+            if sid in self._rooms:
+                self._rooms[sid].difference_update(rooms)
+                self._discard(sid, rooms)
+
+    def disconnect(self, sid):
+        with self._lock:
+            self._discard(sid, self._rooms.pop(sid, ()))
+
+    def _discard(self, sid, rooms):
+        """Drop ``sid`` from the members of ``rooms``. Caller holds the lock."""
+        for room in rooms:
+            members = self._members.get(room)
+            if members is not None:
+                members.discard(sid)
+                if not members:
+                    del self._members[room]
+
+    def rooms(self, sid):
+        with self._lock:
+            return set(self._rooms.get(sid, ()))
+
+    def groups(self):
+        """
+        Clients grouped by the rooms they joined, as (rooms, sids, room) tuples.
+
+        ``room`` is one of the joined rooms holding exactly ``sids``, so the
+        group can be reached with one emit, or None if every room also has
+        other members.
+        """
+        with self._lock:
+            by_rooms = defaultdict(set)
+            for sid, joined in self._rooms.items():
+                by_rooms[frozenset(joined)].add(sid)
+            groups = []
+            for joined, sids in by_rooms.items():
+                room = next((room for room in sorted(joined) if self._members.get(room) == sids), None)
+                groups.append((joined, sorted(sids), room))
+        return groups
+
+    def __len__(self):
+        return len(self._rooms)
+
+
+class SignalBroadcaster:
+    def __init__(self, socketio, window=0.25, max_window=2.0, event="signals_batch", clients=None):
+        """
+        :param socketio: Flask-SocketIO instance used to emit
+        :param window: seconds between flushes
+        :param max_window: upper bound the window grows to under backpressure
+        :param clients: ClientRooms of the connected clients; without it every
+                        batch goes to ALL_ROOM
+        """
+        self.socketio = socketio
+        self.clients = clients
+        self.event = event
+        self.min_window = window
+        self.max_window = max_window
+        self.window = window
+        self._pending = {}  # (symbol, timeframe) -> newest signal dict
+        self._removed = set()  # symbols removed from the store since the last flush
+        self._version = 0  # store version covered by the pending changes
+        self._epoch = None  # epoch of the store publish()/remove() write to
+        self._closed_at = {}  # (symbol, timeframe) -> monotonic bar close time of the pending signal
+        self.latency = LatencyStats()
+        self._lock = threading.Lock()
+        self._thread = None
+        self.pushed = 0
+        self.coalesced = 0
+        self.batches = 0
+        self.emitted = 0
+
+    def push(self, signal):
+        """Queue a signal for the next batch, replacing a pending one for the same key."""
+        with self._lock:
+            self._push(signal)
+
+    def _push(self, signal):
+        key = (signal["symbol"], signal["timeframe"])
+        if key in self._pending:
+            self.coalesced += 1
+        self._pending[key] = signal
+        self._version = max(self._version, signal.get("version", 0))
+        self.pushed += 1
+
+    def publish(self, store, signal, closed_at=None):
+        """
+        Upsert ``signal`` into ``store`` (a SignalStore) and queue it.
+
+        :param closed_at: time.monotonic() of the bar close the signal was computed on, if known
+        :return: the store version of the signal, also set as signal["version"]
+        """
+        with self._lock:
+            signal["version"] = store.upsert(signal)
+            self._epoch = store.epoch
+            self._push(signal)
+            if closed_at is not None:
+                # A coalesced signal keeps the earliest close it stands for
+                key = (signal["symbol"], signal["timeframe"])
+                self._closed_at[key] = min(closed_at, self._closed_at.get(key, closed_at))
+        return signal["version"]
+
+    def remove(self, store, symbol):
+        """Remove every signal of ``symbol`` from ``store`` and tell all clients with the next batch."""
+        with self._lock:
+            removed = store.remove(symbol)
+            if removed:
+                self._pending = {key: sig for key, sig in self._pending.items() if key[0] != symbol}
+                self._closed_at = {key: t for key, t in self._closed_at.items() if key[0] != symbol}
+                self._removed.add(symbol)
+                self._version = max(self._version, store.version)
+                self._epoch = store.epoch
+        return removed
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="signal-broadcaster", daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self):
+        while True:
+            time.sleep(self.window)
+            try:
+                self.flush()
+            except Exception as e:
+                logging.error(f"[BROADCAST] Flush failed: {e}")
+
+    def flush(self):
+        """Emit everything pending, one batch per client, and adapt the window to the emit time."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            closed_at, self._closed_at = self._closed_at, {}
+            removed, self._removed = sorted(self._removed), set()
+            version, epoch = self._version, self._epoch
+        if not pending and not removed:
+            return 0
+
+        signals = list(pending.values())
+        started = time.monotonic()
+        for targets, batch in self._batches(signals, everyone=bool(removed)):
+            payload = {"version": version, "signals": batch}
+            if epoch is not None:
+                payload["epoch"] = epoch
+            if removed:
+                payload["removed"] = removed
+            for target in targets:
+                self.socketio.emit(self.event, payload, to=target)
+                self.batches += 1
+                self.emitted += len(batch)
+        emitted_at = time.monotonic()
+        elapsed = emitted_at - started
+        for t in closed_at.values():
+            self.latency.record(emitted_at - t)
+
+        if elapsed > self.window / 2 and self.window < self.max_window:
+            self.window = min(self.window * 2, self.max_window)
+            logging.warning(f"[BROADCAST] Slow emit ({elapsed * 1000:.0f} ms), window now {self.window:.2f}s")
+        elif elapsed < self.window / 8 and self.window > self.min_window:
+            self.window = max(self.window / 2, self.min_window)
+        return len(pending)
+
+    def _batches(self, signals, everyone=False):
+        """
+        (targets, signals) per distinct set of joined rooms; everything to ALL_ROOM without ClientRooms.
+
+        :param everyone: include clients whose batch is empty
+        """
+        if self.clients is None:
+            return [([ALL_ROOM], signals)]
+        batches = []
+        for joined, sids, room in self.clients.groups():
+            batch = in_rooms(signals, joined)
+            if batch or everyone:
+                batches.append(([room] if room is not None else sids, batch))
+        return batches
+
+    def stats(self):
+        return {
+            "pending": len(self._pending),
+            "pushed": self.pushed,
+            "coalesced": self.coalesced,
+            "batches": self.batches,
+            "emitted": self.emitted,
+            "window": self.window,
+            "bar_close_to_emit": self.latency.summary(),
+        }
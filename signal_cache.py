@@ -0,0 +1,86 @@
+"""
+Skip re-analysis when nothing changed.
+
+DirtySet collects the (symbol, period) series that received a closed bar
+since the last sweep; SignalCache memoizes analysis results keyed by
+(symbol, timeframe, last closed bar time, params) with LRU eviction.
+"""
+
+import threading
+from collections import OrderedDict
+
+
+class DirtySet:
+    """Thread-safe set of keys marked by the feed and drained by the analyzer."""
+
+    def __init__(self):
+        self._keys = set()
+        self._lock = threading.Lock()
+
+    def mark(self, key):
+        with self._lock:
+            self._keys.add(key)
+
+    def drain(self):
+        """Return all marked keys and clear the set."""
+        with self._lock:
+            keys, self._keys = self._keys, set()
+        return keys
+
+    def __len__(self):
+        return len(self._keys)
+
+
+class SignalCache:
+    """LRU cache of analysis results with hit/miss counters."""
+
+    # Returned by get() on a miss when no default is given (None is a valid result)
+    MISS = object()
+
+    def __init__(self, maxsize=2048):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=MISS):
+        """Return the cached value for ``key`` (counting a hit) or ``default`` (a miss)."""
+        with self._lock:
+            value = self._entries.get(key, self.MISS)
+            if value is self.MISS:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def discard_prefix(self, prefix):
+        """Drop every entry whose key starts with the ``prefix`` tuple, e.g. (symbol, period)."""
+        n = len(prefix)
+        with self._lock:
+            for key in [key for key in self._entries if key[:n] == prefix]:
+                del self._entries[key]
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
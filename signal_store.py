@@ -0,0 +1,123 @@
+"""
+Latest dashboard signals keyed by (symbol, timeframe).
+
+Replaces the shared latest_signals list: upserts are O(1), every upsert
+bumps a monotonically increasing version, the last ``history`` updates are
+kept in order, and readers (Flask request threads, the Socket.IO connect
+handler) get an immutable snapshot instead of a list the worker is rewriting.
+
+Versions restart at 0 with the process, so every store also carries the
+process EPOCH: a client whose epoch differs holds versions of another
+process and gets the full table.
+"""
+
+import threading
+import uuid
+from bisect import bisect_right
+from collections import deque, namedtuple
+
+# version: store version the snapshot was taken at; signals: tuple of signal dicts
+# ordered by update, each carrying the "version" of its last upsert
+Snapshot = namedtuple("Snapshot", ["version", "signals"])
+
+# signals changed after a client's version; full is True when the client must
+# replace its table (first sync, or a version this store never issued)
+Delta = namedtuple("Delta", ["version", "signals", "full"])
+
+# Identifies this process; versions are only comparable within one epoch
+EPOCH = uuid.uuid4().hex[:12]
+
+
+class SignalStore:
+    def __init__(self, history=50, epoch=EPOCH):
+        """
+        :param history: number of most recent upserts kept by history()
+        :param epoch: epoch the versions belong to, the process EPOCH by default
+        """
+        self.epoch = epoch
+        self._latest = {}    # (symbol, timeframe) -> signal dict, least recently updated first
+        self._history = deque(maxlen=history)
+        self._lock = threading.Lock()
+        self._snapshot = Snapshot(0, ())
+        self._removed_at = 0  # version of the last remove(); older clients need a full sync
+        self.version = 0
+
+    def upsert(self, signal):
+        """
+        Insert or replace the signal of (signal["symbol"], signal["timeframe"]).
+
+        A copy with a "version" key added is stored.
+
+        :return: the new store version
+        """
+        key = (signal["symbol"], signal["timeframe"])
+        with self._lock:
+            self.version += 1
+            signal = dict(signal, version=self.version)
+            # Re-insert so iteration order follows the update order
+            self._latest.pop(key, None)
+            self._latest[key] = signal
+            self._history.append(signal)
+            self._snapshot = None
+            return self.version
+
+    def remove(self, symbol):
+        """
+        Drop every signal of ``symbol`` (e.g. when it is delisted).
+
+        Deltas cannot express removals, so clients behind this version get a full table.
+
+        :return: number of signals removed
+        """
+        with self._lock:
+            keys = [key for key in self._latest if key[0] == symbol]
+            if not keys:
+                return 0
+            for key in keys:
+                del self._latest[key]
+            self.version += 1
+            self._removed_at = self.version
+            self._snapshot = None
+            return len(keys)
+
+    def snapshot(self):
+        """Return the current Snapshot; it is rebuilt at most once per version."""
+        snap = self._snapshot
+        if snap is not None:
+            return snap
+        with self._lock:
+            if self._snapshot is None:
+                self._snapshot = Snapshot(self.version, tuple(self._latest.values()))
+            return self._snapshot
+
+    def changes_since(self, since, epoch=None):
+        """
+        Return the Delta a client at version ``since`` needs to catch up.
+
+        Snapshot signals are ordered by version, so the changed rows are a
+        suffix found by bisection.
+
+        :param epoch: epoch of the client's version; another epoch gets the full table
+        """
+        snap = self.snapshot()
+        if epoch is not None and epoch != self.epoch:
+            return Delta(snap.version, snap.signals, True)
+        if not since or since > snap.version or since < self._removed_at:
+            return Delta(snap.version, snap.signals, True)
+        start = bisect_right(snap.signals, since, key=lambda s: s["version"])
+        return Delta(snap.version, snap.signals[start:], False)
+
+    def etag(self, version=None):
+        """Entity tag of the table at ``version`` (the current one by default): epoch and version."""
+        return f"{self.epoch}-{self.version if version is None else version}"
+
+    def get(self, symbol, timeframe):
+        return self._latest.get((symbol, timeframe))
+
+    def history(self):
+        """The most recent upserts, oldest first."""
+        with self._lock:
+            return tuple(self._history)
+
+    def __len__(self):
+        return len(self._latest)
@@ -1,16 +1,11 @@
 import numpy as np
 import pandas as pd
 
+from ema_filter import ema as ema_array
+
 def calculate_ema(prices, period):
-    emas = []
-    k = 2 / (period + 1)
-    for i, price in enumerate(prices):
-        if i == 0:
-            emas.append(price)
-        else:
-            ema = price * k + emas[-1] * (1 - k)
-            emas.append(ema)
-    return emas
+    """EMA of ``prices`` as a list; first value is the first price, k = 2 / (period + 1)."""
+    return ema_array(np.asarray(prices, dtype=float), period).tolist()
 
 def heikin_ashi(df):
     ha_df = df.copy()
@@ -58,24 +53,20 @@ def detect_bearish_engulfing(df):
            and last['open'] > prev['close'] and last['close'] < prev['open']
 
 # --- Multi-Timeframe Confirmation ---
-def multi_timeframe_confirmation(lower_signal, mid_df, high_df):
-    if lower_signal is None:
-        return None
-
-    def get_bias(df):
-        if df is None or len(df) < 50:
-            return None, 0
-        ha = heikin_ashi(df)
-        ema = ha['close'].ewm(span=100, adjust=False).mean()
-        ema_slope = ema.iloc[-1] - ema.iloc[-5]
-        bullish = ha['close'].mean() > ha['open'].mean()
-        bearish = ha['close'].mean() < ha['open'].mean()
-        return ("bullish" if ema_slope > 0 and bullish else
-                "bearish" if ema_slope < 0 and bearish else None), ema_slope
-
-    mid_bias, _ = get_bias(mid_df)
-    high_bias, _ = get_bias(high_df)
+def get_bias(df):
+    """Return (bias, ema_slope) of a higher timeframe; bias is "bullish", "bearish" or None."""
+    if df is None or len(df) < 50:
+        return None, 0
+    ha = heikin_ashi(df)
+    ema = ha['close'].ewm(span=100, adjust=False).mean()
+    ema_slope = ema.iloc[-1] - ema.iloc[-5]
+    bullish = ha['close'].mean() > ha['open'].mean()
+    bearish = ha['close'].mean() < ha['open'].mean()
+    return ("bullish" if ema_slope > 0 and bullish else
+            "bearish" if ema_slope < 0 and bearish else None), ema_slope
 
+def confirm_signal(lower_signal, mid_bias, high_bias):
+    """Confirm a lower timeframe signal against already computed higher timeframe biases."""
     if lower_signal == "buy" and mid_bias == "bullish" and high_bias != "bearish":
         return "buy"
     elif lower_signal == "sell" and mid_bias == "bearish" and high_bias != "bullish":
@@ -83,78 +74,108 @@ def multi_timeframe_confirmation(lower_signal, mid_df, high_df):
     else:
         return None
 
-# --- Main Analyzer with Confidence ---
-def analyze_candles(df, mid_df=None, high_df=None, debug=False):
-    if len(df) < 50:
-        if debug:
-            print("Not enough candles: have", len(df))
+def multi_timeframe_confirmation(lower_signal, mid_df, high_df):
+    if lower_signal is None:
         return None
 
-    ha_df = heikin_ashi(df)
-    atr = calculate_atr(df)
-    jaw, teeth, lips = calculate_alligator(ha_df)
-    k, d = stochastic_oscillator(ha_df)
-    ema = ha_df['close'].ewm(span=150, adjust=False).mean()
-
-    last_idx = -1
-    recent = ha_df.iloc[-30:]
-    bullish_bias = recent['close'].mean() > recent['open'].mean()
-    bearish_bias = recent['close'].mean() < recent['open'].mean()
-    bullish_pattern = detect_bullish_engulfing(recent)
-    bearish_pattern = detect_bearish_engulfing(recent)
-
-    ema_slope = ema.iloc[-1] - ema.iloc[-5]
-    min_atr = atr.iloc[last_idx] > df['close'].mean() * 0.001
-    last_candle = ha_df.iloc[last_idx]
-    body = abs(last_candle['close'] - last_candle['open'])
-    upper_wick = last_candle['high'] - max(last_candle['close'], last_candle['open'])
-    lower_wick = min(last_candle['close'], last_candle['open']) - last_candle['low']
-
-    momentum_bull = (ha_df['close'].iloc[-3:] > ha_df['open'].iloc[-3:]).sum() >= 2
-    momentum_bear = (ha_df['close'].iloc[-3:] < ha_df['open'].iloc[-3:]).sum() >= 2
-
-    # --- Scoring system ---
-    score = 0
+    mid_bias, _ = get_bias(mid_df)
+    high_bias, _ = get_bias(high_df)
+    return confirm_signal(lower_signal, mid_bias, high_bias)
+
+# --- Scoring ---
+def score_features(f):
+    """
+    Score the last bar for buy and sell setups.
+
+    :param f: dict with the last-bar values: close (Heikin-Ashi), jaw, teeth,
+              lips, k, d, atr, min_atr, bullish_bias, bearish_bias,
+              bullish_pattern, bearish_pattern, ema_slope, momentum_bull,
+              momentum_bear
+    :return: (raw_signal, confidence) where raw_signal is "buy", "sell" or None
+    """
     total_checks = 10
 
     # Buy conditions
-    if ha_df['close'].iloc[last_idx] > jaw.iloc[last_idx]: score += 1
-    if ha_df['close'].iloc[last_idx] > teeth.iloc[last_idx]: score += 1
-    if ha_df['close'].iloc[last_idx] > lips.iloc[last_idx]: score += 1
-    if k.iloc[last_idx] > d.iloc[last_idx]: score += 1
-    if k.iloc[last_idx] < 30: score += 1
-    if bullish_bias: score += 1
-    if bullish_pattern: score += 1
-    if atr.iloc[last_idx] > 0 and min_atr: score += 1
-    if ema_slope > 0: score += 1
-    if momentum_bull: score += 1
+    score = 0
+    if f["close"] > f["jaw"]: score += 1
+    if f["close"] > f["teeth"]: score += 1
+    if f["close"] > f["lips"]: score += 1
+    if f["k"] > f["d"]: score += 1
+    if f["k"] < 30: score += 1
+    if f["bullish_bias"]: score += 1
+    if f["bullish_pattern"]: score += 1
+    if f["atr"] > 0 and f["min_atr"]: score += 1
+    if f["ema_slope"] > 0: score += 1
+    if f["momentum_bull"]: score += 1
 
     buy_score = score
 
     # Reset for sell scoring
     score = 0
-    if ha_df['close'].iloc[last_idx] < jaw.iloc[last_idx]: score += 1
-    if ha_df['close'].iloc[last_idx] < teeth.iloc[last_idx]: score += 1
-    if ha_df['close'].iloc[last_idx] < lips.iloc[last_idx]: score += 1
-    if k.iloc[last_idx] < d.iloc[last_idx]: score += 1
-    if k.iloc[last_idx] > 80: score += 1
-    if bearish_bias: score += 1
-    if bearish_pattern: score += 1
-    if atr.iloc[last_idx] > 0 and min_atr: score += 1
-    if ema_slope < 0: score += 1
-    if momentum_bear: score += 1
+    if f["close"] < f["jaw"]: score += 1
+    if f["close"] < f["teeth"]: score += 1
+    if f["close"] < f["lips"]: score += 1
+    if f["k"] < f["d"]: score += 1
+    if f["k"] > 80: score += 1
+    if f["bearish_bias"]: score += 1
+    if f["bearish_pattern"]: score += 1
+    if f["atr"] > 0 and f["min_atr"]: score += 1
+    if f["ema_slope"] < 0: score += 1
+    if f["momentum_bear"]: score += 1
 
     sell_score = score
 
     # Decide raw signal
     if buy_score >= sell_score and buy_score >= 6:
-        raw_signal = "buy"
-        confidence = int((buy_score / total_checks) * 100)
+        return "buy", int((buy_score / total_checks) * 100)
     elif sell_score > buy_score and sell_score >= 6:
-        raw_signal = "sell"
-        confidence = int((sell_score / total_checks) * 100)
-    else:
-        raw_signal, confidence = None, 0
+        return "sell", int((sell_score / total_checks) * 100)
+    return None, 0
+
+def candle_features(df):
+    """Compute the last-bar values used by score_features from an OHLC DataFrame."""
+    ha_df = heikin_ashi(df)
+    atr = calculate_atr(df)
+    jaw, teeth, lips = calculate_alligator(ha_df)
+    k, d = stochastic_oscillator(ha_df)
+    ema = ha_df['close'].ewm(span=150, adjust=False).mean()
+
+    last_idx = -1
+    recent = ha_df.iloc[-30:]
+
+    return {
+        "close": ha_df['close'].iloc[last_idx],
+        "jaw": jaw.iloc[last_idx],
+        "teeth": teeth.iloc[last_idx],
+        "lips": lips.iloc[last_idx],
+        "k": k.iloc[last_idx],
+        "d": d.iloc[last_idx],
+        "atr": atr.iloc[last_idx],
+        "min_atr": atr.iloc[last_idx] > df['close'].mean() * 0.001,
+        "bullish_bias": recent['close'].mean() > recent['open'].mean(),
+        "bearish_bias": recent['close'].mean() < recent['open'].mean(),
+        "bullish_pattern": detect_bullish_engulfing(recent),
+        "bearish_pattern": detect_bearish_engulfing(recent),
+        "ema_slope": ema.iloc[-1] - ema.iloc[-5],
+        "momentum_bull": (ha_df['close'].iloc[-3:] > ha_df['open'].iloc[-3:]).sum() >= 2,
+        "momentum_bear": (ha_df['close'].iloc[-3:] < ha_df['open'].iloc[-3:]).sum() >= 2,
+    }
+
+def score_candles(df):
+    """Return the unconfirmed (raw_signal, confidence), or None with fewer than 50 candles."""
+    if len(df) < 50:
+        return None
+    return score_features(candle_features(df))
+
+# --- Main Analyzer with Confidence ---
+def analyze_candles(df, mid_df=None, high_df=None, debug=False):
+    scored = score_candles(df)
+    if scored is None:
+        if debug:
+            print("Not enough candles: have", len(df))
+        return None
+
+    raw_signal, confidence = scored
 
     # Apply multi-timeframe confirmation
     confirmed = multi_timeframe_confirmation(raw_signal, mid_df, high_df)
@@ -0,0 +1,156 @@
+"""
+Pure-NumPy implementation of the strategy.py pipeline.
+
+Same indicators and scoring as strategy.analyze_candles, but on plain float
+arrays instead of DataFrames, which avoids most of the pandas overhead per
+call. Every function works along the last axis, so a 2-D array of several
+series (one per row) is handled in one call as well.
+"""
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from ema_filter import ema as ema_array
+from strategy import score_features, multi_timeframe_confirmation
+
+MIN_BARS = 50  # same minimum as strategy.analyze_candles
+
+
+def rolling_mean(values, window):
+    """pandas rolling(window).mean() along the last axis (NaN until the window is full)."""
+    out = np.full(values.shape, np.nan)
+    if values.shape[-1] >= window:
+        out[..., window - 1:] = sliding_window_view(values, window, axis=-1).mean(axis=-1)
+    return out
+
+
+def _rolling(values, window, reducer):
+    out = np.full(values.shape, np.nan)
+    if values.shape[-1] >= window:
+        out[..., window - 1:] = reducer(sliding_window_view(values, window, axis=-1), axis=-1)
+    return out
+
+
+def ema(values, span):
+    """pandas ewm(span=span, adjust=False).mean() along the last axis."""
+    return ema_array(values, span)
+
+
+def heikin_ashi(o, h, l, c):
+    """Return Heikin-Ashi (open, high, low, close), as strategy.heikin_ashi."""
+    ha_close = (o + h + l + c) / 4
+    ha_open = np.empty_like(ha_close)
+    ha_open[..., 0] = o[..., 0]
+    ha_open[..., 1:] = (o[..., :-1] + c[..., :-1]) / 2
+    ha_high = np.maximum(np.maximum(ha_open, ha_close), h)
+    ha_low = np.minimum(np.minimum(ha_open, ha_close), l)
+    return ha_open, ha_high, ha_low, ha_close
+
+
+def calculate_atr(h, l, c, period=14):
+    tr = h - l
+    prev_close = c[..., :-1]
+    tr[..., 1:] = np.maximum(tr[..., 1:], np.maximum(np.abs(h[..., 1:] - prev_close),
+                                                      np.abs(l[..., 1:] - prev_close)))
+    return rolling_mean(tr, period)
+
+
+def calculate_alligator(h, l, jaw=13, teeth=8, lips=5):
+    median_price = (h + l) / 2
+    return (rolling_mean(median_price, jaw),
+            rolling_mean(median_price, teeth),
+            rolling_mean(median_price, lips))
+
+
+def stochastic_oscillator(h, l, c, k_period=14, d_period=3):
+    low_min = _rolling(l, k_period, np.min)
+    high_max = _rolling(h, k_period, np.max)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        k = 100 * (c - low_min) / (high_max - low_min)
+    return k, rolling_mean(k, d_period)
+
+
+def detect_bullish_engulfing(o, c):
+    """Bullish engulfing on the last two bars (per row for 2-D input)."""
+    if o.shape[-1] < 2:
+        return np.zeros(o.shape[:-1], dtype=bool)
+    p_open, p_close, l_open, l_close = o[..., -2], c[..., -2], o[..., -1], c[..., -1]
+    return (l_close > l_open) & (p_close < p_open) & (l_close > p_open) & (l_open < p_close)
+
+
+def detect_bearish_engulfing(o, c):
+    """Bearish engulfing on the last two bars (per row for 2-D input)."""
+    if o.shape[-1] < 2:
+        return np.zeros(o.shape[:-1], dtype=bool)
+    p_open, p_close, l_open, l_close = o[..., -2], c[..., -2], o[..., -1], c[..., -1]
+    return (l_close < l_open) & (p_close > p_open) & (l_open > p_close) & (l_close < p_open)
+
+
+def _ohlc_columns(ohlc):
+    """Split a DataFrame or a (bars, 4) open/high/low/close array into float columns."""
+    if isinstance(ohlc, pd.DataFrame):
+        return tuple(ohlc[col].to_numpy(dtype=float) for col in ("open", "high", "low", "close"))
+    ohlc = np.asarray(ohlc, dtype=float)
+    return ohlc[:, 0], ohlc[:, 1], ohlc[:, 2], ohlc[:, 3]
+
+
+def candle_features(ohlc):
+    """NumPy counterpart of strategy.candle_features."""
+    o, h, l, c = _ohlc_columns(ohlc)
+    ha_o, ha_h, ha_l, ha_c = heikin_ashi(o, h, l, c)
+    atr = calculate_atr(h, l, c)
+    jaw, teeth, lips = calculate_alligator(ha_h, ha_l)
+    k, d = stochastic_oscillator(ha_h, ha_l, ha_c)
+    ema_line = ema(ha_c, 150)
+
+    recent_o, recent_c = ha_o[-30:], ha_c[-30:]
+    return {
+        "close": ha_c[-1],
+        "jaw": jaw[-1],
+        "teeth": teeth[-1],
+        "lips": lips[-1],
+        "k": k[-1],
+        "d": d[-1],
+        "atr": atr[-1],
+        "min_atr": atr[-1] > c.mean() * 0.001,
+        "bullish_bias": recent_c.mean() > recent_o.mean(),
+        "bearish_bias": recent_c.mean() < recent_o.mean(),
+        "bullish_pattern": bool(detect_bullish_engulfing(recent_o, recent_c)),
+        "bearish_pattern": bool(detect_bearish_engulfing(recent_o, recent_c)),
+        "ema_slope": ema_line[-1] - ema_line[-5],
+        "momentum_bull": (ha_c[-3:] > ha_o[-3:]).sum() >= 2,
+        "momentum_bear": (ha_c[-3:] < ha_o[-3:]).sum() >= 2,
+    }
+
+
+def score_candles(ohlc):
+    """NumPy counterpart of strategy.score_candles."""
+    if len(ohlc) < MIN_BARS:
+        return None
+    return score_features(candle_features(ohlc))
+
+
+def analyze_candles(ohlc, mid_df=None, high_df=None, debug=False):
+    """
+    NumPy fast path for strategy.analyze_candles (same return value).
+
+    :param ohlc: DataFrame with open/high/low/close columns or a (bars, 4) array
+    """
+    scored = score_candles(ohlc)
+    if scored is None:
+        if debug:
+            print("Not enough candles: have", len(ohlc))
+        return None
+
+    raw_signal, confidence = scored
+
+    confirmed = multi_timeframe_confirmation(raw_signal, mid_df, high_df)
+    if confirmed is None:
+        confidence = 0  # reject if higher TF disagrees
+
+    if debug:
+        print("--- Candle Analysis Debug (numpy) ---")
+        print("Raw:", raw_signal, "Confirmed:", confirmed, "Confidence:", confidence)
+
+    return {"signal": confirmed, "confidence": confidence}
@@ -2,7 +2,7 @@
 """
 Strategy Runner
 ---------------
-- Connects to Pocket Option WebSocket via PocketOptionWS
+- Connects to Pocket Option via the asyncio AsyncFeedClient
 - Feeds live candlestick data into strategy.py
 - Evaluates strategies on each new candle
 - Prints (or later sends) signals in real time
@@ -13,7 +13,7 @@ import json
 import pandas as pd
 from datetime import datetime
 
-from pocket_option import PocketOptionWS
+from async_feed import default_client
 import strategy  # your existing strategy.py file with logic
 
 # Symbols & Timeframes to monitor
@@ -58,7 +58,7 @@ async def on_candle(symbol, data):
         print(f"Error processing candle for {symbol}: {e}")
 
 async def main():
-    ws = PocketOptionWS()
+    ws = default_client()
 
     # Connect WebSocket
     await ws.connect()
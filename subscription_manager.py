@@ -0,0 +1,186 @@
+# subscription_manager.py
+"""
+Diff-based, paced feed subscriptions.
+
+Every ``assets`` refresh is diffed against the active asset set: only new
+assets are subscribed and only disabled ones unsubscribed. The resulting
+``subscribe`` / ``unsubscribe`` frames go through an outbound queue drained
+at a token-bucket rate instead of hundreds of emits in a tight loop. A
+change that is undone before it was sent (an asset flapping off and on)
+cancels out without touching the wire.
+
+A stream counts as subscribed upstream only once its frame was sent; a
+failed send puts the frame back in the queue.
+
+Disabled assets are handed to ``on_removed(asset)`` so their stored state
+can be evicted (see data_fetcher.evict_asset).
+"""
+
+import logging
+import threading
+import time
+from collections import Counter, OrderedDict
+
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        """
+        :param rate: tokens added per second
+        :param burst: bucket size (frames that may go out back to back)
+        """
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take one token, sleeping until one is available."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class SubscriptionManager:
+    def __init__(self, send, periods=(), ticks=True, rate=20.0, burst=20, on_removed=None, retry_delay=1.0):
+        """
+        :param send: callable(event, payload) writing one frame to the feed, e.g. hub.emit
+        :param periods: candle periods subscribed per asset (empty for none)
+        :param ticks: whether to subscribe to ticks per asset
+        :param rate: subscription frames per second
+        :param burst: frames that may be sent back to back
+        :param on_removed: callable(asset) called for every asset that left the universe
+        :param retry_delay: seconds to wait after a failed send before the next frame
+        """
+        self.send = send
+        self.periods = tuple(int(p) for p in periods)
+        self.ticks = ticks
+        self.bucket = TokenBucket(rate, burst)
+        self.on_removed = on_removed
+        self.retry_delay = retry_delay
+        self.active = set()         # assets in the current universe
+        self._sent = set()          # streams subscribed upstream on this connection
+        self._pending = OrderedDict()  # stream -> "subscribe" / "unsubscribe", oldest first
+        self._in_flight = None      # stream whose frame is being sent
+        self._cond = threading.Condition()
+        self._thread = None
+        self.counts = Counter()
+
+    def streams(self, asset):
+        """The (type, asset, period) streams one asset is subscribed to."""
+        streams = [("ticks", asset, None)] if self.ticks else []
+        return streams + [("candles", asset, period) for period in self.periods]
+
+    def update(self, assets):
+        """
+        Make ``assets`` the active universe.
+
+        :return: (added, removed) asset sets
+        """
+        assets = set(assets)
+        with self._cond:
+            added = assets - self.active
+            removed = self.active - assets
+            self.active = assets
+            for asset in sorted(added):
+                for stream in self.streams(asset):
+                    self._want(stream, True)
+            for asset in sorted(removed):
+                for stream in self.streams(asset):
+                    self._want(stream, False)
+            self._cond.notify()
+        if added or removed:
+            logging.info(f"[SUBSCRIPTIONS] +{len(added)} -{len(removed)} assets, {len(self._pending)} frames queued")
+        if self.on_removed is not None:
+            for asset in removed:
+                try:
+                    self.on_removed(asset)
+                except Exception as e:
+                    logging.error(f"[SUBSCRIPTIONS] Evicting {asset} failed: {e}")
+        self.counts["added"] += len(added)
+        self.counts["removed"] += len(removed)
+        return added, removed
+
+    def _want(self, stream, subscribed):
+        # Queue a frame only if it changes what the server has; otherwise cancel the pending one
+        if (stream in self._sent) == subscribed:
+            if self._pending.pop(stream, None) is not None:
+                self.counts["cancelled"] += 1
+        else:
+            self._pending[stream] = "subscribe" if subscribed else "unsubscribe"
+
+    def reset(self):
+        """The connection was re-established: nothing is subscribed upstream any more, so queue the universe again."""
+        with self._cond:
+            self._sent.clear()
+            self._pending.clear()
+            self._in_flight = None  # a frame sent on the old connection changes nothing here
+            for asset in sorted(self.active):
+                for stream in self.streams(asset):
+                    self._pending[stream] = "subscribe"
+            self._cond.notify()
+        return self
+
+    def _next(self):
+        """Take the oldest queued frame; pass it to _finish() once the send returned."""
+        with self._cond:
+            while not self._pending:
+                self._cond.wait()
+            stream, event = self._pending.popitem(last=False)
+            self._in_flight = stream
+            return stream, event
+
+    def _finish(self, stream, event, sent):
+        """Record the outcome of sending ``event`` for ``stream`` and queue whatever is still missing."""
+        with self._cond:
+            if self._in_flight != stream:
+                return  # reset() while it was sent
+            self._in_flight = None
+            if sent and event == "subscribe":
+                self._sent.add(stream)
+            elif sent:
+                self._sent.discard(stream)
+            # Re-queues a failed frame, and reconciles updates made while it was in flight
+            self._want(stream, stream[1] in self.active)
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            self.bucket.acquire()
+            stream, event = self._next()
+            kind, asset, period = stream
+            payload = {"type": kind, "asset": asset}
+            if period is not None:
+                payload["period"] = period
+            try:
+                self.send(event, payload)
+                self.counts[event] += 1
+                sent = True
+            except Exception as e:
+                self.counts["errors"] += 1
+                logging.error(f"[SUBSCRIPTIONS] {event} {asset} failed: {e}")
+                sent = False
+            self._finish(stream, event, sent)
+            if not sent:
+                time.sleep(self.retry_delay)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="subscriptions", daemon=True)
+            self._thread.start()
+        return self
+
+    def stats(self):
+        return {
+            "assets": len(self.active),
+            "streams": len(self._sent),
+            "pending": len(self._pending),
+            **self.counts,
+        }
@@ -0,0 +1,73 @@
+# telegram_stub.py
+"""
+Local stand-in for the Telegram Bot API sendMessage endpoint.
+
+Run it and point the bot at it:
+
+    python telegram_stub.py --port 8081
+    TELEGRAM_API_URL=http://127.0.0.1:8081 python app.py
+
+It answers 429 with ``retry_after`` like Telegram when a chat gets more than
+one message per second or all chats together more than 30, and can fail a
+fraction of requests with 500 to exercise retries. Received messages are
+logged and listed at GET /messages.
+"""
+
+import argparse
+import logging
+import random
+import time
+from collections import defaultdict
+
+from flask import Flask, jsonify, request
+
+from telegram_utils import RateLimiter
+
+app = Flask(__name__)
+
+messages = []
+chat_limits = defaultdict(lambda: RateLimiter(1))
+global_limit = RateLimiter(30)
+FAILURE_RATE = 0.0
+
+
+@app.route("/bot<token>/sendMessage", methods=["POST"])
+def send_message(token):
+    payload = request.get_json(silent=True) or request.form
+    chat_id = str(payload.get("chat_id"))
+    now = time.monotonic()
+
+    if random.random() < FAILURE_RATE:
+        return jsonify({"ok": False, "error_code": 500, "description": "Internal Server Error"}), 500
+
+    delay = max(chat_limits[chat_id].delay(now), global_limit.delay(now))
+    if delay > 0:
+        retry_after = max(1, round(delay))
+        return jsonify({
+            "ok": False,
+            "error_code": 429,
+            "description": f"Too Many Requests: retry after {retry_after}",
+            "parameters": {"retry_after": retry_after},
+        }), 429
+
+    chat_limits[chat_id].record(now)
+    global_limit.record(now)
+    messages.append({"chat_id": chat_id, "text": payload.get("text"), "time": time.time()})
+    logging.info(f"[STUB] {chat_id}: {payload.get('text')}")
+    return jsonify({"ok": True, "result": {"message_id": len(messages), "chat": {"id": chat_id}}})
+
+
+@app.route("/messages")
+def list_messages():
+    return jsonify(messages)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="fraction of requests answered with 500")
+    args = parser.parse_args()
+
+    FAILURE_RATE = args.failure_rate
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    app.run(host="127.0.0.1", port=args.port, threaded=True)
@@ -1,12 +1,25 @@
 # telegram_utils.py
 """
 Utility module for handling Telegram bot messaging.
+
+send_telegram_message posts one message synchronously. TelegramNotifier
+sends from the background instead: alerts go to a bounded queue, messages
+queued for the same chat within a short window are merged, Telegram's
+per-chat and global rate limits are respected and failed sends are retried
+with backoff (honouring ``retry_after`` on HTTP 429).
 """
 
 import os
+import queue
+import random
+import threading
+import time
 import requests
 import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
 
 # Load environment variables from .env file
 load_dotenv()
@@ -15,34 +28,252 @@ load_dotenv()
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
 TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
 
-def send_telegram_message(message: str) -> bool:
+# Bot API base URL; point it at a local stub (see telegram_stub.py) for testing
+TELEGRAM_API_URL = os.getenv("TELEGRAM_API_URL", "https://api.telegram.org").rstrip("/")
+
+# (connect, read) timeout in seconds for every Bot API call
+TELEGRAM_TIMEOUT = (3.05, 10)
+
+# Telegram rejects longer messages
+MAX_MESSAGE_LENGTH = 4096
+
+# Pooled keep-alive connections shared by all senders
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+_session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+
+
+def post_message(chat_id, text):
     """
-    Send a message to the configured Telegram chat.
-    
+    Post one message through the Bot API.
+
+    Returns:
+        tuple: (sent, retry_after). retry_after is None when the error is
+        permanent, the server-requested delay in seconds on HTTP 429, and 0
+        for transient errors (network, 5xx) that should be retried with backoff.
+    """
+    url = f"{TELEGRAM_API_URL}/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
+    payload = {
+        "chat_id": chat_id,
+        "text": text,
+        "parse_mode": "HTML"
+    }
+    try:
+        response = _session.post(url, json=payload, timeout=TELEGRAM_TIMEOUT)
+    except requests.RequestException as e:
+        logging.error(f"Error sending Telegram message: {str(e)}")
+        return False, 0
+
+    if response.status_code == 200:
+        return True, None
+    if response.status_code == 429:
+        try:
+            retry_after = response.json()["parameters"]["retry_after"]
+        except (ValueError, KeyError, TypeError):
+            retry_after = 1
+        return False, max(float(retry_after), 0.001)
+    logging.error(f"Failed to send Telegram message: {response.text}")
+    return False, (0 if response.status_code >= 500 else None)
+
+
+def send_telegram_message(message: str, chat_id=None) -> bool:
+    """
+    Send a message to a Telegram chat.
+
     Args:
         message (str): Message text to send.
-    
+        chat_id: Target chat; defaults to TELEGRAM_CHAT_ID.
+
     Returns:
         bool: True if sent successfully, False otherwise.
     """
-    if not TELEGRAM_BOT_TOKEN or not TELEGRAM_CHAT_ID:
+    chat_id = chat_id or TELEGRAM_CHAT_ID
+    if not TELEGRAM_BOT_TOKEN or not chat_id:
         logging.error("Telegram credentials are missing in environment variables.")
         return False
 
-    url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
-    payload = {
-        "chat_id": TELEGRAM_CHAT_ID,
-        "text": message,
-        "parse_mode": "HTML"
-    }
-    try:
-        response = requests.post(url, json=payload)
-        if response.status_code == 200:
-            logging.info(f"Telegram message sent: {message}")
+    sent, _ = post_message(chat_id, message)
+    if sent:
+        logging.info(f"Telegram message sent: {message}")
+    return sent
+
+
+class RateLimiter:
+    """Allow at most ``rate`` events per ``per`` seconds (sliding window)."""
+
+    def __init__(self, rate, per=1.0):
+        self.rate = rate
+        self.per = per
+        self._times = deque()
+
+    def delay(self, now):
+        """Seconds until another event is allowed (0 if allowed now)."""
+        while self._times and self._times[0] <= now - self.per:
+            self._times.popleft()
+        if len(self._times) < self.rate:
+            return 0.0
+        return self._times[0] + self.per - now
+
+    def record(self, now):
+        self._times.append(now)
+
+
+class TelegramNotifier:
+    def __init__(self, send=post_message, workers=4, maxsize=1000, per_chat_interval=1.0,
+                 global_rate=30, coalesce_window=0.25, max_retries=5, max_backoff=60.0, on_result=None,
+                 clock=time.monotonic):
+        """
+        :param send: callable(chat_id, text) -> (sent, retry_after), see post_message
+        :param workers: concurrent HTTP requests
+        :param maxsize: bound of the incoming queue; alerts beyond it are dropped
+        :param per_chat_interval: minimum seconds between two messages to one chat
+        :param global_rate: maximum messages per second over all chats
+        :param coalesce_window: seconds to wait for more alerts before sending to a chat
+        :param max_retries: attempts per message before it is dropped
+        :param on_result: optional callable(refs, sent) called from a worker thread
+                          with the refs passed to notify() once their message was
+                          sent (True) or given up on (False)
+        :param clock: callable() -> seconds, used for coalescing, rate limits and retries
+        """
+        self.send = send
+        self.clock = clock
+        self.on_result = on_result
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.per_chat_interval = per_chat_interval
+        self.coalesce_window = coalesce_window
+        self.max_retries = max_retries
+        self.max_backoff = max_backoff
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="telegram")
+        self._global = RateLimiter(global_rate)
+        self._lock = threading.Lock()
+        self._buffers = {}       # chat_id -> (text, ref) items waiting to be sent
+        self._first_queued = {}  # chat_id -> when its oldest buffered text arrived
+        self._next_allowed = {}  # chat_id -> earliest time of the next send
+        self._attempts = {}      # chat_id -> failed attempts of the buffered head
+        self._in_flight = set()
+        self._thread = None
+        self.sent = 0       # Bot API messages
+        self.delivered = 0  # alerts, several per message when merged
+        self.retries = 0
+        self.failed = 0
+        self.dropped = 0
+
+    def notify(self, chat_id, text, ref=None):
+        """Queue an alert without blocking; returns False if the queue is full."""
+        try:
+            self.queue.put_nowait((chat_id, text, ref))
             return True
-        else:
-            logging.error(f"Failed to send Telegram message: {response.text}")
+        except queue.Full:
+            self.dropped += 1
+            logging.warning(f"[TELEGRAM] Queue full, dropped alert for {chat_id}")
             return False
-    except Exception as e:
-        logging.error(f"Error sending Telegram message: {str(e)}")
-        return False
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="telegram-notifier", daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self):
+        while True:
+            self._poll(timeout=0.05)
+
+    def _poll(self, timeout):
+        """Buffer everything queued (waiting up to ``timeout`` for the first alert), then dispatch."""
+        try:
+            item = self.queue.get(timeout=timeout) if timeout else self.queue.get_nowait()
+        except queue.Empty:
+            item = None
+        with self._lock:
+            while item is not None:
+                chat_id, text, ref = item
+                if chat_id not in self._buffers:
+                    self._buffers[chat_id] = []
+                    self._first_queued[chat_id] = self.clock()
+                self._buffers[chat_id].append((text, ref))
+                try:
+                    item = self.queue.get_nowait()
+                except queue.Empty:
+                    item = None
+            self._dispatch_ready(self.clock())
+
+    def _dispatch_ready(self, now):
+        """Hand every chat that may send now to the worker pool. Caller holds the lock."""
+        for chat_id in list(self._buffers):
+            if chat_id in self._in_flight or self._next_allowed.get(chat_id, 0) > now:
+                continue
+            if now - self._first_queued[chat_id] < self.coalesce_window:
+                continue
+            if self._global.delay(now) > 0:
+                return
+
+            items = self._take(chat_id)
+            self._global.record(now)
+            self._next_allowed[chat_id] = now + self.per_chat_interval
+            self._in_flight.add(chat_id)
+            self._executor.submit(self._deliver, chat_id, items)
+
+    def _take(self, chat_id):
+        """Pop as many buffered items as fit in one message. Caller holds the lock."""
+        buffered = self._buffers[chat_id]
+        count, length = 0, 0
+        for text, _ in buffered:
+            length += len(text) + 1
+            if count and length > MAX_MESSAGE_LENGTH:
+                break
+            count += 1
+        items, rest = buffered[:count], buffered[count:]
+        if rest:
+            self._buffers[chat_id] = rest
+        else:
+            del self._buffers[chat_id]
+            del self._first_queued[chat_id]
+        return items
+
+    def _deliver(self, chat_id, items):
+        text = "\n".join(text for text, _ in items)[:MAX_MESSAGE_LENGTH]
+        try:
+            sent, retry_after = self.send(chat_id, text)
+        except Exception as e:
+            logging.error(f"[TELEGRAM] Send failed for {chat_id}: {e}")
+            sent, retry_after = False, 0
+
+        with self._lock:
+            self._in_flight.discard(chat_id)
+            if sent:
+                self.sent += 1
+                self.delivered += len(items)
+                self._attempts.pop(chat_id, None)
+                finished = True
+            else:
+                attempts = self._attempts.get(chat_id, 0) + 1
+                finished = retry_after is None or attempts > self.max_retries
+                if finished:
+                    self.failed += len(items)
+                    self._attempts.pop(chat_id, None)
+                    logging.error(f"[TELEGRAM] Giving up on {len(items)} alert(s) for {chat_id}")
+                else:
+                    # Put the items back in front and wait retry_after, or back off exponentially
+                    self.retries += 1
+                    self._attempts[chat_id] = attempts
+                    delay = retry_after or min(2 ** attempts, self.max_backoff) * random.uniform(0.5, 1.0)
+                    now = self.clock()
+                    self._buffers[chat_id] = items + self._buffers.get(chat_id, [])
+                    self._first_queued.setdefault(chat_id, now - self.coalesce_window)
+                    self._next_allowed[chat_id] = now + delay
+
+        if finished and self.on_result is not None:
+            refs = [ref for _, ref in items if ref is not None]
+            if refs:
+                self.on_result(refs, sent)
+
+    def stats(self):
+        return {
+            "queued": self.queue.qsize(),
+            "buffered": sum(len(items) for items in list(self._buffers.values())),
+            "sent": self.sent,
+            "delivered": self.delivered,
+            "retries": self.retries,
+            "failed": self.failed,
+            "dropped": self.dropped,
+        }
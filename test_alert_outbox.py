@@ -0,0 +1,94 @@
+# test_alert_outbox.py
+"""
+Outbox tests: the (symbol, timeframe, bar_time, direction, chat_id) key makes
+re-enqueueing an alert a no-op, also across restarts, and rows stay pending
+until the notifier reports them sent; sent rows are pruned after keep_sent.
+"""
+
+from alert_outbox import AlertOutbox
+
+
+class FakeNotifier:
+    def __init__(self):
+        self.on_result = None
+        self.offered = []
+
+    def notify(self, chat_id, text, ref=None):
+        self.offered.append((chat_id, text, ref))
+        return True
+
+
+def outbox(path, **kwargs):
+    notifier = FakeNotifier()
+    box = AlertOutbox(str(path), notifier, **kwargs)
+    return box, notifier, box._connect()
+
+
+def test_duplicate_alerts_are_inserted_once(tmp_path):
+    box, notifier, db = outbox(tmp_path / "outbox.db")
+    box.enqueue("EURUSD", "1m", 1700000000, "BUY", ["1", "2"], "EURUSD 1m signal: BUY")
+    box.enqueue("EURUSD", "1m", 1700000000, "BUY", ["1"], "EURUSD 1m signal: BUY")
+    box.run_once(db)
+    # The same bar evaluated again in a later pass
+    box.enqueue("EURUSD", "1m", 1700000000, "BUY", ["1", "2"], "EURUSD 1m signal: BUY")
+    box.run_once(db)
+
+    assert box.enqueued == 2
+    assert box.duplicates == 3
+    assert sorted(chat for chat, _, _ in notifier.offered) == ["1", "2"]
+
+    # A new bar or direction is a new alert
+    box.enqueue("EURUSD", "1m", 1700000060, "BUY", ["1"], "EURUSD 1m signal: BUY")
+    box.enqueue("EURUSD", "1m", 1700000060, "SELL", ["1"], "EURUSD 1m signal: SELL")
+    box.run_once(db)
+    assert box.enqueued == 4
+    assert len(notifier.offered) == 4
+
+
+def test_pending_alerts_survive_a_restart(tmp_path):
+    box, notifier, db = outbox(tmp_path / "outbox.db")
+    box.enqueue("EURUSD", "1m", 1700000000, "BUY", ["1", "2"], "text")
+    box.run_once(db)
+    first, second = [ref for _, _, ref in notifier.offered]
+    box._on_result([first], True)
+    box.run_once(db)
+    db.close()
+
+    # Chat 2 was never confirmed: offered again after a restart, chat 1 is not
+    box, notifier, db = outbox(tmp_path / "outbox.db")
+    box.enqueue("EURUSD", "1m", 1700000000, "BUY", ["1", "2"], "text")
+    box.run_once(db)
+    assert box.duplicates == 2
+    assert [(chat, ref) for chat, _, ref in notifier.offered] == [("2", second)]
+
+
+def test_failed_delivery_is_retried(tmp_path):
+    box, notifier, db = outbox(tmp_path / "outbox.db", retry_delay=0, max_attempts=2)
+    box.enqueue("EURUSD", "1m", 1700000000, "BUY", ["1"], "text")
+    box.run_once(db)
+    ref = notifier.offered[-1][2]
+
+    box._on_result([ref], False)
+    box.run_once(db)
+    assert box.requeued == 1
+    assert [r for _, _, r in notifier.offered] == [ref, ref]
+
+    # max_attempts reached: marked failed and no longer offered
+    box._on_result([ref], False)
+    box.run_once(db)
+    assert len(notifier.offered) == 2
+
+
+def test_old_sent_alerts_are_pruned(tmp_path):
+    box, notifier, db = outbox(tmp_path / "outbox.db", keep_sent=3600)
+    box.enqueue("EURUSD", "1m", 1700000000, "BUY", ["1", "2"], "text")
+    box.enqueue("EURUSD", "1m", 1700000060, "BUY", ["1"], "text")
+    box.run_once(db)
+    old, pending, recent = [ref for _, _, ref in notifier.offered]
+    box._on_result([old, recent], True)
+    box.run_once(db)
+    db.execute("UPDATE alerts SET delivered_at = delivered_at - 7200 WHERE id = ?", (old,))
+
+    # Only the sent row past keep_sent goes; pending rows are never pruned
+    assert box.prune(db) == 1
+    assert sorted(row[0] for row in db.execute("SELECT id FROM alerts")) == [pending, recent]
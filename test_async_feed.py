@@ -0,0 +1,214 @@
+# test_async_feed.py
+"""
+AsyncFeedClient tests against mock_po_server (handshake, dispatch, ping/pong,
+reconnect with backoff) and against a raw websocket server sending frames
+the mock never would: malformed frames are dropped without a reconnect.
+"""
+
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+
+import pytest
+import websockets
+
+from async_feed import AsyncFeedClient, backoff_delay, split_packet
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_mock(port):
+    proc = subprocess.Popen(
+        [sys.executable, "mock_po_server.py", "--port", str(port), "--assets", "3",
+         "--tick-rate", "20", "--ping-interval", "1"],
+        cwd=HERE, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 10
+    while True:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return proc
+        except OSError:
+            assert proc.poll() is None and time.monotonic() < deadline, "mock server did not start"
+            time.sleep(0.05)
+
+
+def stop(proc):
+    proc.terminate()
+    proc.wait(5)
+
+
+@pytest.fixture
+def mock_server():
+    port = free_port()
+    proc = start_mock(port)
+    yield port
+    stop(proc)
+
+
+async def until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        await asyncio.sleep(0.01)
+
+
+def test_split_packet():
+    assert split_packet('2["ticks",{}]') == ("2", 0, "/", None, '["ticks",{}]')
+    assert split_packet('212["ticks"]') == ("2", 0, "/", 12, '["ticks"]')
+    assert split_packet('2/admin,7["x"]') == ("2", 0, "/admin", 7, '["x"]')
+    assert split_packet('51-["x",{"_placeholder":true,"num":0}]')[:2] == ("5", 1)
+    assert split_packet("1/admin") == ("1", 0, "/admin", None, "")
+    for bad in ("", "x", "5-[]", "5x-[]"):
+        with pytest.raises(ValueError):
+            split_packet(bad)
+
+
+def test_backoff_delay_is_jittered_and_capped():
+    random.seed(1)
+    delays = [backoff_delay(attempt, base=1.0, cap=8.0) for attempt in range(10) for _ in range(20)]
+    assert all(0 <= d <= 8.0 for d in delays)
+    assert max(backoff_delay(0, 1.0, 8.0) for _ in range(50)) <= 1.0
+    assert len(set(delays)) == len(delays)
+
+
+def test_handshake_and_dispatch(mock_server):
+    async def main():
+        client = AsyncFeedClient(f"http://127.0.0.1:{mock_server}", auth={"sessionToken": "t", "uid": 1})
+        auth, assets, ticks, candles = [], [], [], []
+        client.on("auth/success", auth.append)
+        client.on("assets", assets.append)
+        await client.connect()
+        await client.emit("assets/get-assets")
+        await client.subscribe_ticks("MOCK000_otc", ticks.append)
+        await client.subscribe_candles("MOCK001_otc", 60, candles.append)
+        await until(lambda: auth and assets and len(ticks) >= 3 and candles)
+        await client.close()
+        return client, auth, assets, ticks, candles
+
+    client, auth, assets, ticks, candles = asyncio.run(main())
+    assert client.ping_deadline > 0
+    assert auth == [{"uid": 1}]
+    assert [a["symbol"] for a in assets[0]] == ["MOCK000_otc", "MOCK001_otc", "MOCK002_otc"]
+    assert {t["asset"] for t in ticks} == {"MOCK000_otc"}
+    assert (candles[0]["asset"], candles[0]["period"]) == ("MOCK001_otc", 60)
+    assert client.stats["connections"] == 1
+
+
+def test_pings_are_answered(mock_server):
+    async def main():
+        client = await AsyncFeedClient(f"http://127.0.0.1:{mock_server}").connect()
+        await until(lambda: client.stats["pings"] >= 2, timeout=5)
+        await client.close()
+        return client.stats
+
+    stats = asyncio.run(main())
+    # The server would have closed the session on a missing pong
+    assert (stats["connections"], stats["reconnects"], stats["errors"]) == (1, 0, 0)
+
+
+def test_reconnects_and_resubscribes():
+    port = free_port()
+    server = start_mock(port)
+
+    async def main():
+        nonlocal server
+        client = AsyncFeedClient(f"http://127.0.0.1:{port}", min_backoff=0.05, max_backoff=0.2)
+        ticks = []
+        await client.connect()
+        await client.subscribe_ticks("MOCK002_otc", ticks.append)
+        await until(lambda: ticks)
+
+        # The server goes away: the client backs off and retries until it is back
+        await asyncio.to_thread(stop, server)
+        await until(lambda: client.stats["reconnects"] >= 3)
+        server = await asyncio.to_thread(start_mock, port)
+        await until(lambda: client.stats["connections"] == 2)
+        seen = len(ticks)
+        await until(lambda: len(ticks) > seen)
+        await client.close()
+        return client.stats
+
+    try:
+        stats = asyncio.run(main())
+    finally:
+        stop(server)
+    assert stats["errors"] >= 3
+
+
+async def serve_frames(frames, port):
+    """Raw websocket server: completes the handshake, then sends ``frames`` and keeps the socket open."""
+    async def handler(ws):
+        await ws.send('0{"sid":"s","pingInterval":25000,"pingTimeout":20000}')
+        assert await ws.recv() == "40"
+        await ws.send('40{"sid":"n"}')
+        for frame in frames:
+            await ws.send(frame)
+        await ws.wait_closed()
+
+    return await websockets.serve(handler, "127.0.0.1", port)
+
+
+def test_malformed_frames_are_dropped_without_reconnecting():
+    frames = [
+        '42["ticks",{"asset":"A",',                    # truncated JSON
+        '4x',                                          # no packet type
+        '42{"not":"an event"}',                        # not an event array
+        '42["candles",{"asset":"A","period":"1m"}]',   # period is not a number
+        '421["ticks",{"asset":"A","n":1}]',            # ack id
+        '42/admin,["ticks",{"asset":"A","n":0}]',      # other namespace
+        '451-["ticks",{"asset":"A","n":2,"raw":{"_placeholder":true,"num":0}}]',
+        b"\x01\x02",
+        '42["ticks",{"asset":"A","n":3}]',
+    ]
+    port = free_port()
+
+    async def main():
+        server = await serve_frames(frames, port)
+        client = AsyncFeedClient(f"ws://127.0.0.1:{port}/")
+        ticks, candles = [], []
+        client.on("ticks", ticks.append)
+        client.on("candles", candles.append)
+        await client.connect()
+        await until(lambda: len(ticks) == 3)
+        await client.close()
+        server.close()
+        return client.stats, ticks, candles
+
+    stats, ticks, candles = asyncio.run(main())
+    assert [t["n"] for t in ticks] == [1, 2, 3]
+    assert ticks[1]["raw"] == b"\x01\x02"
+    assert candles == [{"asset": "A", "period": "1m"}]
+    assert (stats["malformed"], stats["dropped"]) == (3, 1)
+    assert (stats["connections"], stats["reconnects"]) == (1, 0)
+
+
+def test_binary_open_packet_fails_the_handshake():
+    port = free_port()
+
+    async def main():
+        async def handler(ws):
+            await ws.send(b"\x00")
+            await ws.wait_closed()
+
+        server = await websockets.serve(handler, "127.0.0.1", port)
+        client = AsyncFeedClient(f"ws://127.0.0.1:{port}/", min_backoff=0.01, max_backoff=0.02)
+        task = asyncio.create_task(client.connect())
+        await until(lambda: client.stats["errors"] >= 2)
+        task.cancel()
+        await client.close()
+        server.close()
+        return client.stats
+
+    stats = asyncio.run(main())
+    assert stats["connections"] == 0
@@ -0,0 +1,54 @@
+# test_backfill.py
+"""
+Backfiller tests: overlapping runs share the in-flight requests instead of
+clobbering each other's waiters, every response is merged once, and
+assets evicted while queued are not requested.
+"""
+
+import time
+
+from backfill import Backfiller
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+
+
+def test_overlapping_runs_skip_pairs_in_flight():
+    sent, merged = [], []
+    backfiller = Backfiller(lambda event, payload: sent.append(payload),
+                            lambda asset, period, candles: merged.append((asset, period)) or len(candles),
+                            interval=0)
+    first = backfiller.start(["A"], [60, 300])
+    wait_for(lambda: len(sent) == 2)
+
+    # A reconnect backfill while the first one still waits for its responses
+    second = backfiller.start(["A", "B"], [60])
+    wait_for(lambda: len(sent) == 3)
+    assert backfiller.stats()["skipped"] == 1
+    for asset, period in (("A", 60), ("A", 300), ("B", 60)):
+        backfiller.handle_response({"asset": asset, "period": period, "data": [{}]})
+    first.join()
+    second.join()
+
+    assert sorted(merged) == [("A", 60), ("A", 300), ("B", 60)]
+    stats = backfiller.stats()
+    assert (stats["complete"], stats["candles"], stats["failed"]) == (2, 3, 0)
+    assert not backfiller._in_flight
+
+
+def test_evicted_asset_is_not_requested():
+    sent = []
+    backfiller = Backfiller(lambda event, payload: sent.append(payload), lambda *args: 0, interval=0, concurrency=1)
+    # The single worker is busy with A while B is evicted (data_fetcher.evict_asset pops its progress)
+    run = backfiller.start(["A", "B"], [60])
+    wait_for(lambda: len(sent) == 1)
+    backfiller.progress.pop("B")
+    backfiller.handle_response({"asset": "A", "period": 60, "data": []})
+    run.join()
+
+    assert [payload["asset"] for payload in sent] == ["A"]
+    assert not backfiller._in_flight
@@ -0,0 +1,50 @@
+# test_batch_analyzer.py
+"""
+Parity tests: analyze_batch, score_batch and batch_features over a stack
+of symbols must reproduce strategy.py symbol by symbol.
+"""
+
+import numpy as np
+import pytest
+
+import strategy
+from batch_analyzer import analyze_batch, batch_features, score_batch
+from indicators import IndicatorState
+from test_indicators import make_candles
+
+
+def ohlc_array(df):
+    return df[["open", "high", "low", "close"]].to_numpy()
+
+
+FEATURES = ("close", "jaw", "teeth", "lips", "k", "d", "atr", "ema_slope")
+FLAGS = ("min_atr", "bullish_bias", "bearish_bias", "bullish_pattern", "bearish_pattern",
+         "momentum_bull", "momentum_bear")
+
+
+def assert_features_equal(actual, expected, label):
+    for name in FEATURES:
+        assert actual[name] == pytest.approx(expected[name], rel=1e-9, abs=1e-12, nan_ok=True), (label, name)
+    for name in FLAGS:
+        assert bool(actual[name]) == bool(expected[name]), (label, name)
+
+
+@pytest.mark.parametrize("n", [10, 49, 50, 51, 64, 300])
+@pytest.mark.parametrize("flat_every", [0, 37])
+def test_analyze_batch_matches_pandas(n, flat_every):
+    frames = [make_candles(n, seed, flat_every) for seed in range(12)]
+    # Higher timeframes for half the symbols, so confirmation is exercised both ways
+    mid = {f"S{i}": make_candles(80, 100 + i) for i in range(0, 12, 2)}
+    high = {f"S{i}": make_candles(80, 200 + i) for i in range(0, 12, 2)}
+    symbols = [f"S{i}" for i in range(12)]
+    ohlc = np.stack([ohlc_array(df) for df in frames])
+
+    results = analyze_batch(ohlc, symbols, mid, high)
+    scores = score_batch(ohlc, symbols)
+    features = batch_features(ohlc) if n >= IndicatorState.MIN_BARS else None
+    for i, (symbol, df) in enumerate(zip(symbols, frames)):
+        assert results[symbol] == strategy.analyze_candles(df, mid.get(symbol), high.get(symbol)), symbol
+        assert scores[symbol] == strategy.score_candles(df), symbol
+        if features is not None:
+            assert_features_equal({name: values[i] for name, values in features.items()},
+                                  strategy.candle_features(df), symbol)
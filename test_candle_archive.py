@@ -0,0 +1,115 @@
+# test_candle_archive.py
+"""
+Archive tests: backfilled rows older than the last archived bar are merged
+into the series file instead of being skipped, newer ones are appended, and
+series files stay within max_rows.
+"""
+
+import os
+
+import numpy as np
+
+from candle_archive import CandleArchive
+from candle_store import CLOSE, TIME
+
+PERIOD = 60
+
+
+def rows(buckets, close):
+    return np.array([(b * PERIOD, close, close, close, close, 0.0) for b in buckets], dtype=float)
+
+
+def test_merge_inserts_older_rows(tmp_path):
+    archive = CandleArchive(str(tmp_path))
+    for row in rows(range(20, 23), 2.0):
+        archive.append("EURUSD", PERIOD, row)
+    # A paced backfill reply arrives after live bars were archived
+    assert not archive.append("EURUSD", PERIOD, rows([5], 3.0)[0])
+
+    assert archive.merge("EURUSD", PERIOD, rows(range(10, 23), 3.0)) == 10
+    stored = archive.read("EURUSD", PERIOD)
+    np.testing.assert_array_equal(stored[:, TIME], np.arange(10, 23) * PERIOD)
+    np.testing.assert_array_equal(stored[10:, CLOSE], 2.0)
+
+    # Appending continues after the rewritten file
+    assert archive.append("EURUSD", PERIOD, rows([23], 4.0)[0])
+    assert archive.merge("EURUSD", PERIOD, rows(range(10, 15), 3.0)) == 0
+    assert len(archive.read("EURUSD", PERIOD)) == 14
+    archive.close()
+
+
+def test_writer_caps_open_files_and_closes_evicted_assets(tmp_path):
+    archive = CandleArchive(str(tmp_path), max_open=2).start()
+    for asset in ("A", "B", "C"):
+        for row in rows(range(3), 1.0):
+            archive.on_bar_closed(asset, PERIOD, row)
+    archive.on_history("A", PERIOD, rows(range(-2, 0), 0.5))
+    archive.flush()
+    assert archive.stats()["open_files"] == 2
+    assert len(archive.read("A", PERIOD)) == 5
+
+    archive.close("C")
+    archive.flush()
+    assert archive.stats()["open_files"] == 1
+    archive.close()
+    assert archive.stats()["open_files"] == 0
+    assert [len(archive.read(a, PERIOD)) for a in "ABC"] == [5, 3, 3]
+
+
+def test_merge_appends_newer_rows_without_rewriting(tmp_path):
+    archive = CandleArchive(str(tmp_path))
+    archive.merge("EURUSD", PERIOD, rows(range(10), 1.0))
+    inode = os.stat(archive.path("EURUSD", PERIOD)).st_ino
+
+    # History overlapping the tail and reaching past it only appends
+    assert archive.merge("EURUSD", PERIOD, rows(range(5, 15), 2.0)) == 5
+    assert os.stat(archive.path("EURUSD", PERIOD)).st_ino == inode
+    stored = archive.read("EURUSD", PERIOD)
+    np.testing.assert_array_equal(stored[:, TIME], np.arange(15) * PERIOD)
+    np.testing.assert_array_equal(stored[:, CLOSE], [1.0] * 10 + [2.0] * 5)
+    assert archive.stats()["rewrites"] == 0
+
+    # A gap filled in the middle is the only case that rewrites
+    archive.append("EURUSD", PERIOD, rows([20], 3.0)[0])
+    assert archive.merge("EURUSD", PERIOD, rows(range(14, 22), 4.0)) == 6
+    np.testing.assert_array_equal(archive.read("EURUSD", PERIOD)[:, TIME], np.arange(22) * PERIOD)
+    assert archive.read("EURUSD", PERIOD)[20, CLOSE] == 3.0
+    assert archive.stats()["rewrites"] == 1
+    archive.close()
+
+
+def test_series_files_are_capped(tmp_path):
+    archive = CandleArchive(str(tmp_path), max_rows=10)
+    for row in rows(range(15), 1.0):
+        archive.append("EURUSD", PERIOD, row)
+    # Trimmed back to max_rows once the file outgrew them by half
+    assert len(archive.read("EURUSD", PERIOD)) == 15
+    archive.append("EURUSD", PERIOD, rows([15], 1.0)[0])
+    np.testing.assert_array_equal(archive.read("EURUSD", PERIOD)[:, TIME], np.arange(6, 16) * PERIOD)
+
+    # History older than what the cap keeps is not worth a rewrite
+    rewrites = archive.stats()["rewrites"]
+    assert archive.merge("EURUSD", PERIOD, rows(range(0, 6), 2.0)) == 0
+    assert archive.stats()["rewrites"] == rewrites
+    # A gap inside the kept window is filled, the oldest rows make room
+    archive.append("EURUSD", PERIOD, rows([18], 1.0)[0])
+    assert archive.merge("EURUSD", PERIOD, rows(range(0, 18), 2.0)) == 2
+    np.testing.assert_array_equal(archive.read("EURUSD", PERIOD)[:, TIME], np.arange(9, 19) * PERIOD)
+    archive.close()
+
+
+def test_writer_survives_errors_and_queue_is_bounded(tmp_path):
+    archive = CandleArchive(str(tmp_path)).start()
+    archive.on_history("EURUSD", PERIOD, np.ones((2, 5)))  # wrong row width
+    archive.on_bar_closed("EURUSD", PERIOD, rows([1], 1.0)[0])
+    archive.flush()
+    assert archive.stats()["errors"] == 1
+    assert len(archive.read("EURUSD", PERIOD)) == 1
+    archive.close()
+
+    # No writer draining the queue: rows beyond maxsize are dropped, not buffered
+    archive = CandleArchive(str(tmp_path), maxsize=2)
+    for row in rows(range(2, 5), 1.0):
+        archive.on_bar_closed("EURUSD", PERIOD, row)
+    assert archive.stats()["dropped"] == 1
+    assert archive.stats()["queued"] == 2
@@ -0,0 +1,44 @@
+# test_candle_ingest.py
+"""
+History merge tests: backfilled bars fill every missing bucket and never
+overwrite bars that came from the live feed (or the archive).
+"""
+
+import numpy as np
+
+from candle_ingest import CandleIngestor
+from candle_store import CandleStore, CLOSE, TIME
+
+PERIOD = 60
+
+
+def candle(bucket, close):
+    return {"time": bucket * PERIOD, "open": close, "high": close, "low": close, "close": close}
+
+
+def test_history_fills_gap_after_warm_start():
+    store = CandleStore(capacity=50)
+    ingestor = CandleIngestor(store)
+    # Buckets 0-9 hydrated from the archive, then the feed resumes at 20
+    store.extend_candles("EURUSD", PERIOD, [(b * PERIOD, 1.0, 1.0, 1.0, 1.0, 0.0) for b in range(10)])
+    ingestor.ingest("EURUSD", PERIOD, candle(20, 2.0))
+
+    added = ingestor.merge_history("EURUSD", PERIOD, [candle(b, 3.0) for b in range(20)])
+
+    rows = store.candles("EURUSD", PERIOD)
+    assert added == 10
+    np.testing.assert_array_equal(rows[:, TIME], np.arange(21) * PERIOD)
+    # Stored rows win over history for the same bucket
+    np.testing.assert_array_equal(rows[:10, CLOSE], 1.0)
+    np.testing.assert_array_equal(rows[10:20, CLOSE], 3.0)
+    assert rows[20, CLOSE] == 2.0
+
+
+def test_history_keeps_newest_rows_within_capacity():
+    store = CandleStore(capacity=5)
+    ingestor = CandleIngestor(store)
+    ingestor.ingest("EURUSD", PERIOD, candle(10, 2.0))
+
+    assert ingestor.merge_history("EURUSD", PERIOD, [candle(b, 3.0) for b in range(10)]) == 4
+    np.testing.assert_array_equal(store.candles("EURUSD", PERIOD)[:, TIME], np.arange(6, 11) * PERIOD)
+    assert ingestor.merge_history("EURUSD", PERIOD, [candle(b, 3.0) for b in range(6)]) == 0
@@ -0,0 +1,209 @@
+# test_candle_store.py
+"""
+RingBuffer tests (wraparound, update_last, snapshot retry) and concurrency
+tests: snapshots taken while another thread writes are never torn, and the
+indicator state hands out consistent feature snapshots.
+"""
+
+import threading
+
+import numpy as np
+import pytest
+
+from candle_store import CandleStore, RingBuffer, TIME
+from indicators import IndicatorEngine
+
+PERIOD = 60
+
+
+def run_threads(writer, reader, seconds, readers=3):
+    """Run ``writer`` and ``readers`` copies of ``reader`` until ``seconds`` passed; both get a stop Event."""
+    stop = threading.Event()
+    threads = [threading.Thread(target=writer, args=(stop,))]
+    threads += [threading.Thread(target=reader, args=(stop,)) for _ in range(readers)]
+    try:
+        for t in threads:
+            t.start()
+        stop.wait(seconds)
+    finally:
+        stop.set()
+        for t in threads:
+            t.join()
+
+
+def rows(*times):
+    return [(t, t, t, t, t, 0.0) for t in times]
+
+
+def times(ring, n=None):
+    return ring.tail(n)[:, TIME].tolist()
+
+
+def test_ring_wraps_around_keeping_the_newest_rows():
+    ring = RingBuffer(4)
+    for row in rows(1, 2, 3, 4, 5, 6):
+        ring.append(row)
+    assert (len(ring), ring._next) == (4, 2)
+    assert times(ring) == [3, 4, 5, 6]
+    assert times(ring, 2) == [5, 6]
+
+    # A block crossing the end of the buffer, then one longer than the capacity
+    ring.extend(rows(7, 8, 9))
+    assert times(ring) == [6, 7, 8, 9]
+    ring.extend(rows(*range(10, 20)))
+    assert times(ring) == [16, 17, 18, 19]
+    assert ring.last()[TIME] == 19
+
+    with pytest.raises(ValueError):
+        ring.tail()[0, TIME] = 0.0
+
+
+def test_update_last_overwrites_the_newest_row():
+    ring = RingBuffer(3)
+    with pytest.raises(IndexError):
+        ring.update_last(rows(1)[0])
+
+    ring.extend(rows(1, 2, 3))
+    # The write slot wrapped to 0, so the newest row sits at the end of the buffer
+    assert ring._next == 0
+    version = ring.version
+    ring.update_last((3, 3, 9, 1, 8, 5))
+    assert ring.tail().tolist() == [list(r) for r in rows(1, 2)] + [[3, 3, 9, 1, 8, 5]]
+    assert ring.version == version + 1
+
+    ring.append(rows(4)[0])
+    ring.update_last((4, 4, 4, 4, 7, 0))
+    assert times(ring) == [2, 3, 4]
+    assert ring.last()[4] == 7
+
+
+def test_replace_and_clear():
+    ring = RingBuffer(3)
+    ring.extend(rows(1, 2))
+    ring.replace(rows(5, 6, 7, 8))
+    assert times(ring) == [6, 7, 8]
+    ring.clear()
+    assert (len(ring), ring.last()) == (0, None)
+    assert ring.snapshot().rows.shape == (0, 6)
+
+
+class InterruptedRing(RingBuffer):
+    """Runs ``during_copy`` inside the first copies made by snapshot(), as a concurrent writer would."""
+
+    def __init__(self, capacity, during_copy):
+        super().__init__(capacity)
+        self.during_copy = list(during_copy)
+        self.copies = 0
+
+    def tail(self, n=None):
+        self.copies += 1
+        if self.during_copy:
+            self.during_copy.pop(0)()
+        return super().tail(n)
+
+
+def test_snapshot_retries_when_a_write_overlaps_the_copy():
+    ring = InterruptedRing(4, [])
+    ring.extend(rows(1, 2, 3))
+    ring.during_copy = [lambda: ring.append(rows(4)[0]), lambda: ring.update_last(rows(9)[0])]
+
+    snap = ring.snapshot()
+    assert ring.copies == 3
+    assert snap.rows[:, TIME].tolist() == [1, 2, 3, 9]
+    assert snap.version == ring.version == 3
+
+
+def test_snapshot_waits_for_a_write_in_progress():
+    ring = RingBuffer(4)
+    ring.extend(rows(1, 2))
+    ring._seq += 1  # a writer is between its two sequence bumps
+
+    def finish_write():
+        ring._buf[2] = ring._buf[6] = rows(3)[0]
+        ring._next, ring._size = 3, 3
+        ring._seq += 1
+
+    timer = threading.Timer(0.05, finish_write)
+    timer.start()
+    snap = ring.snapshot()
+    timer.join()
+    assert snap.rows[:, TIME].tolist() == [1, 2, 3]
+    assert snap.version == 2
+
+
+def test_store_reads():
+    store = CandleStore(capacity=4)
+    empty = store.snapshot("EURUSD", PERIOD)
+    assert (empty.version, empty.rows.shape) == (0, (0, 6))
+    assert store.frame("EURUSD", PERIOD) is None
+    store.extend_candles("EURUSD", PERIOD, rows(0, 60, 120))
+    assert store.closed_candles("EURUSD", PERIOD)[:, TIME].tolist() == [0, 60]
+    assert store.last_closed_time("EURUSD", PERIOD) == 60
+    assert store.frame("EURUSD", PERIOD, n=1, closed=True)["time"].tolist() == [60]
+    assert store.drop_asset("EURUSD") == 1
+    assert store.candle_count("EURUSD", PERIOD) == 0
+
+
+def test_snapshots_are_consistent_under_concurrent_writes():
+    # Large enough that NumPy releases the GIL while rows are copied, so reads really overlap writes
+    store = CandleStore(capacity=4096)
+    ring = store.series("EURUSD", PERIOD)
+    errors = []
+
+    def writer(stop):
+        k = 0
+        while not stop.is_set():
+            block = np.repeat(np.arange(k, k + 256, dtype=float)[:, None], 6, axis=1)
+            ring.extend(block)
+            ring.update_last(block[-1])
+            ring.append(block[-1] + 1)
+            k += 257
+
+    def reader(stop):
+        last_version = -1
+        while not stop.is_set():
+            snap = store.snapshot("EURUSD", PERIOD)
+            rows = snap.rows
+            if snap.version < last_version:
+                errors.append(f"version went back from {last_version} to {snap.version}")
+            last_version = snap.version
+            # Every row is written whole, and rows are consecutive bars
+            if not (rows == rows[:, :1]).all():
+                errors.append("torn row")
+            if not (np.diff(rows[:, TIME]) == 1).all():
+                errors.append(f"non-consecutive rows ending at {rows[-1, TIME]}")
+
+    run_threads(writer, reader, seconds=1.0)
+    assert errors[:3] == []
+    assert store.version("EURUSD", PERIOD) > 100
+
+
+def test_indicator_snapshots_are_consistent_under_concurrent_updates():
+    engine = IndicatorEngine()
+    errors = []
+
+    def writer(stop):
+        k = 0
+        while not stop.is_set():
+            price = 1.0 + (k % 7) * 0.001
+            engine.on_bar_closed("EURUSD", PERIOD, (k * PERIOD, price, price + 0.002, price - 0.002, price, 0.0))
+            k += 1
+
+    def reader(stop):
+        while not stop.is_set():
+            snap = engine.snapshot("EURUSD", PERIOD)
+            if snap is None or not snap.count:
+                continue
+            # bar_time and count come from the same update
+            if snap.bar_time != (snap.count - 1) * PERIOD:
+                errors.append((snap.count, snap.bar_time))
+            snap.score()
+
+    run_threads(writer, reader, seconds=0.5)
+    assert errors[:3] == []
+
+    snap = engine.snapshot("EURUSD", PERIOD)
+    assert snap.score() is not None
+    with pytest.raises(TypeError):
+        snap.features["close"] = 0.0
+    assert engine.snapshot("GBPUSD", PERIOD) is None
@@ -0,0 +1,68 @@
+# test_event_pipeline.py
+"""
+Pipeline tests: a series is never evaluated by two workers at once, a bar
+closing during its evaluation queues it once more, and the broadcaster
+records bar close to emit latency for the signals it sends.
+"""
+
+import threading
+import time
+
+from event_pipeline import EvaluationPipeline
+from signal_broadcaster import SignalBroadcaster
+from signal_store import SignalStore
+
+
+def test_bar_closed_during_evaluation_is_evaluated_after_it():
+    started, release = threading.Event(), threading.Event()
+    running, calls, overlaps = set(), [], []
+
+    def evaluate(symbol, period, closed_at):
+        key = (symbol, period)
+        if key in running:
+            overlaps.append(key)
+        running.add(key)
+        calls.append(key)
+        started.set()
+        release.wait(2)
+        running.discard(key)
+
+    pipeline = EvaluationPipeline(evaluate, workers=3)
+    pipeline.start()
+    pipeline.on_bar_closed("A", 60, (0.0,))
+    assert started.wait(2)
+    # Both close while A is evaluated: one more evaluation, not two in parallel
+    pipeline.on_bar_closed("A", 60, (60.0,))
+    pipeline.on_bar_closed("A", 60, (120.0,))
+    time.sleep(0.05)
+    assert calls == [("A", 60)]
+    release.set()
+    pipeline.queue.join()
+
+    assert calls == [("A", 60), ("A", 60)]
+    assert overlaps == []
+    assert pipeline.stats()["coalesced"] == 1
+    assert pipeline.stats()["bar_close_to_publish"]["count"] == 2
+    assert not pipeline._pending
+
+
+class FakeSocketIO:
+    def __init__(self):
+        self.emits = []
+
+    def emit(self, event, data=None, to=None):
+        self.emits.append((to, data))
+
+
+def test_broadcaster_records_bar_close_to_emit():
+    broadcaster = SignalBroadcaster(FakeSocketIO())
+    store = SignalStore()
+    closed_at = time.monotonic() - 0.5
+    broadcaster.publish(store, {"symbol": "A", "timeframe": "1m", "signal": "BUY"}, closed_at=closed_at)
+    broadcaster.publish(store, {"symbol": "A", "timeframe": "1m", "signal": "SELL"}, closed_at=closed_at + 0.1)
+    broadcaster.publish(store, {"symbol": "B", "timeframe": "1m", "signal": "HOLD"})
+    broadcaster.flush()
+
+    latency = broadcaster.stats()["bar_close_to_emit"]
+    assert latency["count"] == 1
+    assert latency["max_ms"] >= 500
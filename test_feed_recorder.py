@@ -0,0 +1,71 @@
+# test_feed_recorder.py
+"""
+FeedRecorder / FeedReplayer tests: recorded events come back in order with
+their arguments (bytes included), a partial last chunk is written by close()
+or the flush timer, and replays can seek to a time range without the index.
+"""
+
+import os
+import time
+
+from feed_recorder import FeedRecorder, FeedReplayer
+
+
+def record(path, count, **kwargs):
+    recorder = FeedRecorder(str(path), **kwargs)
+    for i in range(count):
+        recorder.record("ticks", [{"asset": "A", "n": i}, b"\x00\xff"], ts=100.0 + i)
+    return recorder
+
+
+def test_round_trip_with_a_partial_chunk(tmp_path):
+    path = tmp_path / "feed.frl"
+    recorder = record(path, 25, chunk_events=10, flush_interval=60)
+    # Two full chunks are on disk, the last five events are still buffered
+    assert len(FeedReplayer(str(path)).index()) == 2
+    recorder.close()
+
+    replayer = FeedReplayer(str(path))
+    assert [entry[1:] for entry in replayer.index()] == [(10, 100.0, 109.0), (10, 110.0, 119.0),
+                                                         (5, 120.0, 124.0)]
+    events = list(replayer.events())
+    assert [ts for ts, _, _ in events] == [100.0 + i for i in range(25)]
+    assert events[-1] == (124.0, "ticks", [{"asset": "A", "n": 24}, b"\x00\xff"])
+    assert recorder.stats()["events"] == 25
+    assert recorder.stats()["written_bytes"] == os.path.getsize(path)
+
+
+def test_flush_timer_writes_a_partial_chunk(tmp_path):
+    path = tmp_path / "feed.frl"
+    recorder = record(path, 3, chunk_events=10, flush_interval=0.1)
+    deadline = time.monotonic() + 5
+    while not FeedReplayer(str(path)).index():
+        assert time.monotonic() < deadline, "partial chunk was not flushed"
+        time.sleep(0.02)
+    recorder.close()
+    assert [event[2][0]["n"] for event in FeedReplayer(str(path)).events()] == [0, 1, 2]
+
+
+def test_time_range_and_index_rebuild(tmp_path):
+    path = tmp_path / "feed.frl"
+    record(path, 30, chunk_events=10, flush_interval=60).close()
+    os.remove(str(path) + ".idx")
+
+    replayer = FeedReplayer(str(path))
+    assert len(replayer.index()) == 3
+    assert [ts for ts, _, _ in replayer.events(start=108.0, end=112.0)] == [108.0, 109.0, 110.0, 111.0, 112.0]
+
+    seen = []
+    result = replayer.replay(lambda event, args: seen.append(args[0]["n"]), speed=None, start=125.0)
+    assert seen == [25, 26, 27, 28, 29]
+    assert result["events"] == 5
+
+
+def test_appending_to_an_existing_log(tmp_path):
+    path = tmp_path / "feed.frl"
+    record(path, 3, flush_interval=60).close()
+    recorder = FeedRecorder(str(path), flush_interval=60)
+    recorder.record("candles", [{"asset": "B"}], ts=200.0)
+    recorder.close()
+    events = list(FeedReplayer(str(path)).events())
+    assert [event for _, event, _ in events] == ["ticks"] * 3 + ["candles"]
@@ -0,0 +1,96 @@
+# test_frame_decoder.py
+"""
+FrameDecoder tests: text event frames become typed records for their
+handler, unhandled events are dropped without decoding, binary frames and
+non-event packets are skipped, and malformed frames raise ValueError.
+"""
+
+import pytest
+
+from frame_decoder import Candle, FrameDecoder, Quote, Tick, peek_event
+
+TICK = '42["ticks",{"asset":"EURUSD_otc","time":1700000000.5,"price":1.0857}]'
+CANDLE = ('42["candles",{"asset":"EURUSD_otc","period":60,"time":1700000000,'
+          '"open":1.08,"high":1.09,"low":1.07,"close":1.085}]')
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+
+    def send(self, data):
+        self.sent.append(data)
+
+
+def test_peek_event():
+    assert peek_event(TICK) == ("ticks", TICK[11:-1])
+    assert peek_event('42["ping"]') == ("ping", "")
+    assert peek_event('42[ "ticks"]') == (None, None)
+    assert peek_event('42["a\\"b",1]') == (None, None)
+    assert peek_event("40") == (None, None)
+
+
+def test_text_frames_are_dispatched_as_records():
+    records = []
+    decoder = FrameDecoder({"ticks": records.append, "candles": records.append, "quote": records.append})
+    assert decoder.feed(TICK)
+    assert decoder.feed(CANDLE)
+    assert decoder.feed('42["quote", {"symbol":"EURUSD","price":"1.5"}]')
+
+    assert records == [
+        Tick("EURUSD_otc", 1700000000.5, 1.0857),
+        Candle("EURUSD_otc", 60, 1700000000.0, 1.08, 1.09, 1.07, 1.085, 0.0),
+        Quote("EURUSD", 1.5),
+    ]
+    assert (decoder.counts["ticks"], decoder.counts["candles"]) == (1, 1)
+
+
+def test_unhandled_events_and_other_packets():
+    seen = []
+    decoder = FrameDecoder({"ticks": seen.append})
+    assert not decoder.feed('42["updateOpenedDeals",[1,2]]')
+    assert not decoder.feed('40{"sid":"x"}')
+    assert decoder.counts["dropped"] == 1
+    assert decoder.counts["other"] == 1
+
+    # With a default handler they are decoded, but not turned into records
+    decoder = FrameDecoder({}, default=lambda event, data: seen.append((event, data)))
+    assert decoder.feed('42["updateOpenedDeals",[1,2]]')
+    assert decoder.feed('42["ticks",{"asset":"A"}]')
+    assert decoder.feed('42["noPayload"]')
+    assert seen == [("updateOpenedDeals", [1, 2]), ("ticks", {"asset": "A"}), ("noPayload", None)]
+
+
+def test_binary_frames_are_skipped():
+    records = []
+    decoder = FrameDecoder({"ticks": records.append}, default=lambda event, data: records.append(data))
+    assert not decoder.feed(b"\x04" + TICK.encode())
+    assert not decoder.feed(bytearray(b"\x00\x01"))
+    assert records == []
+    assert decoder.counts["binary"] == 2
+
+
+def test_pings_are_answered():
+    ws = FakeWebSocket()
+    decoder = FrameDecoder({"ticks": lambda record: None})
+    assert not decoder.feed("2", ws)
+    assert not decoder.feed("2")
+    assert ws.sent == ["3"]
+
+
+@pytest.mark.parametrize("frame", [
+    '42["ticks",{"asset":"A","time":1',                      # truncated JSON
+    '42["ticks",{"asset":"A","time":1}]',                    # missing price
+    '42["ticks",{"asset":"A","time":"soon","price":1}]',     # not a number
+    '42["ticks",[1,2,3]]',                                   # not an object
+    '42["candles",{"asset":"A","period":null,"time":1,"open":1,"high":1,"low":1,"close":1}]',
+])
+def test_malformed_frames_raise_value_error(frame):
+    records = []
+    decoder = FrameDecoder({"ticks": records.append, "candles": records.append})
+    with pytest.raises(ValueError, match="malformed frame"):
+        decoder.feed(frame)
+    assert decoder.counts["errors"] == 1
+    assert records == []
+    # The decoder keeps working after a bad frame
+    assert decoder.feed(TICK)
@@ -0,0 +1,187 @@
+# test_indicators.py
+"""
+Equivalence tests: the incremental indicator engine and the block EMA
+kernel must reproduce the pandas/loop implementations in strategy.py.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import strategy
+from candle_ingest import CandleIngestor
+from candle_store import CandleStore
+from ema_filter import ema as ema_array, ema_many
+from indicators import IndicatorEngine, IndicatorState, RollingExtreme, RollingMean
+
+
+def make_candles(n, seed=0, flat_every=0):
+    rng = np.random.default_rng(seed)
+    close = 1.1 + np.cumsum(rng.normal(0, 0.002, n))
+    open_ = np.r_[close[0], close[:-1]] + rng.normal(0, 0.0005, n)
+    high = np.maximum(open_, close) + rng.random(n) * 0.002
+    low = np.minimum(open_, close) - rng.random(n) * 0.002
+    if flat_every:
+        # Runs of identical candles exercise the zero-range Stochastic branch
+        for start in range(0, n, flat_every):
+            sl = slice(start, start + 20)
+            open_[sl] = high[sl] = low[sl] = close[sl] = close[start]
+    return pd.DataFrame({"open": open_, "high": high, "low": low, "close": close})
+
+
+def run_engine(df):
+    state = IndicatorState()
+    rows = {name: [] for name in ("ha_open", "ha_high", "ha_low", "ha_close",
+                                  "atr", "jaw", "teeth", "lips", "k", "d", "ema")}
+    for o, h, l, c in df[["open", "high", "low", "close"]].itertuples(index=False):
+        state.update(o, h, l, c)
+        for name in rows:
+            rows[name].append(getattr(state, name))
+    return state, {name: np.array(values) for name, values in rows.items()}
+
+
+def assert_series_equal(actual, expected):
+    expected = np.asarray(expected, dtype=float)
+    np.testing.assert_array_equal(np.isnan(actual), np.isnan(expected))
+    np.testing.assert_allclose(actual, expected, rtol=1e-9, atol=1e-12, equal_nan=True)
+
+
+@pytest.fixture(scope="module", params=[(300, 1, 0), (600, 2, 0), (400, 3, 97)])
+def candles(request):
+    n, seed, flat_every = request.param
+    df = make_candles(n, seed, flat_every)
+    return df, run_engine(df)[1]
+
+
+def test_heikin_ashi(candles):
+    df, out = candles
+    ha = strategy.heikin_ashi(df)
+    for col in ("open", "high", "low", "close"):
+        assert_series_equal(out["ha_" + col], ha[col])
+
+
+def test_atr(candles):
+    df, out = candles
+    assert_series_equal(out["atr"], strategy.calculate_atr(df))
+
+
+def test_alligator(candles):
+    df, out = candles
+    jaw, teeth, lips = strategy.calculate_alligator(strategy.heikin_ashi(df))
+    assert_series_equal(out["jaw"], jaw)
+    assert_series_equal(out["teeth"], teeth)
+    assert_series_equal(out["lips"], lips)
+
+
+def test_stochastic(candles):
+    df, out = candles
+    k, d = strategy.stochastic_oscillator(strategy.heikin_ashi(df))
+    assert_series_equal(out["k"], k)
+    assert_series_equal(out["d"], d)
+
+
+def test_ema(candles):
+    df, out = candles
+    ha = strategy.heikin_ashi(df)
+    assert_series_equal(out["ema"], ha["close"].ewm(span=150, adjust=False).mean())
+    assert_series_equal(out["ema"], strategy.calculate_ema(ha["close"].tolist(), 150))
+
+
+@pytest.mark.parametrize("seed", [4, 5, 6])
+def test_score_matches_pandas_features(seed):
+    df = make_candles(260, seed)
+    state = IndicatorState()
+    for i, (o, h, l, c) in enumerate(df[["open", "high", "low", "close"]].itertuples(index=False)):
+        state.update(o, h, l, c)
+        if i + 1 < IndicatorState.MIN_BARS:
+            assert state.score() is None
+            continue
+        expected = strategy.candle_features(df.iloc[:i + 1])
+        actual = state.features()
+        for name in ("bullish_bias", "bearish_bias", "bullish_pattern", "bearish_pattern",
+                     "min_atr", "momentum_bull", "momentum_bear"):
+            assert bool(actual[name]) == bool(expected[name]), (i, name)
+        assert state.score() == strategy.score_features(expected), i
+
+
+def test_engine_matches_pandas_on_store_window():
+    # History longer than the store: a high-priced stretch that later falls out of the window
+    capacity = 200
+    df = pd.concat([make_candles(300, 10) * 10, make_candles(300, 11)], ignore_index=True)
+    store = CandleStore(capacity=capacity)
+    ingestor = CandleIngestor(store)
+    engine = IndicatorEngine(close_window=capacity - 1)
+    ingestor.on_bar_closed(engine.on_bar_closed)
+    for i, (o, h, l, c) in enumerate(df[["open", "high", "low", "close"]].itertuples(index=False)):
+        ingestor.ingest_row("EURUSD", 60, (i * 60.0, o, h, l, c, 0.0))
+        if i < capacity:
+            continue
+        expected = strategy.candle_features(store.frame("EURUSD", 60, closed=True))
+        actual = engine.get("EURUSD", 60).features()
+        # ema_slope is left out: the running EMA is seeded before the window (see indicators.py)
+        for name in ("bullish_bias", "bearish_bias", "bullish_pattern", "bearish_pattern",
+                     "min_atr", "momentum_bull", "momentum_bear"):
+            assert bool(actual[name]) == bool(expected[name]), (i, name)
+        for name in ("atr", "jaw", "teeth", "lips", "k", "d"):
+            assert actual[name] == pytest.approx(expected[name], rel=1e-9, nan_ok=True), (i, name)
+
+
+def reference_ema(prices, period):
+    """The original sequential loop from strategy.calculate_ema."""
+    emas = []
+    k = 2 / (period + 1)
+    for i, price in enumerate(prices):
+        emas.append(price if i == 0 else price * k + emas[-1] * (1 - k))
+    return np.array(emas)
+
+
+@pytest.mark.parametrize("n", [1, 2, 63, 64, 65, 1000])
+@pytest.mark.parametrize("period", [1, 2, 5, 150, 1000])
+def test_block_ema_matches_loop(n, period):
+    prices = make_candles(n, seed=n)["close"].to_numpy()
+    np.testing.assert_allclose(ema_array(prices, period), reference_ema(prices, period), rtol=1e-13)
+    assert strategy.calculate_ema(prices.tolist(), period) == pytest.approx(
+        reference_ema(prices, period).tolist(), rel=1e-13)
+
+
+@pytest.mark.filterwarnings("ignore::RuntimeWarning")  # the reference loop computes inf * 0
+@pytest.mark.parametrize("bad", [np.nan, np.inf, -np.inf])
+@pytest.mark.parametrize("n, at", [(6, 3), (200, 100), (200, 0), (130, 129)])
+def test_block_ema_non_finite_matches_loop(n, at, bad):
+    prices = make_candles(n, seed=at)["close"].to_numpy()
+    prices[at] = bad
+    for period in (1, 3, 150):
+        expected = reference_ema(prices, period)
+        np.testing.assert_array_equal(np.isfinite(ema_array(prices, period)), np.isfinite(expected))
+        np.testing.assert_allclose(ema_array(prices, period), expected, rtol=1e-13)
+    assert strategy.calculate_ema([1, 2, 3, np.nan, 5, 6], 3)[:3] == [1, 1.5, 2.25]
+    # A non-finite value in one row leaves the other rows on the block path
+    rows = np.stack([prices, make_candles(n, seed=1)["close"].to_numpy()])
+    np.testing.assert_allclose(ema_many(rows, [5])[0], np.stack([reference_ema(r, 5) for r in rows]), rtol=1e-13)
+
+
+def test_block_ema_batched():
+    series = np.stack([make_candles(300, seed)["close"].to_numpy() for seed in range(4)])
+    periods = [5, 50, 150]
+    out = ema_many(series, periods)
+    assert out.shape == (3, 4, 300)
+    for p, period in enumerate(periods):
+        for row in range(4):
+            np.testing.assert_allclose(out[p, row], reference_ema(series[row], period), rtol=1e-13)
+
+
+def test_rolling_mean_drift_is_bounded():
+    rm = RollingMean(5)
+    values = np.random.default_rng(7).normal(1e6, 1.0, 20000)
+    for v in values:
+        rm.update(v)
+    assert rm.value == pytest.approx(values[-5:].mean(), rel=1e-12)
+
+
+def test_rolling_extreme_matches_pandas():
+    values = np.random.default_rng(8).normal(0, 1, 500)
+    lo, hi = RollingExtreme(14, "min"), RollingExtreme(14, "max")
+    mins = [lo.update(v) for v in values]
+    maxs = [hi.update(v) for v in values]
+    assert_series_equal(np.array(mins), pd.Series(values).rolling(14).min())
+    assert_series_equal(np.array(maxs), pd.Series(values).rolling(14).max())
@@ -0,0 +1,32 @@
+# test_mock_po_server.py
+"""
+Mock server history tests: generated history continues from the live
+price of the simulator instead of starting from 1.0.
+"""
+
+import pytest
+
+import mock_po_server
+from mock_po_server import Simulator, generate_history
+
+
+def test_history_ends_at_the_live_price():
+    price = 1.7345
+    candles = generate_history("MOCK000_otc", 60, 200, end=6000, price=price)
+    assert candles[-1]["close"] == pytest.approx(price, rel=1e-12)
+    assert [c["time"] for c in candles[-2:]] == [5940, 6000]
+    assert all(c["low"] <= min(c["open"], c["close"]) <= max(c["open"], c["close"]) <= c["high"] for c in candles)
+    # Same walk, only scaled
+    unscaled = generate_history("MOCK000_otc", 60, 200, end=6000)
+    assert candles[0]["close"] / unscaled[0]["close"] == pytest.approx(price / unscaled[-1]["close"])
+
+
+def test_history_request_continues_from_the_simulator(monkeypatch):
+    simulator = Simulator(["MOCK000_otc", "MOCK001_otc"], seed=3)
+    monkeypatch.setattr(mock_po_server, "simulator", simulator)
+    sent = []
+    monkeypatch.setattr(mock_po_server.sio, "emit", lambda event, data, to=None: sent.append(data))
+
+    mock_po_server.on_load_history("sid", {"asset": "MOCK001_otc", "period": 60, "offset": 600, "time": 6000})
+    assert len(sent[0]["data"]) == 10
+    assert sent[0]["data"][-1]["close"] == pytest.approx(simulator.prices[1], rel=1e-12)
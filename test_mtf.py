@@ -0,0 +1,91 @@
+# test_mtf.py
+"""
+BiasCache tests: the higher-timeframe bias is computed once per closed bar
+and reused by every lower-timeframe evaluation, updates of the forming bar
+keep it, and the next closed bar invalidates it.
+"""
+
+import pytest
+
+import mtf
+from candle_store import CandleStore
+from mtf import BiasCache
+
+PERIOD = 300
+
+
+def bar(i, step):
+    close = 1.0 + step * i
+    return (i * PERIOD, close - step * 0.8, close + 0.0005, close - step - 0.0005, close, 0.0)
+
+
+@pytest.fixture
+def computed(monkeypatch):
+    """Last bar time of every frame get_bias is called with."""
+    calls = []
+
+    def get_bias(df):
+        calls.append(df["time"].iloc[-1])
+        return real_get_bias(df)
+
+    real_get_bias = mtf.get_bias
+    monkeypatch.setattr(mtf, "get_bias", get_bias)
+    return calls
+
+
+def test_bias_is_reused_until_the_next_bar_closes(computed):
+    store = CandleStore(capacity=200)
+    store.extend_candles("EURUSD", PERIOD, [bar(i, 0.001) for i in range(60)])
+    cache = BiasCache(store)
+
+    assert [cache.bias("EURUSD", PERIOD) for _ in range(3)] == ["bullish"] * 3
+    assert computed == [58 * PERIOD]
+    assert cache.stats() == {"size": 1, "hits": 2, "misses": 1}
+
+    # Updating the forming bar leaves the closed bars, and so the bias, as they were
+    store.series("EURUSD", PERIOD).update_last(bar(59, -0.5))
+    assert cache.bias("EURUSD", PERIOD) == "bullish"
+    assert len(computed) == 1
+
+    # A new bar closes the forming one: the bias is computed again over the new closed bars
+    store.append_candle("EURUSD", PERIOD, dict(zip(("time", "open", "high", "low", "close"), bar(60, 0.001))))
+    cache.bias("EURUSD", PERIOD)
+    cache.bias("EURUSD", PERIOD)
+    assert computed == [58 * PERIOD, 59 * PERIOD]
+    assert cache.stats()["misses"] == 2
+
+
+def test_series_are_cached_separately(computed):
+    store = CandleStore(capacity=200)
+    store.extend_candles("EURUSD", PERIOD, [bar(i, 0.001) for i in range(60)])
+    store.extend_candles("GBPUSD", PERIOD, [bar(i, -0.001) for i in range(60)])
+    cache = BiasCache(store)
+
+    assert cache.bias("EURUSD", PERIOD) == "bullish"
+    assert cache.bias("GBPUSD", PERIOD) == "bearish"
+    # Not enough bars yet, and no bars at all
+    store.extend_candles("EURUSD", 900, [bar(i, 0.001) for i in range(10)])
+    assert cache.bias("EURUSD", 900) is None
+    assert cache.bias("USDJPY", PERIOD) is None
+    assert len(computed) == 3
+
+    cache.discard("EURUSD")
+    assert set(cache._entries) == {("GBPUSD", PERIOD)}
+    cache.bias("EURUSD", PERIOD)
+    assert len(computed) == 4
+
+
+def test_confirm():
+    store = CandleStore(capacity=200)
+    store.extend_candles("EURUSD", PERIOD, [bar(i, 0.001) for i in range(60)])
+    store.extend_candles("EURUSD", 900, [bar(i, -0.001) for i in range(60)])
+    cache = BiasCache(store)
+
+    assert cache.confirm("EURUSD", None, PERIOD) is None
+    assert cache.confirm("EURUSD", ("sell", 70), None) == {"signal": "sell", "confidence": 70}
+    assert cache.confirm("EURUSD", (None, 0), PERIOD) == {"signal": None, "confidence": 0}
+    assert cache.confirm("EURUSD", ("buy", 70), PERIOD) == {"signal": "buy", "confidence": 70}
+    assert cache.confirm("EURUSD", ("sell", 70), PERIOD) == {"signal": None, "confidence": 0}
+    # The high timeframe disagrees
+    assert cache.confirm("EURUSD", ("buy", 70), PERIOD, 900) == {"signal": None, "confidence": 0}
+    assert cache.stats()["misses"] == 2
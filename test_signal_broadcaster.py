@@ -0,0 +1,84 @@
+# test_signal_broadcaster.py
+"""
+SignalBroadcaster room tests: clients in the same rooms share one batch,
+emitted once to a room holding exactly them and to each sid otherwise, and
+ClientRooms follows joins, leaves and disconnects.
+"""
+
+from signal_broadcaster import ALL_ROOM, UNIVERSE_ROOM, ClientRooms, SignalBroadcaster, subscription_rooms
+from signal_store import SignalStore
+from test_event_pipeline import FakeSocketIO
+
+
+def signal(symbol, timeframe="1m", value="BUY"):
+    return {"symbol": symbol, "timeframe": timeframe, "signal": value}
+
+
+def broadcast(clients, *signals, remove=None):
+    sio = FakeSocketIO()
+    broadcaster = SignalBroadcaster(sio, clients=clients)
+    store = SignalStore(epoch="e")
+    for sig in signals:
+        broadcaster.publish(store, sig)
+    if remove:
+        store.upsert(signal(remove))
+        broadcaster.remove(store, remove)
+    broadcaster.flush()
+    return sorted(((to, [s["symbol"] for s in data["signals"]]) for to, data in sio.emits), key=str), sio
+
+
+def test_clients_in_the_same_rooms_get_one_emit():
+    clients = ClientRooms()
+    for sid in ("s1", "s2", "s3"):
+        clients.join(sid, ALL_ROOM, UNIVERSE_ROOM)
+
+    emits, sio = broadcast(clients, signal("A"), signal("B"))
+    assert emits == [("all", ["A", "B"])]
+    assert sio.emits[0][1]["epoch"] == "e"
+
+
+def test_batches_follow_subscriptions():
+    clients = ClientRooms()
+    clients.join("s1", ALL_ROOM, UNIVERSE_ROOM)
+    clients.join("s2", UNIVERSE_ROOM, *subscription_rooms(["A"]))
+    clients.join("s3", UNIVERSE_ROOM, *subscription_rooms(["A"]), *subscription_rooms(timeframes=["5m"]))
+    clients.join("s4", UNIVERSE_ROOM, *subscription_rooms(["A"]))
+
+    emits, _ = broadcast(clients, signal("A"), signal("B"), signal("B", "5m"))
+    # symbol:A also holds s3, so the s2/s4 batch goes to each sid; s3 alone is in tf:5m
+    assert emits == [("all", ["A", "B", "B"]), ("s2", ["A"]), ("s4", ["A"]), ("tf:5m", ["A", "B"])]
+
+
+def test_removals_reach_clients_without_signals():
+    clients = ClientRooms()
+    clients.join("s1", ALL_ROOM, UNIVERSE_ROOM)
+    clients.join("s2", UNIVERSE_ROOM, "symbol:A")
+
+    emits, sio = broadcast(clients, signal("C"), remove="B")
+    assert emits == [("all", ["C"]), ("symbol:A", [])]
+    assert all(data["removed"] == ["B"] for _, data in sio.emits)
+
+
+def test_client_rooms_track_leave_and_disconnect():
+    clients = ClientRooms()
+    clients.join("s1", ALL_ROOM, UNIVERSE_ROOM)
+    clients.join("s2", ALL_ROOM, UNIVERSE_ROOM)
+    clients.leave("s1", ALL_ROOM)
+    clients.join("s1", "symbol:A")
+    assert clients.rooms("s1") == {UNIVERSE_ROOM, "symbol:A"}
+    assert sorted(clients.groups(), key=str) == [
+        (frozenset({ALL_ROOM, UNIVERSE_ROOM}), ["s2"], ALL_ROOM),
+        (frozenset({UNIVERSE_ROOM, "symbol:A"}), ["s1"], "symbol:A"),
+    ]
+
+    clients.disconnect("s1")
+    clients.leave("gone", ALL_ROOM)
+    assert (len(clients), clients.rooms("s1")) == (1, set())
+    assert "symbol:A" not in clients._members
+    # s2 is now the only member of the universe room too
+    assert clients.groups() == [(frozenset({ALL_ROOM, UNIVERSE_ROOM}), ["s2"], ALL_ROOM)]
+
+
+def test_without_client_rooms_everything_goes_to_all():
+    emits, _ = broadcast(None, signal("A"))
+    assert emits == [("all", ["A"])]
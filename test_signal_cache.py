@@ -0,0 +1,74 @@
+# test_signal_cache.py
+"""
+SignalCache and DirtySet tests: the least recently used entry is evicted
+first, None is a cacheable result, and draining the dirty set hands every
+marked key out exactly once.
+"""
+
+import threading
+
+from signal_cache import DirtySet, SignalCache
+
+
+def test_lru_eviction_keeps_recently_used_entries():
+    cache = SignalCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # "b" is now the least recently used
+    cache.put("c", 3)
+
+    assert "b" not in cache
+    assert ("a" in cache, "c" in cache) == (True, True)
+    # Putting an existing key refreshes it without evicting anything
+    cache.put("a", 4)
+    cache.put("d", 5)
+    assert "c" not in cache
+    assert cache.get("a") == 4
+    assert cache.stats()["evictions"] == 2
+
+
+def test_misses_are_told_apart_from_cached_none():
+    cache = SignalCache()
+    cache.put(("EURUSD", "1m", 60.0, ()), None)
+    assert cache.get(("EURUSD", "1m", 60.0, ())) is None
+    assert cache.get(("EURUSD", "1m", 120.0, ())) is SignalCache.MISS
+    assert cache.get(("EURUSD", "1m", 120.0, ()), "default") == "default"
+    assert cache.stats() == {"size": 1, "maxsize": 2048, "hits": 1, "misses": 2,
+                             "evictions": 0, "hit_rate": 0.3333}
+
+
+def test_discard_prefix():
+    cache = SignalCache()
+    for key in (("A", "1m", 0), ("A", "1m", 60), ("A", "5m", 0), ("B", "1m", 0)):
+        cache.put(key, key)
+    cache.discard_prefix(("A", "1m"))
+    assert list(cache._entries) == [("A", "5m", 0), ("B", "1m", 0)]
+    cache.discard_prefix(("A",))
+    assert list(cache._entries) == [("B", "1m", 0)]
+
+
+def test_dirty_set_drain_hands_out_each_key_once():
+    dirty = DirtySet()
+    dirty.mark(("A", 60))
+    dirty.mark(("A", 60))
+    dirty.mark(("B", 60))
+    assert len(dirty) == 2
+    assert dirty.drain() == {("A", 60), ("B", 60)}
+    assert (len(dirty), dirty.drain()) == (0, set())
+
+    # Marks racing with drains are neither lost nor duplicated
+    drained = []
+    done = threading.Event()
+
+    def mark():
+        for i in range(20000):
+            dirty.mark(i)
+        done.set()
+
+    thread = threading.Thread(target=mark)
+    thread.start()
+    while not done.is_set():
+        drained.extend(dirty.drain())
+    thread.join()
+    drained.extend(dirty.drain())
+    assert sorted(drained) == list(range(20000))
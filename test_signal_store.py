@@ -0,0 +1,83 @@
+# test_signal_store.py
+"""
+SignalStore delta tests: clients get only the rows changed after their
+version, and a full table when they are behind a removal or ahead of the store.
+"""
+
+from signal_store import SignalStore
+
+
+def signal(symbol, timeframe="1m", value="BUY"):
+    return {"symbol": symbol, "timeframe": timeframe, "signal": value, "confidence": 70}
+
+
+def keys(signals):
+    return [(s["symbol"], s["timeframe"]) for s in signals]
+
+
+def test_changes_since_returns_updated_rows_in_order():
+    store = SignalStore()
+    for symbol in ("A", "B", "C"):
+        store.upsert(signal(symbol))
+    assert store.upsert(signal("A", value="SELL")) == 4
+
+    delta = store.changes_since(2)
+    assert (delta.version, delta.full) == (4, False)
+    assert keys(delta.signals) == [("C", "1m"), ("A", "1m")]
+    assert delta.signals[-1]["signal"] == "SELL"
+    assert store.changes_since(4).signals == ()
+
+    # First sync, or a version the store never issued (e.g. after a server restart)
+    assert store.changes_since(None).full
+    assert store.changes_since(0).full
+    assert store.changes_since(9).full
+
+
+def test_remove_forces_full_sync_for_older_clients():
+    store = SignalStore()
+    store.upsert(signal("A"))
+    store.upsert(signal("A", "5m"))
+    store.upsert(signal("B"))
+
+    assert store.remove("A") == 2
+    assert store.remove("A") == 0
+    assert store.version == 4
+    assert store.get("A", "1m") is None
+
+    behind = store.changes_since(3)
+    assert behind.full
+    assert keys(behind.signals) == [("B", "1m")]
+
+    # A client that already saw the removal keeps getting deltas
+    store.upsert(signal("C"))
+    delta = store.changes_since(4)
+    assert not delta.full
+    assert keys(delta.signals) == [("C", "1m")]
+
+
+def test_snapshot_is_rebuilt_once_per_version():
+    store = SignalStore()
+    store.upsert(signal("A"))
+    snap = store.snapshot()
+    assert store.snapshot() is snap
+    store.upsert(signal("B"))
+    assert store.snapshot() is not snap
+    assert store.snapshot().version == 2
+
+
+def test_other_epoch_gets_full_table():
+    store = SignalStore(epoch="a")
+    for symbol in ("A", "B", "C"):
+        store.upsert(signal(symbol))
+    assert store.etag() == "a-3"
+    assert store.etag(2) == "a-2"
+    assert not store.changes_since(2, "a").full
+
+    # A client of the previous process at a version this one has reached too
+    restarted = SignalStore(epoch="b")
+    for symbol in ("X", "Y", "Z"):
+        restarted.upsert(signal(symbol))
+    delta = restarted.changes_since(2, "a")
+    assert delta.full
+    assert keys(delta.signals) == [("X", "1m"), ("Y", "1m"), ("Z", "1m")]
+    assert restarted.etag() != store.etag()
@@ -0,0 +1,27 @@
+# test_strategy_np.py
+"""
+Parity tests: the NumPy strategy must reproduce strategy.py for DataFrame
+and (bars, 4) array input alike.
+"""
+
+import pytest
+
+import strategy
+import strategy_np
+from indicators import IndicatorState
+from test_batch_analyzer import assert_features_equal, ohlc_array
+from test_indicators import make_candles
+
+
+@pytest.mark.parametrize("n", [10, 49, 50, 51, 64, 300])
+@pytest.mark.parametrize("seed, flat_every", [(0, 0), (1, 0), (2, 37)])
+def test_strategy_np_matches_pandas(n, seed, flat_every):
+    df = make_candles(n, seed, flat_every)
+    mid, high = make_candles(80, 100 + seed), make_candles(80, 200 + seed)
+    expected = strategy.analyze_candles(df, mid, high)
+    # DataFrame and (bars, 4) array input
+    assert strategy_np.analyze_candles(df, mid, high) == expected
+    assert strategy_np.analyze_candles(ohlc_array(df), mid, high) == expected
+    assert strategy_np.score_candles(ohlc_array(df)) == strategy.score_candles(df)
+    if n >= IndicatorState.MIN_BARS:
+        assert_features_equal(strategy_np.candle_features(ohlc_array(df)), strategy.candle_features(df), n)
@@ -0,0 +1,133 @@
+# test_subscription_manager.py
+"""
+SubscriptionManager tests: asset refreshes are diffed against the active
+set, changes undone before they were sent cancel out, reset() queues the
+universe again for a new connection, and a stream only counts as subscribed
+once its frame was sent. Frames are drained with _next() / _finish(),
+without the sender thread.
+"""
+
+import time
+
+from subscription_manager import SubscriptionManager
+
+
+def manager(**kwargs):
+    removed = []
+    subs = SubscriptionManager(lambda event, payload: None, periods=(60,), on_removed=removed.append, **kwargs)
+    return subs, removed
+
+
+def drain(subs, sent=True):
+    frames = []
+    while subs._pending:
+        stream, event = subs._next()
+        subs._finish(stream, event, sent)
+        kind, asset, period = stream
+        frames.append((event, kind, asset))
+        if not sent:
+            break
+    return frames
+
+
+def test_update_sends_only_the_difference():
+    subs, removed = manager()
+    assert subs.update(["A", "B"]) == ({"A", "B"}, set())
+    assert sorted(drain(subs)) == [("subscribe", "candles", "A"), ("subscribe", "candles", "B"),
+                                   ("subscribe", "ticks", "A"), ("subscribe", "ticks", "B")]
+
+    assert subs.update(["B", "C"]) == ({"C"}, {"A"})
+    assert sorted(drain(subs)) == [("subscribe", "candles", "C"), ("subscribe", "ticks", "C"),
+                                   ("unsubscribe", "candles", "A"), ("unsubscribe", "ticks", "A")]
+    assert removed == ["A"]
+    assert subs.update(["C", "B"]) == (set(), set())
+    assert drain(subs) == []
+    assert subs.stats()["streams"] == 4
+
+
+def test_flapping_asset_cancels_out():
+    subs, removed = manager(ticks=False)
+    subs.update(["A"])
+    drain(subs)
+
+    # Disabled and re-enabled before the unsubscribe went out
+    subs.update([])
+    subs.update(["A"])
+    assert drain(subs) == []
+    # Listed and delisted before the subscribe went out
+    subs.update(["A", "B"])
+    subs.update(["A"])
+    assert drain(subs) == []
+    assert subs.counts["cancelled"] == 2
+    assert removed == ["A", "B"]
+
+
+def test_reset_queues_the_active_universe_again():
+    subs, _ = manager(ticks=False)
+    subs.update(["A", "B"])
+    drain(subs)
+
+    subs.reset()
+    assert subs.active == {"A", "B"}
+    assert subs.stats()["streams"] == 0
+    # The first assets list of the new connection changes nothing but must not drop the resubscribe
+    assert subs.update(["A", "B"]) == (set(), set())
+    assert sorted(drain(subs)) == [("subscribe", "candles", "A"), ("subscribe", "candles", "B")]
+    assert subs.stats()["streams"] == 2
+
+
+def test_failed_send_is_queued_again():
+    subs, _ = manager(ticks=False)
+    subs.update(["A"])
+    assert drain(subs, sent=False) == [("subscribe", "candles", "A")]
+    assert subs.stats()["streams"] == 0
+    assert drain(subs) == [("subscribe", "candles", "A")]
+    assert subs.stats()["streams"] == 1
+
+
+def test_updates_during_a_send_are_reconciled_after_it():
+    subs, _ = manager(ticks=False)
+    subs.update(["A"])
+    stream, event = subs._next()
+    # Delisted while its subscribe is on the wire: nothing is sent for A yet, so nothing is queued
+    subs.update([])
+    assert not subs._pending
+    subs._finish(stream, event, True)
+    assert drain(subs) == [("unsubscribe", "candles", "A")]
+
+    # Delisted and listed again while the subscribe is on the wire: one subscribe is enough
+    subs.update(["A"])
+    stream, event = subs._next()
+    subs.update([])
+    subs.update(["A"])
+    subs._finish(stream, event, True)
+    assert drain(subs) == []
+    assert subs.stats()["streams"] == 1
+
+
+def test_send_finishing_after_reset_changes_nothing():
+    subs, _ = manager(ticks=False)
+    subs.update(["A"])
+    stream, event = subs._next()
+    subs.reset()
+    subs._finish(stream, event, True)
+    assert subs.stats()["streams"] == 0
+    assert drain(subs) == [("subscribe", "candles", "A")]
+
+
+def test_sender_thread_retries_failed_frames():
+    frames, failures = [], [RuntimeError("not connected")]
+
+    def send(event, payload):
+        if failures:
+            raise failures.pop()
+        frames.append((event, payload))
+
+    subs = SubscriptionManager(send, periods=(60,), ticks=False, retry_delay=0.01).start()
+    subs.update(["A"])
+    deadline = time.monotonic() + 5
+    while not frames:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    assert frames == [("subscribe", {"type": "candles", "asset": "A", "period": 60})]
+    assert (subs.counts["errors"], subs.counts["subscribe"]) == (1, 1)
@@ -0,0 +1,166 @@
+# test_telegram_utils.py
+"""
+TelegramNotifier tests with a fake clock and a fake sender: alerts for one
+chat are merged within the coalesce window, per-chat and global rate limits
+hold sends back, and failed sends are retried after retry_after (HTTP 429)
+or given up on.
+"""
+
+import time
+
+from telegram_utils import TelegramNotifier
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+class FakeSender:
+    """Records (chat_id, text) and answers from ``results``, then with success."""
+
+    def __init__(self, results=()):
+        self.calls = []
+        self.results = list(results)
+
+    def __call__(self, chat_id, text):
+        self.calls.append((chat_id, text))
+        result = self.results.pop(0) if self.results else (True, None)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+def notifier(sender, **kwargs):
+    kwargs.setdefault("coalesce_window", 0)
+    clock = FakeClock()
+    return TelegramNotifier(send=sender, workers=2, clock=clock, **kwargs), clock
+
+
+def pump(n):
+    """Buffer what is queued, dispatch what may be sent and wait for the sends to finish."""
+    n._poll(timeout=0)
+    deadline = time.monotonic() + 5
+    while n._in_flight:
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+
+def test_alerts_within_the_window_are_merged():
+    sender = FakeSender()
+    n, clock = notifier(sender, coalesce_window=0.25)
+    n.notify("A", "first")
+    n.notify("A", "second")
+    n.notify("B", "other")
+    pump(n)
+    assert sender.calls == []
+
+    clock.advance(0.1)
+    n.notify("A", "third")
+    pump(n)
+    assert sender.calls == []
+
+    # The window runs from the oldest buffered alert of each chat
+    clock.advance(0.15)
+    pump(n)
+    assert sorted(sender.calls) == [("A", "first\nsecond\nthird"), ("B", "other")]
+    assert (n.sent, n.delivered) == (2, 4)
+
+
+def test_per_chat_interval():
+    sender = FakeSender()
+    n, clock = notifier(sender, per_chat_interval=1.0)
+    n.notify("A", "1")
+    pump(n)
+    n.notify("A", "2")
+    pump(n)
+    assert sender.calls == [("A", "1")]
+
+    # Other chats are not held back
+    clock.advance(0.5)
+    n.notify("B", "1")
+    pump(n)
+    assert sender.calls == [("A", "1"), ("B", "1")]
+    assert n.stats()["buffered"] == 1
+
+    clock.advance(0.5)
+    pump(n)
+    assert sender.calls[-1] == ("A", "2")
+    assert n.stats()["buffered"] == 0
+
+
+def test_global_rate_limit():
+    sender = FakeSender()
+    n, clock = notifier(sender, global_rate=2)
+    for chat_id in ("A", "B", "C"):
+        n.notify(chat_id, "x")
+    pump(n)
+    assert len(sender.calls) == 2
+
+    clock.advance(0.5)
+    pump(n)
+    assert len(sender.calls) == 2
+
+    clock.advance(0.5)
+    pump(n)
+    assert sorted(chat_id for chat_id, _ in sender.calls) == ["A", "B", "C"]
+
+
+def test_retry_after_429_keeps_order_and_merges_new_alerts():
+    results = []
+    sender = FakeSender([(False, 5.0)])
+    n, clock = notifier(sender, on_result=lambda refs, sent: results.append((refs, sent)))
+    n.notify("A", "a", ref=1)
+    pump(n)
+    assert (n.retries, n.sent) == (1, 0)
+
+    n.notify("A", "b", ref=2)
+    clock.advance(4.9)
+    pump(n)
+    assert len(sender.calls) == 1
+
+    clock.advance(0.2)
+    pump(n)
+    assert sender.calls == [("A", "a"), ("A", "a\nb")]
+    assert results == [([1, 2], True)]
+    assert n.stats() == {"queued": 0, "buffered": 0, "sent": 1, "delivered": 2,
+                         "retries": 1, "failed": 0, "dropped": 0}
+
+
+def test_transient_errors_back_off_until_max_retries():
+    results = []
+    sender = FakeSender([(False, 0), RuntimeError("network down"), (False, 0)])
+    n, clock = notifier(sender, max_retries=2, max_backoff=4.0,
+                        on_result=lambda refs, sent: results.append((refs, sent)))
+    n.notify("A", "a", ref=1)
+    for _ in range(3):
+        pump(n)
+        clock.advance(4.0)
+    pump(n)
+    assert len(sender.calls) == 3
+    assert (n.retries, n.failed) == (2, 1)
+    assert results == [([1], False)]
+
+
+def test_permanent_errors_are_not_retried():
+    sender = FakeSender([(False, None)])
+    n, clock = notifier(sender)
+    n.notify("A", "a")
+    pump(n)
+    clock.advance(60)
+    pump(n)
+    assert len(sender.calls) == 1
+    assert (n.retries, n.failed) == (0, 1)
+
+
+def test_full_queue_drops_alerts():
+    n, _ = notifier(FakeSender(), maxsize=1)
+    assert n.notify("A", "a")
+    assert not n.notify("A", "b")
+    assert n.stats()["dropped"] == 1
@@ -0,0 +1,73 @@
+# test_tick_aggregator.py
+"""
+TickAggregator tests: ticks are folded into one bar per period, a tick in a
+later bucket closes the forming bar, and ticks for a closed bar are dropped.
+"""
+
+from candle_ingest import CandleIngestor
+from candle_store import CandleStore
+from tick_aggregator import TickAggregator
+
+PERIODS = (60, 180)
+
+
+def aggregator():
+    store = CandleStore(capacity=10)
+    ingestor = CandleIngestor(store)
+    closed = []
+    ingestor.on_bar_closed(lambda asset, period, bar: closed.append((asset, period, bar.tolist())))
+    return TickAggregator(ingestor, PERIODS), store, closed
+
+
+def test_ticks_build_one_bar_per_period():
+    agg, store, closed = aggregator()
+    for time, price in ((0, 1.0), (10.5, 1.3), (20, 0.9), (59.9, 1.1)):
+        agg.add_tick("EURUSD", time, price)
+
+    for period in PERIODS:
+        assert store.candles("EURUSD", period).tolist() == [[0, 1.0, 1.3, 0.9, 1.1, 4]]
+    assert closed == []
+    assert agg.stats["ticks"] == 4
+
+
+def test_bucket_rollover_closes_the_forming_bar():
+    agg, store, closed = aggregator()
+    agg.add_tick("EURUSD", 50, 1.0)
+    agg.add_tick("EURUSD", 59, 1.2)
+    agg.add_tick("EURUSD", 60, 1.5)
+    agg.add_tick("EURUSD", 185, 1.4)
+
+    assert closed == [
+        ("EURUSD", 60, [0, 1.0, 1.2, 1.0, 1.2, 2]),
+        ("EURUSD", 60, [60, 1.5, 1.5, 1.5, 1.5, 1]),
+        ("EURUSD", 180, [0, 1.0, 1.5, 1.0, 1.5, 3]),
+    ]
+    # The new bar opens at the first tick of its bucket, skipped buckets stay gaps
+    assert store.candles("EURUSD", 60)[:, 0].tolist() == [0, 60, 180]
+    assert store.candles("EURUSD", 180).tolist()[-1] == [180, 1.4, 1.4, 1.4, 1.4, 1]
+
+
+def test_late_ticks_are_dropped():
+    agg, store, closed = aggregator()
+    agg.add_tick("EURUSD", 30, 1.0)
+    agg.add_tick("EURUSD", 70, 1.1)
+    # Belongs to the closed 60s bar at 0, but still to the forming 180s bar
+    agg.add_tick("EURUSD", 45, 2.0)
+
+    assert agg.stats["late_ticks"] == 1
+    assert store.candles("EURUSD", 60).tolist() == [[0, 1.0, 1.0, 1.0, 1.0, 1], [60, 1.1, 1.1, 1.1, 1.1, 1]]
+    assert store.candles("EURUSD", 180).tolist() == [[0, 1.0, 2.0, 1.0, 2.0, 3]]
+    assert [bar for _, _, bar in closed] == [[0, 1.0, 1.0, 1.0, 1.0, 1]]
+
+
+def test_drop_forgets_forming_bars():
+    agg, store, _ = aggregator()
+    agg.add_tick("EURUSD", 10, 1.0)
+    agg.add_tick("GBPUSD", 10, 2.0)
+    agg.drop("EURUSD")
+    assert set(agg._bars) == {("GBPUSD", 60), ("GBPUSD", 180)}
+
+    # The next tick starts a fresh bar instead of extending the dropped one
+    store.drop_asset("EURUSD")
+    agg.add_tick("EURUSD", 20, 1.5)
+    assert store.candles("EURUSD", 60).tolist() == [[0, 1.5, 1.5, 1.5, 1.5, 1]]
@@ -0,0 +1,56 @@
+"""
+Local tick-to-candle aggregation.
+
+Builds OHLCV bars for every configured period from a single tick stream, so
+one ``ticks`` subscription per asset replaces the per-period ``candles``
+subscriptions. Volume is the tick count of the bar.
+"""
+
+from collections import Counter
+
+from candle_store import TIME, HIGH, LOW, CLOSE, VOLUME
+
+
+class TickAggregator:
+    def __init__(self, ingestor, periods):
+        """
+        :param ingestor: CandleIngestor that receives the aggregated bars
+        :param periods: candle periods in seconds, e.g. [60, 180, 300]
+        """
+        self.ingestor = ingestor
+        self.periods = tuple(sorted(int(p) for p in periods))
+        self._bars = {}  # (asset, period) -> forming bar as a list in CANDLE_COLUMNS order
+        self.stats = Counter()
+
+    def drop(self, asset):
+        """Forget the forming bars of ``asset``."""
+        for period in self.periods:
+            self._bars.pop((asset, period), None)
+
+    def add_tick(self, asset, time, price):
+        """Fold one tick into the forming bar of every period."""
+        time = float(time)
+        price = float(price)
+        self.stats["ticks"] += 1
+
+        for period in self.periods:
+            bucket = float(int(time) // period * period)
+            key = (asset, period)
+            bar = self._bars.get(key)
+
+            if bar is None or bucket > bar[TIME]:
+                bar = [bucket, price, price, price, price, 1.0]
+                self._bars[key] = bar
+            elif bucket == bar[TIME]:
+                if price > bar[HIGH]:
+                    bar[HIGH] = price
+                if price < bar[LOW]:
+                    bar[LOW] = price
+                bar[CLOSE] = price
+                bar[VOLUME] += 1
+            else:
+                # Tick belongs to a bar that is already closed
+                self.stats["late_ticks"] += 1
+                continue
+
+            self.ingestor.ingest_row(asset, period, bar)
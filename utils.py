@@ -1,7 +1,6 @@
 # utils.py
 import logging
-import requests
-from config import Config
+import time
 
 # Setup logging
 logging.basicConfig(
@@ -12,39 +11,18 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
-def send_telegram_alert(message: str):
+def log_signal(symbol: str, direction: str, timeframe: str, bar_time: float = None):
     """
-    Send alerts to Telegram (if enabled in config).
-    If Telegram credentials are not provided, this does nothing.
+    Log signals for monitoring and debugging, and queue the Telegram alert
+    through the alert outbox (see data_fetcher.send_alert).
+    bar_time: start of the bar the signal is about; without it the alert is
+    keyed by the time it was logged, so repeated calls are not deduplicated.
     """
-    if not Config.TELEGRAM_BOT_TOKEN or not Config.TELEGRAM_CHAT_ID:
-        logger.debug("Telegram credentials not set. Skipping alert.")
-        return
+    from data_fetcher import send_alert  # deferred: data_fetcher sets up the feed on import
 
-    url = f"https://api.telegram.org/bot{Config.TELEGRAM_BOT_TOKEN}/sendMessage"
-    payload = {
-        "chat_id": Config.TELEGRAM_CHAT_ID,
-        "text": message,
-        "parse_mode": "HTML"
-    }
-
-    try:
-        response = requests.post(url, data=payload)
-        if response.status_code == 200:
-            logger.info("Telegram alert sent successfully.")
-        else:
-            logger.warning(f"Failed to send Telegram alert: {response.text}")
-    except Exception as e:
-        logger.error(f"Error sending Telegram alert: {e}")
-
-
-def log_signal(symbol: str, direction: str, timeframe: str):
-    """
-    Log signals for monitoring and debugging.
-    """
     msg = f"Signal detected: {symbol} | {direction} | {timeframe}"
     logger.info(msg)
-    send_telegram_alert(msg)
+    send_alert(symbol, timeframe, direction, msg, time.time() if bar_time is None else bar_time)
 
 
 def analyze_candles(candles, strategy_func):